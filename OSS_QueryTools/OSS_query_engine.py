@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""长期运行的网管数据库查询引擎。
+
+与OSS_query_v2.GenerateQueryData每次调用都重新载入配置、重新连接数据库不同，
+QueryEngine只载入一次配置，并为OSS_Databases.yaml里的每个数据库维护一个连接池。
+一批查询请求（QueryOptions）可以并发执行，查询结果用fetchmany分批输出。
+
+    engine = QueryEngine()
+    requests = [make_request('SHMME03BNK','ALARM','2016/07/19','1000','2016/07/19','1200'),
+                make_request('SHMME03BNK','EPS_ATTACH_ATTEMPT','2016/07/19','1000','2016/07/19','1200')]
+    for request,rows,errmsg in engine.query_batch(requests):
+        ...
+    engine.close()
+
+connect参数可以替换为其他DB-API驱动（比如sqlite3）的连接函数，用于没有网管数据库的测试。
+"""
+import time
+import threading
+import Queue
+
+from NSNG_OSS_config import NSNG_OSS_config
+from OSS_query_v2 import (QueryOptions, getDatabaseName, getDatabase_config,
+                          getTables_config, getAlarmSQLstring, getStatSQLstring)
+
+class QueryEngineError(Exception):
+    pass
+
+def oracle_connect(database):
+    """connect to the Oracle database of the config in OSS_Databases.yaml.
+    """
+    import cx_Oracle
+    dsn = database['ip'] + ':' + database['port'] + '/' + database['db']
+    return cx_Oracle.connect(database['user'],database['password'],dsn,threaded=True)
+
+def make_request(element,counters,startdate,starttime,stopdate,stoptime,period='15',unittype='MME'):
+    """return the QueryOptions of one request.
+        starttime/stoptime:  '0910' (hour+minute)
+    """
+    queryoptions = QueryOptions()
+    queryoptions.selectelement = element
+    queryoptions.selectcounters = counters
+    queryoptions.startdate = startdate
+    queryoptions.starttime = starttime[0:2]
+    queryoptions.starttimemm = starttime[2:]
+    queryoptions.starttimeall = starttime
+    queryoptions.stopdate = stopdate
+    queryoptions.stoptime = stoptime[0:2]
+    queryoptions.stoptimemm = stoptime[2:]
+    queryoptions.stoptimeall = stoptime
+    queryoptions.selectperiod = period
+    queryoptions.selectunittype = unittype
+    queryoptions.localsave = '0'
+    return queryoptions
+
+class ConnectionPool(object):
+    """The connections of one database. At most 'size' connections are
+    opened, they are reused by the queries until the pool is closed.
+    """
+    def __init__(self,connect,database,size=4):
+        self.connect = connect
+        self.database = database
+        self.size = size
+        ## the idle connections, the last released one is reused first.
+        self._idle = []
+        self._opened = 0
+        ## notified when a connection is released or discarded.
+        self._cond = threading.Condition(threading.Lock())
+
+    def acquire(self,timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            ## wait for a connection released by the other queries, or for
+            ## the room of a new one after a connection is discarded.
+            while not self._idle and self._opened >= self.size:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise QueryEngineError("No free connection of database %s" % self.database.get('name'))
+                self._cond.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._opened += 1
+
+        try:
+            return self.connect(self.database)
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+    def release(self,conn):
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def discard(self,conn):
+        """drop the broken connection, a new one will be opened instead.
+        """
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._cond:
+            idle,self._idle = self._idle,[]
+        for conn in idle:
+            self.discard(conn)
+
+class QueryEngine(object):
+    """Run the OSS queries with the pooled connections.
+    """
+    def __init__(self,configs=None,connect=oracle_connect,pool_size=4,workers=4,arraysize=500):
+        self.configs = configs or NSNG_OSS_config()
+        self.connect = connect
+        self.pool_size = pool_size
+        self.workers = workers
+        self.arraysize = arraysize
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def get_pool(self,database):
+        with self._lock:
+            pool = self._pools.get(database['name'])
+            if pool is None:
+                pool = self._pools[database['name']] = ConnectionPool(self.connect,database,self.pool_size)
+        return pool
+
+    def prepare(self,queryoptions):
+        """return the (database config, SQL, bind parameters) of the request.
+        """
+        nsng_oss_ne = self.configs.NSNG_OSS_NE
+        nsng_oss_database = self.configs.NSNG_OSS_database
+        nsng_oss_tables_views = self.configs.NSNG_OSS_tables_views
+
+        database_name = getDatabaseName(nsng_oss_ne,queryoptions.selectelement)
+        if (database_name == ''):
+            raise QueryEngineError('Can not get the database name according to the element name(' + queryoptions.selectelement + ')')
+        try:
+            database = getDatabase_config(nsng_oss_database,database_name)
+        except UnboundLocalError:
+            raise QueryEngineError('Can not get the database config according to the database name(' + database_name + ')')
+
+        column_list,table_name = getTables_config(nsng_oss_tables_views,queryoptions.selectcounters)
+        if (queryoptions.selectcounters.find('ALARM')<0):
+            SQLstring,binds = getStatSQLstring(table_name,column_list,queryoptions)
+        else:
+            SQLstring,binds = getAlarmSQLstring(table_name,column_list,queryoptions)
+        return database,SQLstring,binds
+
+    def execute(self,queryoptions):
+        """run one request, yield the rows in the lists of at most 'arraysize'
+        rows.
+        """
+        database,SQLstring,binds = self.prepare(queryoptions)
+        pool = self.get_pool(database)
+        conn = pool.acquire()
+        finished = False
+        try:
+            cursor = conn.cursor()
+            cursor.arraysize = self.arraysize
+            cursor.execute(SQLstring,binds)
+            while True:
+                rows = cursor.fetchmany(self.arraysize)
+                if not rows:
+                    break
+                yield rows
+            cursor.close()
+            finished = True
+        finally:
+            ## the connection with an unfinished cursor is not reused.
+            if finished:
+                pool.release(conn)
+            else:
+                pool.discard(conn)
+
+    def query(self,queryoptions):
+        """return all the rows of one request.
+        """
+        rows = []
+        for _rows in self.execute(queryoptions):
+            rows.extend(_rows)
+        return rows
+
+    def query_batch(self,requests):
+        """run the requests concurrently, yield (request, rows, errmsg) once a
+        batch of rows is fetched. the rows of one request are in order, the
+        requests are interleaved. if the request failed, rows is None and
+        errmsg is the error.
+        """
+        requests = list(requests)
+        tasks = Queue.Queue()
+        for request in requests:
+            tasks.put(request)
+        ## the bounded queue keeps the fetched rows from piling up in memory.
+        output = Queue.Queue(maxsize=self.workers * 2)
+        done = object()
+        ## set when the caller stops reading the results.
+        stopped = threading.Event()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    output.put(item,timeout=0.1)
+                    return True
+                except Queue.Full:
+                    continue
+            return False
+
+        def worker():
+            while not stopped.is_set():
+                try:
+                    request = tasks.get_nowait()
+                except Queue.Empty:
+                    break
+                try:
+                    for rows in self.execute(request):
+                        if not put((request,rows,'')):
+                            break
+                except Exception, e:
+                    put((request,None,'Databse Query Exception :' + str(e)))
+            put(done)
+
+        threads = [threading.Thread(target=worker) for i in range(min(self.workers,len(requests)))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        running = len(threads)
+        try:
+            while running:
+                item = output.get()
+                if item is done:
+                    running -= 1
+                    continue
+                yield item
+        finally:
+            stopped.set()
+            for thread in threads:
+                thread.join()
+
+    def close(self):
+        with self._lock:
+            pools = self._pools.values()
+            self._pools = {}
+        for pool in pools:
+            pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc_info):
+        self.close()
@@ -7,8 +7,12 @@ import os
 import time
 import datetime
 import decimal
-import cx_Oracle
+try:
+    import cx_Oracle
+except ImportError:     # the OSS_query_engine could run with the other DB-API drivers.
+    cx_Oracle = None
 from NSNG_OSS_config import NSNG_OSS_config
+from OSS_sql_builder import build_alarm_sql, build_stat_sql
 
 class QueryOptions(object):
     def __init__(self):
@@ -175,129 +179,44 @@ def getTables_config(nsng_oss_tables_views,column_name_list):
     return return_column_list,return_table_name
 
 def getAlarmSQLstring(table_name,column_list,queryoptions):
-    SelectString = ''
-    FromString = ''
-    WhereString = ''
-    OrderString = ''
-
-    # Generate Select String
-    SelectString = '''
-select objects.CO_NAME,
-DN,alarm_number,alarm_time,cancel_time,alarm_status,
-alarm_type,severity,
-text,
-fx_alarm.SUPPLEMENTARY_INFO
-'''
-    # Generate From String
-    FromString = '\nfrom ' + table_name + ' , UTP_COMMON_OBJECTS objects '
-
-    # Generate Where String
-    if (queryoptions.selectunittype == "MME" or queryoptions.selectunittype == "TA_ID"):
-        WhereString = """
-where 
-NE_GID = objects.CO_GID and objects.CO_OC_ID=3766
-"""
-    else:
-        WhereString = """
-where 
-NE_GID = objects.CO_GID and (objects.CO_OC_ID=3529) 
-"""
-    # Counters maybe contain alarm_number like 'ALARM,3604,2101'
-    if (len(queryoptions.selectcounters.split(',')) > 1):
-        alarm_numbers =  ','.join(queryoptions.selectcounters.split(',')[1:])
-        WhereString = WhereString + " and alarm_number in (" + alarm_numbers + ") "
-    if (queryoptions.selectelement != 'ALL'):
-        WhereString = WhereString + "and objects.CO_NAME = '" + queryoptions.selectelement + "' " 
-    WhereString = WhereString + "and to_char(alarm_time,\'yyyy/mm/dd/hh24mi\')>=\'"+queryoptions.startdate+"/"+queryoptions.starttimeall+"\' and to_char(alarm_time,\'yyyy/mm/dd/hh24mi\')<=\'"+queryoptions.stopdate+"/"+queryoptions.stoptimeall + "\' \n"
-
-    OrderString = OrderString + """
-order by objects.CO_GID , alarm_type desc ,severity asc
+    """return the (SQL, binds) of the alarm query.
     """
-
-    return SelectString + FromString + WhereString + OrderString
+    return build_alarm_sql(table_name,column_list,queryoptions)
 
 def getStatSQLstring(table_name,column_list,queryoptions):
-    SelectString = ''
-    FromString = ''
-    WhereString = ''
-    GroupString = ''
-
-    # Generate Select String
-    SelectString = '''
-select
-objects.CO_NAME,
-to_char(period_start_time,'yyyy/mm/dd') Sdate,
-'''
-    if (queryoptions.selectperiod=='15'):
-        SelectString = SelectString + "to_char(period_start_time,'hh24:mi') Stime,\n"
-    else:
-        SelectString = SelectString + "to_char(period_start_time,'hh24') Stime,\n"
+    """return the (SQL, binds) of the counters query.
+    """
+    return build_stat_sql(table_name,column_list,queryoptions)
+
+# the python codecs of the oracle client charsets, the strings fetched by
+# cx_Oracle are encoded in the charset of NLS_LANG.
+ORACLE_CHARSETS = {'AL32UTF8'     : 'utf-8',
+                   'UTF8'         : 'utf-8',
+                   'ZHS16GBK'     : 'gbk',
+                   'ZHS32GB18030' : 'gb18030',
+                   'ZHT16BIG5'    : 'big5',
+                   'WE8ISO8859P1' : 'latin-1',
+                   'WE8MSWIN1252' : 'cp1252',
+                   'US7ASCII'     : 'ascii'}
+
+def getClientEncoding(nls_lang=None):
+    """return the python codec of the charset in NLS_LANG
+    ('SIMPLIFIED CHINESE_CHINA.ZHS16GBK'), utf-8 by default.
+    """
+    if nls_lang is None:
+        nls_lang = os.environ.get('NLS_LANG','')
+    charset = nls_lang.rsplit('.',1)[-1].strip().upper() if '.' in nls_lang else ''
+    return ORACLE_CHARSETS.get(charset,'utf-8')
 
-    if (queryoptions.selectunittype=='MME' or queryoptions.selectunittype=='SAEGW'):
-        SelectString = SelectString + "'ALL' as ElementType "
-    else:
-        SelectString = SelectString + queryoptions.selectunittype + " as ElementType "
-    
-    selectcounters = queryoptions.selectcounters.split(',')
-    for selectcounter in selectcounters:
-        SelectString = SelectString + ',\nsum(' + selectcounter +')'
-
-    # Generate From String
-    FromString = '\nfrom ' + table_name + ' g , UTP_COMMON_OBJECTS objects '
-
-    # Generate Where String
-    # if unit type is MME or TAC, the stat table should use fins_id as id, otherwise use fing_id
-    if (queryoptions.selectunittype == 'MME' or queryoptions.selectunittype == 'TAC'):
-        WhereString = """
-where 
-g.FINS_ID=objects.CO_GID 
-"""
-    else:
-        WhereString = """
-where 
-g.FING_ID=objects.CO_GID 
-"""
-    if (queryoptions.selectelement != 'ALL'):
-        WhereString = WhereString + " and objects.co_name = '" + queryoptions.selectelement + "' " 
-    WhereString = WhereString + " and to_char(g.period_start_time,\'yyyy/mm/dd/hh24mi\')>=\'"+queryoptions.startdate+"/"+queryoptions.starttimeall+"\' and to_char(g.period_start_time,\'yyyy/mm/dd/hh24mi\')<=\'"+queryoptions.stopdate+"/"+queryoptions.stoptimeall + "\' \n"
-
-    if (queryoptions.selectperiod=='60'):
-        if(queryoptions.selectunittype=='MME' or queryoptions.selectunittype=='SAEGW'):
-            GroupString = """
-group by to_char(period_start_time,'yyyy/mm/dd'), to_char(period_start_time,'hh24'),
-objects.co_name
-order by objects.co_name , to_char(period_start_time,'yyyy/mm/dd'), to_char(period_start_time,'hh24')
-"""
-        else:
-            GroupString = """
-group by to_char(period_start_time,'yyyy/mm/dd'), to_char(period_start_time,'hh24'),
-objects.co_name,""" + queryoptions.selectunittype + """
-order by objects.co_name , to_char(period_start_time,'yyyy/mm/dd'), to_char(period_start_time,'hh24')
-"""
-    else:
-        if(queryoptions.selectunittype=='MME' or queryoptions.selectunittype=='SAEGW'):
-            GroupString = """
-group by to_char(period_start_time,'yyyy/mm/dd'), to_char(period_start_time,'hh24:mi'),
-objects.co_name
-order by objects.co_name , to_char(period_start_time,'yyyy/mm/dd'), to_char(period_start_time,'hh24:mi')
-"""
-        else:
-            GroupString = """
-group by to_char(period_start_time,'yyyy/mm/dd'), to_char(period_start_time,'hh24:mi'),
-objects.co_name,ElementType,""" + queryoptions.selectunittype + """
-order by objects.co_name , to_char(period_start_time,'yyyy/mm/dd'), to_char(period_start_time,'hh24:mi')
-"""
-
-    return SelectString + FromString + WhereString + GroupString
-
-def write_column(reportfile,x):
-    firstcolumn = 1
-    for y in x:
-        if (firstcolumn == 1):
-            reportfile.write('\t\t"' + str(y) + '"')
-            firstcolumn = 0
-        else:
-            reportfile.write(',\n\t\t"' + str(y) + '"')
+DB_ENCODING = getClientEncoding()
+
+def getColumnValue(y):
+    if isinstance(y,unicode):
+        return y
+    if isinstance(y,str):
+        # the bytes not in the charset are replaced, the row is still written.
+        return y.decode(DB_ENCODING,'replace')
+    return str(y)
 
 def makeQueryoptions(info):
     # Get query config
@@ -314,10 +233,9 @@ def GenerateReport(rowinfo , queryoptions):
         queryresult , result = GenerateReportData(rowinfo , queryoptions)
     return queryresult , result
 
-def GenerateReportData(rowinfo , queryoptions):
-    queryresult = {}
+def getColumndesc(queryoptions):
+    # json 'columndesc' is query result 's column name
     columndesc = []
-
     if (queryoptions.selectcounters.find('ALARM')<0):
         columndesc.append("NE_NAME")
         columndesc.append("Date")
@@ -336,20 +254,23 @@ def GenerateReportData(rowinfo , queryoptions):
         columndesc.append("Alarm Severity")
         columndesc.append("Alarm Text")
         columndesc.append("Alarm Supp Info")
-    
-    queryresult['columndesc'] = columndesc
+    return columndesc
+
+def GenerateReportData(rowinfo , queryoptions):
+    queryresult = {}
+    queryresult['columndesc'] = getColumndesc(queryoptions)
 
     columns = []
     for x in rowinfo:
-        column = []
-        for y in x:
-            column.append(str(y))
-        columns.append(column)
+        columns.append([getColumnValue(y) for y in x])
     queryresult['columns'] = columns
 
     return queryresult , ''
 
 def GenerateReportFile(rowinfo , queryoptions):
+    """write the report in JSON Lines: the first line is {"columndesc": [...]},
+    then one json array per row. the rows are written once they are fetched.
+    """
     result = ''
     try:
         if (not os.path.exists("./Reports/")):
@@ -358,50 +279,12 @@ def GenerateReportFile(rowinfo , queryoptions):
     except Exception , e:
         result = 'Reportfile : ./Reports/' + queryoptions.reportfilename + ' can not create. '
         return None , result
-    # json 'columndesc' is query result 's column name
-    if (queryoptions.selectcounters.find('ALARM')<0):
-        reportfile.write('{\n')
-        reportfile.write('\t"columndesc": [\n')
-        reportfile.write('\t\t"NE_NAME",\n')
-        reportfile.write('\t\t"Date",\n')
-        reportfile.write('\t\t"Time",\n')
-        reportfile.write('\t\t"StatType"')
-        for column_name in queryoptions.selectcounters.split(':'):
-            reportfile.write(',\n')
-            reportfile.write('\t\t"' + column_name + '"\n')
-        reportfile.write('\t],\n')
-    else:
-        reportfile.write('{\n')
-        reportfile.write('\t"columndesc": [\n')
-        reportfile.write('\t\t"NE_NAME",\n')
-        reportfile.write('\t\t"DN",\n')
-        reportfile.write('\t\t"Alarm Number",\n')
-        reportfile.write('\t\t"Alarm Timer",\n')
-        reportfile.write('\t\t"Cancel Timer",\n')
-        reportfile.write('\t\t"Alarm Status",\n')
-        reportfile.write('\t\t"Alarm Type",\n')
-        reportfile.write('\t\t"Alarm Severity",\n')
-        reportfile.write('\t\t"Alarm Text",\n')
-        reportfile.write('\t\t"Alarm Supp Info"\n')
-        reportfile.write('\t],\n')
-
-    # json 'columns' is query result 's column value
-    firstrow = 1
-    reportfile.write('\t"columns": [\n')
-    for x in rowinfo:
-        if (firstrow == 1):
-            reportfile.write('\t[\n')
-            firstrow = 0
-            write_column(reportfile,x)
-        else:
-            reportfile.write(',\n\t[\n')
-            write_column(reportfile,x)
-        
-        reportfile.write('\n\t]')
-    reportfile.write('\n\t]')
-        
-    reportfile.write('\n}')
-    reportfile.close()
+
+    with reportfile:
+        reportfile.write(json.dumps({'columndesc':getColumndesc(queryoptions)}) + '\n')
+        # json 'columns' is query result 's column value, one row per line
+        for x in rowinfo:
+            reportfile.write(json.dumps([getColumnValue(y) for y in x]) + '\n')
     return reportfile , result
 
 def GenerateQueryData(queryoptions):
@@ -456,13 +339,16 @@ def GenerateQueryData(queryoptions):
     # Get SQL
     try:
         if (queryoptions.selectcounters.find('ALARM')<0):
-            SQLstring = getStatSQLstring(table_name,column_list,queryoptions)
+            SQLstring,binds = getStatSQLstring(table_name,column_list,queryoptions)
         else:
-            SQLstring = getAlarmSQLstring(table_name,column_list,queryoptions)
+            SQLstring,binds = getAlarmSQLstring(table_name,column_list,queryoptions)
         print '\nSQLstring:' + SQLstring
+        print 'binds:' + str(binds)
         cursor=db.cursor()
-        cursor.execute(SQLstring)
-        row1=cursor.fetchall()
+        cursor.arraysize = 500
+        cursor.execute(SQLstring,binds)
+        # the rows are written while they are fetched from the cursor
+        queryresult , result = GenerateReport(cursor,queryoptions)
     except Exception, e:
         result = '\nDatabse Query Exception :' + str(e.message)
         return None , result
@@ -470,7 +356,6 @@ def GenerateQueryData(queryoptions):
     if (result != ''):    
         return None , result
     else:
-        queryresult , result = GenerateReport(row1,queryoptions)
         if (queryresult == None):
             return None ,  "Generate Report have error!"
         else:
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""生成网管数据库查询的SQL语句和绑定变量。
+
+时间范围使用 period_start_time >= :start_time and period_start_time < :stop_time，
+可以使用时间列上的索引；网元名称、告警号等都作为绑定变量传入，不拼接到SQL里。
+
+    sql,binds = build_stat_sql(table_name,column_list,queryoptions)
+    cursor.execute(sql,binds)
+"""
+import re
+import datetime
+## strptime imports _strptime at the first call, which is not thread-safe in
+## python 2, import it before the queries run in the threads of QueryEngine.
+import _strptime
+
+## the object class id of the elements in UTP_COMMON_OBJECTS.
+MME_OBJECT_CLASS = 3766
+SAEGW_OBJECT_CLASS = 3529
+
+_identifier = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+class SQLBuilderError(ValueError):
+    pass
+
+def check_identifier(name):
+    """the column names can't be bound, so only the plain identifiers are
+    allowed in SQL.
+    """
+    if not _identifier.match(name):
+        raise SQLBuilderError("Invalid column name: %r" % name)
+    return name
+
+def time_window(queryoptions):
+    """return the (start_time, stop_time) of the query. the stop time is
+    included to the minute, the same as comparing the 'yyyy/mm/dd/hh24mi'
+    strings, so stop_time is the next minute of it.
+    """
+    try:
+        start = datetime.datetime.strptime(queryoptions.startdate + queryoptions.starttimeall,'%Y/%m/%d%H%M')
+        stop = datetime.datetime.strptime(queryoptions.stopdate + queryoptions.stoptimeall,'%Y/%m/%d%H%M')
+    except ValueError, e:
+        raise SQLBuilderError("Invalid time of query: %s" % e)
+    return start,stop + datetime.timedelta(minutes=1)
+
+class QueryBuilder(object):
+    """Build a select statement with bind variables.
+
+    q = QueryBuilder()
+    q.select("objects.CO_NAME")
+    q.table("UTP_COMMON_OBJECTS objects")
+    q.where("objects.CO_NAME = :element",element='SHMME03BNK')
+    sql,binds = q.build()
+    """
+    def __init__(self):
+        self._select = []
+        self._from = []
+        self._where = []
+        self._group = []
+        self._order = []
+        self.binds = {}
+
+    def select(self,*columns):
+        self._select.extend(columns)
+        return self
+
+    def table(self,*tables):
+        self._from.extend(tables)
+        return self
+
+    def where(self,clause,**binds):
+        self._where.append(clause)
+        self.binds.update(binds)
+        return self
+
+    def where_in(self,column,name,values):
+        """column in (:name_0, :name_1, ...)
+        """
+        names = []
+        for index,value in enumerate(values):
+            bind_name = "%s_%s" % (name,index)
+            names.append(":" + bind_name)
+            self.binds[bind_name] = value
+        self._where.append("%s in (%s)" % (column,", ".join(names)))
+        return self
+
+    def where_between(self,column,start,stop):
+        """the index-friendly range: column >= :start_time and column < :stop_time
+        """
+        return self.where("%s >= :start_time and %s < :stop_time" % (column,column),
+                          start_time=start,stop_time=stop)
+
+    def group_by(self,*columns):
+        self._group.extend(columns)
+        return self
+
+    def order_by(self,*columns):
+        self._order.extend(columns)
+        return self
+
+    def build(self):
+        """return the (SQL, binds).
+        """
+        sql = "select " + ",\n".join(self._select)
+        sql += "\nfrom " + ", ".join(self._from)
+        if self._where:
+            sql += "\nwhere " + "\nand ".join(self._where)
+        if self._group:
+            sql += "\ngroup by " + ", ".join(self._group)
+        if self._order:
+            sql += "\norder by " + ", ".join(self._order)
+        return sql,dict(self.binds)
+
+def build_alarm_sql(table_name,column_list,queryoptions):
+    """return the (SQL, binds) of the alarm query.
+    the counters could contain alarm numbers like 'ALARM,3604,2101'.
+    """
+    q = QueryBuilder()
+    q.select("objects.CO_NAME","DN","alarm_number","alarm_time","cancel_time","alarm_status",
+             "alarm_type","severity","text","fx_alarm.SUPPLEMENTARY_INFO")
+    q.table(check_identifier(table_name),"UTP_COMMON_OBJECTS objects")
+    q.where("NE_GID = objects.CO_GID")
+    if (queryoptions.selectunittype == "MME" or queryoptions.selectunittype == "TA_ID"):
+        q.where("objects.CO_OC_ID = :object_class",object_class=MME_OBJECT_CLASS)
+    else:
+        q.where("objects.CO_OC_ID = :object_class",object_class=SAEGW_OBJECT_CLASS)
+
+    alarm_numbers = [n.strip() for n in queryoptions.selectcounters.split(',')[1:] if n.strip()]
+    if alarm_numbers:
+        try:
+            alarm_numbers = [int(n) for n in alarm_numbers]
+        except ValueError:
+            raise SQLBuilderError("Invalid alarm number in: %s" % queryoptions.selectcounters)
+        q.where_in("alarm_number","alarm_number",alarm_numbers)
+    if (queryoptions.selectelement != 'ALL'):
+        q.where("objects.CO_NAME = :element",element=queryoptions.selectelement)
+    q.where_between("alarm_time",*time_window(queryoptions))
+    q.order_by("objects.CO_GID","alarm_type desc","severity asc")
+    return q.build()
+
+def build_stat_sql(table_name,column_list,queryoptions):
+    """return the (SQL, binds) of the counters query.
+    """
+    unittype = queryoptions.selectunittype
+    element_unit = (unittype == 'MME' or unittype == 'SAEGW')
+    if (queryoptions.selectperiod == '15'):
+        time_format = 'hh24:mi'
+    else:
+        time_format = 'hh24'
+    date_column = "to_char(period_start_time,'yyyy/mm/dd')"
+    time_column = "to_char(period_start_time,'%s')" % time_format
+
+    q = QueryBuilder()
+    q.select("objects.CO_NAME",date_column + " Sdate",time_column + " Stime")
+    if element_unit:
+        q.select("'ALL' as ElementType")
+    else:
+        q.select(check_identifier(unittype) + " as ElementType")
+    for counter in queryoptions.selectcounters.split(','):
+        counter = check_identifier(counter.strip())
+        if column_list and counter not in column_list:
+            raise SQLBuilderError("Counter %s is not in table %s" % (counter,table_name))
+        q.select("sum(%s)" % counter)
+
+    q.table(check_identifier(table_name) + " g","UTP_COMMON_OBJECTS objects")
+    # if unit type is MME or TAC, the stat table should use fins_id as id, otherwise use fing_id
+    if (unittype == 'MME' or unittype == 'TAC'):
+        q.where("g.FINS_ID = objects.CO_GID")
+    else:
+        q.where("g.FING_ID = objects.CO_GID")
+    if (queryoptions.selectelement != 'ALL'):
+        q.where("objects.CO_NAME = :element",element=queryoptions.selectelement)
+    q.where_between("g.period_start_time",*time_window(queryoptions))
+
+    q.group_by(date_column,time_column,"objects.CO_NAME")
+    if not element_unit:
+        q.group_by(unittype)
+    q.order_by("objects.CO_NAME",date_column,time_column)
+    return q.build()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Test the OSS_query_engine with a sqlite database in place of the OSS.
+
+    python test_OSS_query_engine.py
+"""
+import os
+import sqlite3
+import time
+import tempfile
+import threading
+from OSS_query_engine import QueryEngine, make_request
+
+class SqliteConfigs(object):
+    """the same structure as NSNG_OSS_config.
+    """
+    NSNG_OSS_database = {'database': [{'name':'MME_database','db':'oss','ip':'127.0.0.1',
+                                       'port':'51063','user':'omc','password':'omc'}]}
+    NSNG_OSS_NE = {'NE': [{'name':'SHMME03BNK','database':'MME_database'},
+                          {'name':'SHMME04BNK','database':'MME_database'}]}
+    NSNG_OSS_tables_views = {'NE_OSS_table_view': [
+        {'tables': {'name':'PCOFNS_PS_MMMT_TA_RAW',
+                    'columns': {'column': ['EPS_ATTACH_ATTEMPT','EPS_TAU_ATTEMPT']}}},
+        {'tables': {'name':'FX_ALARM',
+                    'columns': {'column': ['ALARM_TYPE']}}},
+    ]}
+
+## Oracle to_char of the formats used in the SQL, the time is stored as
+## 'YYYY-MM-DD HH:MM:SS' in sqlite.
+_formats = {'yyyy/mm/dd':'%Y/%m/%d', 'hh24:mi':'%H:%M', 'hh24':'%H',
+            'yyyy/mm/dd/hh24mi':'%Y/%m/%d/%H%M'}
+
+def to_char(value,fmt):
+    import datetime
+    t = datetime.datetime.strptime(value,'%Y-%m-%d %H:%M:%S')
+    return t.strftime(_formats[fmt])
+
+def create_database(filename):
+    db = sqlite3.connect(filename)
+    db.executescript("""
+create table UTP_COMMON_OBJECTS (CO_GID integer, CO_NAME text, CO_OC_ID integer);
+create table PCOFNS_PS_MMMT_TA_RAW (FINS_ID integer, PERIOD_START_TIME text,
+                                    EPS_ATTACH_ATTEMPT integer, EPS_TAU_ATTEMPT integer);
+create table FX_ALARM (NE_GID integer, DN text, ALARM_NUMBER integer, ALARM_TIME text,
+                       CANCEL_TIME text, ALARM_STATUS integer, ALARM_TYPE integer,
+                       SEVERITY integer, TEXT text, SUPPLEMENTARY_INFO text);
+insert into UTP_COMMON_OBJECTS values (1,'SHMME03BNK',3766);
+insert into UTP_COMMON_OBJECTS values (2,'SHMME04BNK',3766);
+""")
+    for gid in (1,2):
+        for minute in range(0,60,15):
+            for ta in range(3):
+                db.execute("insert into PCOFNS_PS_MMMT_TA_RAW values (?,?,?,?)",
+                           (gid,'2016-07-19 10:%02d:00' % minute,gid*100+minute,ta))
+        for i in range(5):
+            db.execute("insert into FX_ALARM values (?,?,?,?,?,?,?,?,?,?)",
+                       (gid,'PLMN-1/MME-%s' % gid,3604 if i%2 else 2101,'2016-07-19 10:%02d:00' % (i*10),
+                        None,1,i%3,i%4,'alarm %s' % i,''))
+    db.commit()
+    db.close()
+
+class SqliteConnector(object):
+    def __init__(self,filename,delay=0):
+        self.filename = filename
+        self.delay = delay
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def __call__(self,database):
+        with self._lock:
+            self.connections += 1
+        time.sleep(self.delay)
+        conn = sqlite3.connect(self.filename,check_same_thread=False)
+        conn.create_function('to_char',2,to_char)
+        return conn
+
+def make_engine(**kwargs):
+    filename = os.path.join(tempfile.mkdtemp(),'oss.db')
+    create_database(filename)
+    connector = SqliteConnector(filename)
+    return QueryEngine(configs=SqliteConfigs(),connect=connector,**kwargs),connector
+
+def test_query_stat():
+    engine,connector = make_engine()
+    request = make_request('SHMME03BNK','EPS_ATTACH_ATTEMPT,EPS_TAU_ATTEMPT',
+                           '2016/07/19','1000','2016/07/19','1030')
+    rows = engine.query(request)
+    assert rows == [('SHMME03BNK','2016/07/19','10:00','ALL',300,3),
+                    ('SHMME03BNK','2016/07/19','10:15','ALL',345,3),
+                    ('SHMME03BNK','2016/07/19','10:30','ALL',390,3)], rows
+    engine.close()
+
+def test_query_batch():
+    engine,connector = make_engine(pool_size=2,workers=4,arraysize=2)
+    requests = []
+    for i in range(10):
+        element = ['SHMME03BNK','SHMME04BNK'][i%2]
+        requests.append(make_request(element,'EPS_ATTACH_ATTEMPT','2016/07/19','1000','2016/07/19','1100'))
+        requests.append(make_request(element,'ALARM,3604','2016/07/19','1000','2016/07/19','1100'))
+    requests.append(make_request('UNKNOWN','ALARM','2016/07/19','1000','2016/07/19','1100'))
+
+    results = {}
+    errors = {}
+    for request,rows,errmsg in engine.query_batch(requests):
+        if errmsg:
+            errors[id(request)] = errmsg
+            continue
+        assert len(rows) <= 2
+        results.setdefault(id(request),[]).extend(rows)
+
+    assert len(errors) == 1
+    for request in requests[:-1]:
+        rows = results[id(request)]
+        if request.selectcounters.startswith('ALARM'):
+            assert [row[2] for row in rows] == [3604,3604]
+        else:
+            assert len(rows) == 4
+            assert all(row[0] == request.selectelement for row in rows)
+        assert rows == engine.query(request)
+    ## 20 queries share at most 2 connections of the database.
+    assert connector.connections <= 2, connector.connections
+    engine.close()
+
+def test_stop_reading():
+    engine,connector = make_engine(pool_size=2,workers=2,arraysize=1)
+    requests = [make_request('SHMME03BNK','EPS_ATTACH_ATTEMPT','2016/07/19','1000','2016/07/19','1100')
+                for i in range(6)]
+    batch = engine.query_batch(requests)
+    batch.next()
+    batch.close()
+    ## the engine is still usable after the reading is stopped.
+    assert len(engine.query(requests[0])) == 4
+    engine.close()
+
+def test_failed_connections():
+    ## the database without tables, every query fails and its connection is
+    ## discarded, the workers waiting for a connection open new ones.
+    filename = os.path.join(tempfile.mkdtemp(),'empty.db')
+    sqlite3.connect(filename).close()
+    connector = SqliteConnector(filename,delay=0.5)
+    engine = QueryEngine(configs=SqliteConfigs(),connect=connector,pool_size=2,workers=4)
+    requests = [make_request('SHMME03BNK','EPS_ATTACH_ATTEMPT','2016/07/19','1000','2016/07/19','1100')
+                for i in range(4)]
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(engine.query_batch(requests)))
+    thread.daemon = True
+    thread.start()
+    thread.join(30)
+    assert not thread.is_alive(), "query_batch is blocked"
+    assert len(results) == 4, results
+    assert sorted(id(request) for request,rows,errmsg in results) == sorted(id(r) for r in requests)
+    assert all(rows is None and errmsg for request,rows,errmsg in results)
+    engine.close()
+
+if __name__ == "__main__":
+    for name,func in sorted(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print name,'OK'
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Test the report file of OSS_query_v2 and the reader of the check modules.
+
+    python test_OSS_report.py
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import OSS_query_v2
+from OSS_query_v2 import GenerateReportFile, getClientEncoding
+from OSS_query_engine import make_request
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from libs.ossreport import read_report
+
+def write_report(rows,counters):
+    request = make_request('SHMME03BNK',counters,'2016/07/19','1000','2016/07/19','1100')
+    request.reportfilename = 'NE_test.json'
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        reportfile,result = GenerateReportFile(iter(rows),request)
+        assert result == ''
+        return os.path.abspath(reportfile.name)
+    finally:
+        os.chdir(cwd)
+
+def test_write_read():
+    rows = [('SHMME03BNK','PLMN-1/MME-1',3604,'2016-07-19 10:10:00',None,1,1,1,'alarm "1"',u'告警'),
+            ('SHMME03BNK','PLMN-1/MME-1',2101,'2016-07-19 10:20:00',None,1,2,3,'alarm\n2','')]
+    filename = write_report(rows,'ALARM')
+    with open(filename) as f:
+        lines = f.readlines()
+    assert len(lines) == 3
+    assert json.loads(lines[0])['columndesc'][2] == 'Alarm Number'
+
+    columndesc,data = read_report(filename)
+    assert len(columndesc) == 10
+    data = list(data)
+    assert data[0][2] == '3604' and data[0][4] == 'None' and data[0][9] == u'告警'
+    assert data[1][8] == 'alarm\n2'
+    shutil.rmtree(os.path.dirname(os.path.dirname(filename)))
+
+def test_client_charset():
+    assert getClientEncoding('SIMPLIFIED CHINESE_CHINA.ZHS16GBK') == 'gbk'
+    assert getClientEncoding('AMERICAN_AMERICA.AL32UTF8') == 'utf-8'
+    assert getClientEncoding('') == 'utf-8'
+
+def test_write_gbk():
+    ## the alarm text fetched under NLS_LANG=SIMPLIFIED CHINESE_CHINA.ZHS16GBK
+    rows = [('SHMME03BNK','PLMN-1/MME-1',3604,'2016-07-19 10:10:00',None,1,1,1,
+             u'告警'.encode('gbk'),u'附加信息'.encode('gbk'))]
+    encoding = OSS_query_v2.DB_ENCODING
+    OSS_query_v2.DB_ENCODING = 'gbk'
+    try:
+        filename = write_report(rows,'ALARM')
+    finally:
+        OSS_query_v2.DB_ENCODING = encoding
+    columndesc,data = read_report(filename)
+    data = list(data)
+    assert len(data) == 1
+    assert data[0][8] == u'告警' and data[0][9] == u'附加信息'
+    shutil.rmtree(os.path.dirname(os.path.dirname(filename)))
+
+def test_read_old_report():
+    filename = os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','log',
+                            'NESta_ALL_201607251000_201607251200_15_SAEGW.json')
+    columndesc,data = read_report(filename)
+    with open(filename) as f:
+        report = json.load(f)
+    assert columndesc == report['columndesc']
+    assert list(data) == report['columns']
+
+if __name__ == "__main__":
+    for name,func in sorted(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print name,'OK'
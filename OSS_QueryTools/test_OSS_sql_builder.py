@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Test the SQL text and the bind variables of OSS_sql_builder.
+
+    python test_OSS_sql_builder.py
+"""
+import datetime
+from OSS_sql_builder import build_alarm_sql, build_stat_sql, QueryBuilder, SQLBuilderError
+from OSS_query_engine import make_request
+
+start = datetime.datetime(2016,7,19,10,0)
+stop = datetime.datetime(2016,7,19,12,1)
+
+def test_builder():
+    q = QueryBuilder()
+    q.select("a","b").table("t").where("a = :a",a=1).where_in("b","b",[3,4])
+    sql,binds = q.build()
+    assert sql == "select a,\nb\nfrom t\nwhere a = :a\nand b in (:b_0, :b_1)", sql
+    assert binds == {'a':1,'b_0':3,'b_1':4}
+
+def test_alarm_sql():
+    request = make_request('SHMME03BNK','ALARM,3604,2101','2016/07/19','1000','2016/07/19','1200')
+    sql,binds = build_alarm_sql('FX_ALARM',['ALARM_TYPE'],request)
+    assert "alarm_number in (:alarm_number_0, :alarm_number_1)" in sql
+    assert "objects.CO_NAME = :element" in sql
+    assert "alarm_time >= :start_time and alarm_time < :stop_time" in sql
+    assert "to_char" not in sql and "SHMME03BNK" not in sql
+    assert binds == {'object_class':3766,'alarm_number_0':3604,'alarm_number_1':2101,
+                     'element':'SHMME03BNK','start_time':start,'stop_time':stop}, binds
+
+def test_alarm_sql_all():
+    request = make_request('ALL','ALARM','2016/07/19','1000','2016/07/19','1200',unittype='SAEGW')
+    sql,binds = build_alarm_sql('FX_ALARM',['ALARM_TYPE'],request)
+    assert "alarm_number" not in binds and "element" not in binds
+    assert " in (" not in sql and ":element" not in sql
+    assert binds['object_class'] == 3529
+
+def test_stat_sql():
+    request = make_request('SHMME03BNK','EPS_ATTACH_ATTEMPT,EPS_TAU_ATTEMPT','2016/07/19','1000',
+                           '2016/07/19','1200',period='60',unittype='TA_ID')
+    sql,binds = build_stat_sql('PCOFNS_PS_MMMT_TA_RAW',['EPS_ATTACH_ATTEMPT','EPS_TAU_ATTEMPT'],request)
+    assert "TA_ID as ElementType" in sql
+    assert "sum(EPS_ATTACH_ATTEMPT),\nsum(EPS_TAU_ATTEMPT)" in sql
+    assert "g.FING_ID = objects.CO_GID" in sql
+    assert "g.period_start_time >= :start_time and g.period_start_time < :stop_time" in sql
+    assert "group by to_char(period_start_time,'yyyy/mm/dd'), to_char(period_start_time,'hh24'), objects.CO_NAME, TA_ID" in sql
+    assert binds == {'element':'SHMME03BNK','start_time':start,'stop_time':stop}, binds
+
+def test_invalid_input():
+    request = make_request('SHMME03BNK',"EPS_ATTACH_ATTEMPT) from dual--",'2016/07/19','1000','2016/07/19','1200')
+    for args in [('PCOFNS_PS_MMMT_TA_RAW',[],request),
+                 ('PCOFNS_PS_MMMT_TA_RAW',['EPS_TAU_ATTEMPT'],make_request('SHMME03BNK','EPS_ATTACH_ATTEMPT',
+                                                                           '2016/07/19','1000','2016/07/19','1200')),
+                 ('PCOFNS_PS_MMMT_TA_RAW',[],make_request('SHMME03BNK','EPS_ATTACH_ATTEMPT',
+                                                          '2016/07/19','10:00','2016/07/19','1200'))]:
+        try:
+            build_stat_sql(*args)
+        except SQLBuilderError:
+            continue
+        assert False, args
+    try:
+        build_alarm_sql('FX_ALARM',[],make_request('ALL','ALARM,3604 or 1=1','2016/07/19','1000','2016/07/19','1200'))
+    except SQLBuilderError:
+        pass
+    else:
+        assert False
+
+if __name__ == "__main__":
+    for name,func in sorted(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print name,'OK'
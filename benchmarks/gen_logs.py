@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Synthetic log generator
+
+generate the logs for the load testing of the checker:
+  ns     FlexiNS MML transcripts, parsed by FlexiNSSpliter.
+  ng     FlexiNG fsclish/ldapsearch/ssh dumps.
+  alarm  OSS alarm report NEAlarm_*.json (JSON Lines).
+  stat   OSS counter report NESta_*.json (JSON Lines).
+
+the logs are written line by line, so any size could be generated. the
+same seed generates the same logs.
+
+Usage:
+    gen_logs.py ns|ng|alarm|stat [options]
+
+examples:
+    #3 FlexiNS logs with 40 units, 200 alarms, 500 counters, 2 rounds
+    gen_logs.py ns --elements 3 --units 40 --alarms 200 --counters 500 --rounds 2
+
+    #FlexiNG logs with 8 AS/SAB nodes and 300 sensors in every shelf
+    gen_logs.py ng --elements 2 --nodes 8 --sensors 300
+
+    #an OSS alarm report of 10 million rows (about 2.5GB)
+    gen_logs.py alarm --rows 10000000 --netype MME --outdir /data/bench
+"""
+import os
+import sys
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+DEFAULT_OUTDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),'data','generated')
+START_TIME = datetime(2016,7,25,10,0)
+## the interval of the OSS counters, minutes.
+STAT_INTERVAL = 15
+
+NS_UNIT_TYPES  = ['MMDU','CPPU','IPDU','PAPU','IPPU','SMMU','CPU','OMU']
+NS_VERSIONS    = [('FB160718','FB','N6 1.24-1'),('FB160707','BU','N6 1.24-1'),
+                  ('N6012401','NW','N6 1.24-1')]
+NG_VERSION     = 'R_NG15_MP1_r315118_AB4'
+## the frames and slots(ipmb address) known by NS_SensorData.
+SHELF_FRAMES   = ['10.200.200.10','10.200.200.12','10.200.200.14']
+SHELF_SLOTS    = ['9e','9a','96','92','8e','8a','86','82','84','88','8c','90','94','98','9c','a0','20']
+SENSOR_NAMES   = ['Local Temp','CPU0 Temp','CPU1 Temp','Inlet Temp','Outlet Temp','RTM Temp']
+NS_COUNTERS    = ['EPS ATTACH SUCC','EPS ATTACH FAIL','EPS DETACH','EPS TAU SUCC','EPS TAU FAIL',
+                  'EPS SERVICE REQUEST SUCC','EPS SERVICE REQUEST FAIL','EPS PAGING PROCEDURE SUCC',
+                  'EPS PAGING PROCEDURE FAIL']
+ALARMS         = [('3604','S1C SCTP ASSOCIATION FAILURE','1'),('2101','WORKING STATE CHANGED','2'),
+                  ('1072','SIGNALLING LINK OUT OF SERVICE','1'),('3019','NETWORK ELEMENT FAULT','3'),
+                  ('70166','UNIT TEMPERATURE HIGH','2'),('3186','DIAMETER PEER CONNECTION LOST','1'),
+                  ('1922','PROCESSING CAPACITY EXCEEDED','3'),('2692','SUBSCRIBER DATABASE FULL','4')]
+ALARM_COLUMNS  = ['NE_NAME','DN','Alarm Number','Alarm Timer','Cancel Timer','Alarm Status',
+                  'Alarm Type','Alarm Severity','Alarm Text','Alarm Supp Info']
+STAT_COLUMNS   = ['NE_NAME','Date','Time','StatType']
+
+def args_parse():
+    parser = argparse.ArgumentParser()
+    parser.usage = __doc__
+    parser.add_argument('logtype', choices=['ns','ng','alarm','stat'],
+                        help="the type of the logs.")
+    parser.add_argument('-o','--outdir', default=DEFAULT_OUTDIR,
+                        help="the directory of the logs.")
+    parser.add_argument('-e','--elements', type=int, default=1,
+                        help="number of network elements, one log per element for ns/ng.")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="the random seed.")
+    parser.add_argument('--rounds', type=int, default=1,
+                        help="ns/ng: collect the units, alarms, counters and sensors n times.")
+    parser.add_argument('--units', type=int, default=24,
+                        help="ns: number of units.")
+    parser.add_argument('--alarms', type=int, default=50,
+                        help="ns: number of active alarms.")
+    parser.add_argument('--counters', type=int, default=100,
+                        help="ns: number of counters; stat: number of counter columns.")
+    parser.add_argument('--sensors', type=int, default=100,
+                        help="ns/ng: number of sensor rows in every shelf.")
+    parser.add_argument('--nodes', type=int, default=4,
+                        help="ng: number of AS and SAB nodes.")
+    parser.add_argument('--profiles', type=int, default=10,
+                        help="ng: number of session profiles and pcc rules.")
+    parser.add_argument('--rows', type=int, default=1000,
+                        help="alarm/stat: number of rows.")
+    parser.add_argument('--netype', default='MME',
+                        help="alarm/stat: the element type in the report name, MME or SAEGW.")
+    return parser.parse_args()
+
+def hostname(netype,index):
+    return "GEN%s%02dBNK" % (netype,index+1)
+
+def timestamp(t):
+    return t.strftime("%Y-%m-%d  %H:%M:%S")
+
+###############################################################
+# FlexiNS MML transcript
+###############################################################
+def mml_command(command,title,setname,host,t,lines):
+    """return the text of one MML command, the same as the terminal output:
+    the command, output, 'COMMAND EXECUTED' and the prompt of command set.
+    """
+    return ''.join(["< %s\n\n" % command,
+                    "LOADING PROGRAM VERSION 12.7-0\n\n",
+                    "Flexi NS  %-24s  %s\n\n" % (host,timestamp(t)),
+                    ''.join(line + "\n" for line in lines),
+                    "\nCOMMAND EXECUTED\n\n\n",
+                    "%s COMMAND <%s_>\n" % (title,setname)])
+
+def ns_version(host,t):
+    lines = ["PACKAGES CREATED IN OMU:","",
+             "    SW-PACKAGE     STATUS   DIRECTORY           ENVIRONMENT          DEF  ACT",
+             "                            PACKAGE-ID (REP-ID) DELIVERY",""]
+    for package,status,version in NS_VERSIONS:
+        lines.append("    %-14s %-8s %-19s %-20s %s    Y " % (package,status,package,version,
+                                                              'Y' if status == 'BU' else '-'))
+        lines.append("                            %-19s CID000NX 10.23-1  " % version)
+        lines.append("")
+    return mml_command('ZWQO:CR;','SOFTWARE PACKAGE ADMINISTRATION','WQ',host,t,lines)
+
+def ns_om_config(host,t,c_num):
+    lines = ["CON  TYPE     SW  C-NUM   ID  NAME         LOCATION          CHA  STATE  CTYP"," ",
+             "000  DX220     5  %s      %-12s GENLOCATION" % (c_num,host)]
+    return mml_command('ZQNI;','O&M NETWORK HANDLING','QN',host,t,lines)
+
+def ns_units(host,t,units,rnd):
+    lines = ["WORKING STATE OF UNITS"," UNIT       PHYS STATE LOCATION              INFO"]
+    for n in range(units):
+        unit = "%s-%s" % (NS_UNIT_TYPES[n % len(NS_UNIT_TYPES)],n // len(NS_UNIT_TYPES))
+        state = rnd.choice(['WO-EX','WO-EX','SP-EX','SE-NH'])
+        lines.append(" %-15s %-28s -" % (unit,state))
+    lines.extend(["","TOTAL OF %s     UNITS" % units])
+    return mml_command('ZUSI;','WORKING STATE AND RESTART HANDLING','US',host,t,lines)
+
+def ns_alarms(host,t,alarms,units,rnd):
+    lines = ["ALARMS CURRENTLY ON",""]
+    for n in range(alarms):
+        number,text,severity = rnd.choice(ALARMS)
+        unit = "%s-%s" % (rnd.choice(NS_UNIT_TYPES),rnd.randint(0,max(units // len(NS_UNIT_TYPES),1)))
+        alarm_time = t - timedelta(seconds=rnd.randint(0,86400))
+        lines.extend(["%s  %-11s SWITCH    %s.%02d" % (host,unit,timestamp(alarm_time),rnd.randint(0,99)),
+                      "%-3s ALARM   %-11s 1A001-00  %s" % ('*' * int(severity),unit,unit.split('-')[0]),
+                      "    (%04d) %s %s" % (n,number,text),
+                      "    %s" % rnd.randint(0,0xffff),""])
+    lines.append("END OF ALARMS CURRENTLY ON")
+    return mml_command('ZAHO;','ALARM HISTORY HANDLING','AH',host,t,lines)
+
+def ns_counters(host,t,counters,rnd):
+    lines = ["DISPLAY MME COUNTERS","","","MM",
+             "COUNTERS                                                         LAST      ",
+             "-" * 79]
+    for n in range(counters):
+        name = "%s %s" % (NS_COUNTERS[n % len(NS_COUNTERS)],n // len(NS_COUNTERS))
+        lines.append("M%sC%03d   %-52s %010d" % (50 + n // 1000,n % 1000,name,rnd.randint(0,2000000)))
+    return mml_command('ZTPP:MMMT;','E-UTRAN CONFIGURATION HANDLING','B6',host,t,lines)
+
+def sensor_rows(sensors,rnd):
+    lines = []
+    for n in range(sensors):
+        slot = SHELF_SLOTS[n % len(SHELF_SLOTS)]
+        if n % 3:
+            value = rnd.uniform(2.5,3.6)
+            lines.extend(['%s: LUN: 0, Sensor # %s ("%s")' % (slot,n,"3V3_%s" % n),
+                          '    Type: Threshold (0x01), "Voltage" (0x02)',
+                          '    Belongs to entity (0xa0, 0x60): FRU # 0',
+                          '    Status: 0xc0',
+                          '        All event messages enabled from this sensor',
+                          '        Sensor scanning enabled',
+                          '        Initial update completed',
+                          '    Raw data: %d (0x%02x)' % (value * 50,int(value * 50)),
+                          '    Processed data: %.6f Volts' % value,
+                          '    Status: 0xc0',''])
+        else:
+            value = rnd.randint(20,75)
+            lines.extend(['%s: LUN: 0, Sensor # %s ("%s")' % (slot,n,rnd.choice(SENSOR_NAMES)),
+                          '    Type: Threshold (0x01), "Temperature" (0x01)',
+                          '    Belongs to entity (0xa0, 0x60): FRU # 0',
+                          '    Status: 0xc0',
+                          '        All event messages enabled from this sensor',
+                          '        Sensor scanning enabled',
+                          '        Initial update completed',
+                          '    Raw data: %d (0x%02x)' % (value,value),
+                          '    Processed data: %.6f degrees C' % value,
+                          '    Status: 0xc0',''])
+    return lines
+
+def ns_sensors(host,t,sensors,rnd):
+    """the sensor data of the shelf managers, collected in the service
+    terminal session(ZDDS) via VIMMLA.
+    """
+    lines = ["< ZDDS;","","LOADING PROGRAM VERSION 8.22-0","",
+             "Flexi NS  %-24s  %s" % (host,timestamp(t)),"",
+             "WELCOME TO SERVICE TERMINAL DIALOGUE","",
+             "0000-MAN> ZLP:2,VIM",""]
+    for frame in SHELF_FRAMES:
+        lines.extend(["0000-VIM> Z2CT:0:%s" % frame,"",
+                      "VIMMLA: connecting to: %s" % frame,
+                      "                                    VIMMLA: connected to: %s" % frame,"",
+                      "shmm500 login: root","Password: ","# clia sensordata","",
+                      "Pigeon Point Shelf Manager Command Line Interpreter",""])
+        lines.extend(sensor_rows(sensors,rnd))
+        lines.extend(["# exit",""])
+    lines.extend(["0000-VIM> ZZZ","","0000-MAN> ZE","","END OF SERVICE TERMINAL SESSION","",
+                  "COMMAND EXECUTED","","","REMOTE DEBUGGER SESSION COMMAND <DD_>"])
+    return ''.join(line + "\n" for line in lines)
+
+def ns_transcript(host,options,rnd):
+    """yield the text blocks of the FlexiNS log.
+    """
+    t = START_TIME
+    yield ''.join(["ENTER USERNAME < SYSTEM\n\n","ENTER PASSWORD < ***************\n\n",
+                   "Flexi NS  %-24s  %s\n\n" % (host,timestamp(t)),
+                   "                       WELCOME TO THE DX 200 SERIES DIALOGUE\n\n\n",
+                   "MAIN LEVEL COMMAND <___>\n"])
+    yield ns_version(host,t)
+    yield ns_om_config(host,t,rnd.randint(100000,999999))
+    for n in range(options.rounds):
+        t = START_TIME + timedelta(minutes=STAT_INTERVAL * n)
+        yield ns_units(host,t,options.units,rnd)
+        yield ns_alarms(host,t,options.alarms,options.units,rnd)
+        yield ns_counters(host,t,options.counters,rnd)
+        yield ns_sensors(host,t,options.sensors,rnd)
+    yield "< ZZZ;\n\nEND OF DIALOGUE SESSION\n"
+
+###############################################################
+# FlexiNG fsclish/ldapsearch/ssh dump
+###############################################################
+def ng_nodes(nodes):
+    return ["AS-%s" % (n // 2 + 1) if n % 2 == 0 else "SAB-%s" % (n // 2 + 1) for n in range(nodes)]
+
+def ng_transcript(host,options,rnd):
+    """yield the text blocks of the FlexiNG log.
+    """
+    bash = "[root@CLA-0(%s) /root]\n" % host
+    clish = "root@CLA-0 [%s]  > " % host
+    yield ''.join(["Nokia - Flexi NG16\n\n",bash,"# fsclish\n",
+                   clish,"show sw-manage list \n%s\n\n" % NG_VERSION,
+                   "# ClusterRoot\n","dn: fsClusterId=ClusterRoot\n","objectClass: FSCluster\n",
+                   "fsClusterId: ClusterRoot\n","fsLogicalNetworkElemId: %s\n" % host,
+                   "fsStaticDataDelivery: %s\n" % NG_VERSION,"fsLogicalNetworkElemType: FING\n"])
+    yield ''.join([bash,"# fsclish\n",
+                   clish,"show config fsClusterId=ClusterRoot fsFragmentId=FlexiNG fsFragmentId=Internal\n",
+                   "dn: fsFragmentId=Internal,fsFragmentId=FlexiNG,fsClusterId=ClusterRoot\n",
+                   "fsFragmentId: Internal\n","fngDpiHicut: %s\n" % rnd.randint(0,1),
+                   "fngSwVersion: NG16\n\n"])
+    for n in range(options.profiles):
+        yield ''.join([clish,"show ng session-profile profile-%s\n" % n,
+                       "session-profile-name = profile-%s\n" % n,
+                       "charchar-index = %s\n" % rnd.randint(0,3),
+                       "charging-profile = default\n\n"])
+    lines = [clish + "show ng service-awareness pcc-rule"]
+    for n in range(options.profiles):
+        lines.extend(["pcc-rule-name = rule-%s" % n,
+                      "filter-state = %s" % rnd.choice(['enable','enable','disable'])])
+    yield ''.join(line + "\n" for line in lines) + "\n"
+
+    nodes = ng_nodes(options.nodes)
+    for n in range(options.rounds):
+        t = START_TIME + timedelta(minutes=STAT_INTERVAL * n)
+        lines = [bash.rstrip(),"# ssh sm-1 clia sensordata","",
+                 "Pigeon Point Shelf Manager Command Line Interpreter",""]
+        lines.extend(sensor_rows(options.sensors,rnd))
+        for node in nodes:
+            lines.extend(["# ssh %s showstat|grep shm_gwup_proxy.gwup.sa.sa_rule.filter.interr.mem_alloc_failed_for_linear_filters" % node,
+                          "shm_gwup_proxy.gwup.sa.sa_rule.filter.interr.mem_alloc_failed_for_linear_filters = %s" % rnd.choice([0,0,0,1])])
+        for node in nodes:
+            chunks = rnd.randint(1000,50000)
+            lines.extend(['# grep "FASTPATH_MALLOC dynamic" /var/log/syslog-%s.log' % node,
+                          "%s %s info %s featuremem[1234]: FASTPATH_MALLOC dynamic allocated bytes [chunks]: %s/%s" % (
+                          t.strftime("%b %d %H:%M:%S"),node,node,chunks * rnd.randint(1000,20000),chunks)])
+        yield ''.join(line + "\n" for line in lines)
+    yield bash
+
+###############################################################
+# OSS reports
+###############################################################
+def report_name(prefix,netype,start,stop):
+    return "%s_ALL_%s_%s_%s_%s.json" % (prefix,start.strftime("%Y%m%d%H%M"),
+                                        stop.strftime("%Y%m%d%H%M"),STAT_INTERVAL,netype)
+
+def alarm_rows(options,rnd):
+    hosts = [hostname(options.netype,n) for n in range(options.elements)]
+    period = max(options.rows // 100,120) * 60
+    for n in xrange(options.rows):
+        number,text,severity = rnd.choice(ALARMS)
+        host = rnd.choice(hosts)
+        alarm_time = START_TIME + timedelta(seconds=rnd.randint(0,period))
+        cancel_time = alarm_time + timedelta(seconds=rnd.randint(1,3600))
+        yield [host,"PLMN-PLMN/FLEXINS-%s/FUUT-IPDU_%s" % (hosts.index(host),rnd.randint(0,9)),
+               number,alarm_time.strftime("%Y-%m-%d %H:%M:%S"),cancel_time.strftime("%Y-%m-%d %H:%M:%S"),
+               "0","4",severity,text,"100.71.%s.%s 0:0:0:0:0:0:0:0" % (rnd.randint(0,255),rnd.randint(0,255))]
+
+def stat_rows(options,rnd):
+    """the rows of every interval, one row per element.
+    """
+    hosts = [hostname(options.netype,n) for n in range(options.elements)]
+    base = [rnd.randint(1000,300000) for c in range(options.counters)]
+    n = 0
+    t = START_TIME
+    while n < options.rows:
+        for host in hosts:
+            if n >= options.rows:
+                break
+            values = [str(int(b * rnd.uniform(0.8,1.2) * (5 if rnd.random() < 0.01 else 1))) for b in base]
+            yield [host,t.strftime("%Y/%m/%d"),t.strftime("%H:%M"),"ALL"] + values
+            n += 1
+        t += timedelta(minutes=STAT_INTERVAL)
+
+def stat_period(options):
+    intervals = (options.rows + options.elements - 1) // max(options.elements,1)
+    return START_TIME + timedelta(minutes=STAT_INTERVAL * max(intervals,1))
+
+###############################################################
+# writing the logs
+###############################################################
+def write_blocks(filename,blocks):
+    with open(filename,'w') as f:
+        for block in blocks:
+            f.write(block)
+    return filename
+
+def write_report(filename,columndesc,rows):
+    """write the OSS report in JSON Lines, the same as OSS_query_v2.
+    """
+    with open(filename,'w') as f:
+        f.write(json.dumps({'columndesc':columndesc}) + '\n')
+        for row in rows:
+            f.write(json.dumps(row) + '\n')
+    return filename
+
+def generate(options):
+    """generate the logs, return the filenames.
+    """
+    rnd = random.Random(options.seed)
+    if not os.path.exists(options.outdir):
+        os.makedirs(options.outdir)
+
+    filenames = []
+    if options.logtype in ('ns','ng'):
+        netype = 'MME' if options.logtype == 'ns' else 'SAEGW'
+        transcript = ns_transcript if options.logtype == 'ns' else ng_transcript
+        for n in range(options.elements):
+            host = hostname(netype,n)
+            filename = os.path.join(options.outdir,"%s_%s.log" % (host,options.logtype))
+            filenames.append(write_blocks(filename,transcript(host,options,rnd)))
+    elif options.logtype == 'alarm':
+        stop = START_TIME + timedelta(seconds=max(options.rows // 100,120) * 60)
+        filename = os.path.join(options.outdir,report_name('NEAlarm',options.netype,START_TIME,stop))
+        filenames.append(write_report(filename,ALARM_COLUMNS,alarm_rows(options,rnd)))
+    else:
+        counters = ['QOS_DL_DROP_QCI'] + ["COUNTER_%03d" % c for c in range(1,options.counters)]
+        filename = os.path.join(options.outdir,report_name('NESta',options.netype,START_TIME,stat_period(options)))
+        filenames.append(write_report(filename,STAT_COLUMNS + counters[:options.counters],stat_rows(options,rnd)))
+    return filenames
+
+def main():
+    options = args_parse()
+    for filename in generate(options):
+        print("%s  %s bytes" % (filename,os.path.getsize(filename)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
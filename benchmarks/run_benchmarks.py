@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""SmartChecker benchmarks
+
+run the checklists against the sample logs in 'log/' scaled 1x, 10x, 100x,
+measure the parse time, the time of every module, the report render time
+and the peak RSS. every case runs in a new process, so the peak RSS and
+the imports of one case do not affect the others. the results are saved in
+json, and compared with the baseline results if it's given.
+
+Usage:
+    run_benchmarks.py [options]
+
+examples:
+    #run all the cases, save the results to benchmarks/results.json
+    run_benchmarks.py
+
+    #save the baseline, then check a change against it
+    run_benchmarks.py --scales 1,10 --output baseline.json
+    run_benchmarks.py --scales 1,10 --baseline baseline.json --threshold 20
+
+    #only the cases of the checklist
+    run_benchmarks.py -r check_ns_tn.ckl --repeat 3
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import traceback
+import subprocess
+
+BENCH_PATH = os.path.dirname(os.path.abspath(__file__))
+ROOT_PATH = os.path.dirname(BENCH_PATH)
+sys.path.insert(0,ROOT_PATH)
+
+from scale_logs import scale_log
+
+## (checklist, sample log in 'log/')
+CASES = [
+    ('check_ns_tn.ckl',            'MME09_sensor.log'),
+    ('check_ns_kpi.ckl',           'SHMCC_MME06_KPI.log'),
+    ('check_ns_sensordata.ckl',    'MME09_sensor.log'),
+    ('check_ns_parameter.ckl',     'MME08_parameter.log'),
+    ('check_ng_tn.ckl',            'GGSN19_sensor.log'),
+    ('check_ng_sensordata.ckl',    'GGSN19_sensor.log'),
+    ('check_ng_alarmanalysis.ckl', 'NEAlarm_ALL_201607251000_201607251200_15_SAEGW.json'),
+    ('check_ns_alarmanalysis.ckl', 'NEAlarm_ALL_201607251000_201607251200_15_MME.json'),
+    ('check_ng_droppacket.ckl',    'NESta_ALL_201607251000_201607251200_15_SAEGW.json'),
+]
+
+DEFAULT_SCALES     = '1,10,100'
+DEFAULT_DATADIR    = os.path.join(BENCH_PATH,'data')
+DEFAULT_OUTPUT     = os.path.join(BENCH_PATH,'results.json')
+## a metric regresses if it grows more than the threshold(percent) and more
+## than the minimum change, the small timings are too noisy to compare.
+DEFAULT_THRESHOLD  = 20.0
+DEFAULT_MIN_TIME   = 0.05
+DEFAULT_MIN_MEMORY = 4*1024*1024
+
+TIME_METRICS = ['parse','modules','render','total']
+
+def args_parse():
+    parser = argparse.ArgumentParser()
+    parser.usage = __doc__
+    parser.add_argument('-r','--checklist', action='append',
+                        help="run the cases of the checklist only, could be repeated.")
+    parser.add_argument('-s','--scales', default=DEFAULT_SCALES,
+                        help="the scales of the logs, default: %s" % DEFAULT_SCALES)
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="run every case n times, the fastest run is kept.")
+    parser.add_argument('--datadir', default=DEFAULT_DATADIR,
+                        help="the directory of the scaled logs.")
+    parser.add_argument('-o','--output', default=DEFAULT_OUTPUT,
+                        help="save the results to the json file.")
+    parser.add_argument('-b','--baseline',
+                        help="compare the results with the baseline json file.")
+    parser.add_argument('-t','--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="the regression threshold in percent, default: %s" % DEFAULT_THRESHOLD)
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                        help="ignore the time changes less than the seconds.")
+    parser.add_argument('--min-memory', type=int, default=DEFAULT_MIN_MEMORY,
+                        help="ignore the peak RSS changes less than the bytes.")
+    ## used by the benchmark itself to run one case in the child process.
+    parser.add_argument('--case', nargs=3, metavar=('CHECKLIST','LOGFILE','RESULT'),
+                        help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+###############################################################
+# run one case in the child process
+###############################################################
+def run_case(checklist_file,logfile):
+    """check the logfile, return the measurement of the case.
+    """
+    import smartchecker
+    from libs.checker import CheckList, ImportCheckModules
+    from libs.usage import peak_memory
+
+    outdir = tempfile.mkdtemp(prefix='smartchecker_bench_')
+    ## measure the parsing every time, the reports are thrown away.
+    smartchecker.PARSE_CACHE = None
+    smartchecker.SILENT      = True
+    smartchecker.SAVE_OUTPUT = outdir
+
+    try:
+        checklist = CheckList(os.path.join(smartchecker.CONFIG.checklist_path,checklist_file))
+        checklist.modules = ImportCheckModules(checklist)
+        start = time.time()
+        results,errmsg = smartchecker.check_logfile(checklist,logfile)
+        total = time.time() - start
+    finally:
+        shutil.rmtree(outdir,ignore_errors=True)
+
+    if not results:
+        return {'error':errmsg}
+    data = dict((key,results.timings.get(key)) for key in TIME_METRICS)
+    data['total'] = total
+    data['peak_rss'] = peak_memory()
+    data['module_times'] = dict((r.module_id,r.usage.wall) for r in results if r.usage)
+    return data
+
+def case_main(checklist_file,logfile,resultfile):
+    os.chdir(ROOT_PATH)
+    try:
+        data = run_case(checklist_file,logfile)
+    except Exception as e:
+        data = {'error':"%s: %s" % (e.__class__.__name__,e),
+                'traceback':traceback.format_exc()}
+    with open(resultfile,'w') as f:
+        json.dump(data,f)
+
+###############################################################
+# run the cases and compare the results
+###############################################################
+def measure(checklist_file,logfile):
+    """run the case in a child process, return the measurement.
+    """
+    fd,resultfile = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        cmd = [sys.executable,os.path.abspath(__file__),'--case',checklist_file,logfile,resultfile]
+        with open(os.devnull,'w') as devnull:
+            subprocess.call(cmd,cwd=ROOT_PATH,stdout=devnull,stderr=subprocess.STDOUT)
+        with open(resultfile) as f:
+            text = f.read()
+        return json.loads(text) if text else {'error':'the case was terminated.'}
+    finally:
+        os.remove(resultfile)
+
+def run_benchmarks(cases,scales,datadir,repeat=1,report=None):
+    results = []
+    for factor in scales:
+        for checklist_file,logname in cases:
+            logfile = scale_log(os.path.join(ROOT_PATH,'log',logname),datadir,factor)
+            best = None
+            for n in range(max(repeat,1)):
+                data = measure(checklist_file,logfile)
+                if 'error' in data or best is None or data['total'] < best['total']:
+                    best = data
+                if 'error' in data:
+                    break
+            case = {'checklist':checklist_file,'log':logname,'scale':factor,
+                    'size':os.path.getsize(logfile)}
+            case.update(best)
+            results.append(case)
+            if report:
+                report(case)
+    return {'python'  : platform.python_version(),
+            'platform': platform.platform(),
+            'time'    : time.strftime("%Y-%m-%d %H:%M:%S"),
+            'cases'   : results}
+
+def case_key(case):
+    return (case['checklist'],case['log'],case['scale'])
+
+def case_metrics(case):
+    """return {metric: (value, minimum change)} of the case.
+    """
+    return dict([(key,(case[key],'time')) for key in TIME_METRICS if case.get(key) is not None] +
+                [('peak_rss',(case['peak_rss'],'memory'))] +
+                [('module:%s' % k,(v,'time')) for k,v in case.get('module_times',{}).items()])
+
+def compare(baseline,current,threshold,min_time=DEFAULT_MIN_TIME,min_memory=DEFAULT_MIN_MEMORY):
+    """return the list of (case key, metric, baseline value, current value)
+    which regress more than threshold(percent).
+    """
+    minimum = {'time':min_time,'memory':min_memory}
+    base = dict((case_key(c),c) for c in baseline['cases'] if 'error' not in c)
+    regressions = []
+    for case in current['cases']:
+        old = base.get(case_key(case))
+        if old is None:
+            continue
+        if 'error' in case:
+            regressions.append((case_key(case),'error',None,case['error']))
+            continue
+        old_metrics = case_metrics(old)
+        for metric,(value,kind) in sorted(case_metrics(case).items()):
+            if metric not in old_metrics:
+                continue
+            old_value = old_metrics[metric][0]
+            if value - old_value > minimum[kind] and value > old_value * (1 + threshold / 100.0):
+                regressions.append((case_key(case),metric,old_value,value))
+    return regressions
+
+def print_case(case):
+    if 'error' in case:
+        print("%-28s %-54s x%-4s ERROR: %s" % (case['checklist'],case['log'],case['scale'],case['error']))
+        return
+    print("%-28s %-54s x%-4s parse:%.2fs modules:%.2fs render:%.2fs total:%.2fs rss:%.1fMB" % (
+          case['checklist'],case['log'],case['scale'],case['parse'],case['modules'],
+          case['render'],case['total'],case['peak_rss']/1024.0/1024))
+
+def main():
+    args = args_parse()
+    if args.case:
+        case_main(*args.case)
+        return 0
+
+    cases = [c for c in CASES if not args.checklist or c[0] in args.checklist]
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+    current = run_benchmarks(cases,scales,args.datadir,args.repeat,report=print_case)
+
+    with open(args.output,'w') as f:
+        json.dump(current,f,indent=1,sort_keys=True)
+    print("Save the results to: %s" % args.output)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline,current,args.threshold,args.min_time,args.min_memory)
+    for key,metric,old_value,value in regressions:
+        print("REGRESSION %s x%s %s: %s -> %s" % (key[0],key[2],metric,old_value,value))
+    if regressions:
+        print("%s regressions over %s%%." % (len(regressions),args.threshold))
+        return 1
+    print("No regression over %s%%." % args.threshold)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
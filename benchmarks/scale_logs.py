@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Scale the sample logs for the benchmarks.
+
+The MML/fsclish transcripts are repeated 'factor' times, so every command
+block appears 'factor' times in the scaled log. The OSS reports
+(NEAlarm_*/NESta_*) are written in JSON Lines with the rows repeated
+'factor' times. The scaled log keeps the filename of the sample, it's saved
+in the directory of the scale: <datadir>/x10/MME09_sensor.log
+Usage:
+    from scale_logs import scale_log
+
+    scaled = scale_log('log/MME09_sensor.log','benchmarks/data',10)
+"""
+import os
+import sys
+import json
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from libs.ossreport import read_report
+
+_BOM = b'\xef\xbb\xbf'
+OSS_REPORT_PREFIX = ('NEAlarm_','NESta_')
+
+def is_oss_report(filename):
+    return os.path.basename(filename).startswith(OSS_REPORT_PREFIX)
+
+def scale_text(src,dst,factor,chunk_size=1024*1024):
+    with open(dst,'wb') as out:
+        for n in range(factor):
+            with open(src,'rb') as f:
+                data = f.read(chunk_size)
+                if n and data[0:3] == _BOM:
+                    data = data[3:]
+                last = b'\n'
+                while data:
+                    out.write(data)
+                    last = data[-1:]
+                    data = f.read(chunk_size)
+            ## the next copy starts from a new line.
+            if last != b'\n':
+                out.write(b'\n')
+
+def scale_report(src,dst,factor):
+    columndesc,rows = read_report(src)
+    lines = [json.dumps(row) + '\n' for row in rows]
+    with open(dst,'w') as out:
+        out.write(json.dumps({'columndesc':columndesc}) + '\n')
+        for n in range(factor):
+            out.writelines(lines)
+
+def scale_log(src,datadir,factor):
+    """write the log 'src' scaled by 'factor' to datadir, return the filename.
+    the scaled log is reused if it's newer than src.
+    """
+    path = os.path.join(datadir,'x%s' % factor)
+    dst = os.path.join(path,os.path.basename(src))
+    if os.path.exists(dst) and os.path.getmtime(dst) >= os.path.getmtime(src):
+        return dst
+    if not os.path.exists(path):
+        os.makedirs(path)
+    tmp = dst + '.tmp'
+    if is_oss_report(src):
+        scale_report(src,tmp,factor)
+    else:
+        scale_text(src,tmp,factor)
+    if os.path.exists(dst):
+        os.remove(dst)
+    os.rename(tmp,dst)
+    return dst
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""The column table of the OSS alarms, shared by NS/NG_AlarmAnalysis.
+
+The columns are extracted once from the rows, the counts are grouped by the
+hash of the column values, and the top N alarms are selected by heapq
+instead of sorting all the rows.
+Usage:
+    from libs.alarmtable import AlarmTable, SEVERITY, NE_NAME
+
+    table = AlarmTable(rows)
+    counts = table.count_by(NE_NAME, ALARM_NUMBER)
+    top = table.nsmallest(5, SEVERITY)
+"""
+import heapq
+from itertools import izip, count
+from operator import itemgetter
+from collections import Counter
+
+## the columns of the OSS alarm report.
+NE_NAME, DN, ALARM_NUMBER, ALARM_TIME, CANCEL_TIME, ALARM_STATUS, \
+    ALARM_TYPE, SEVERITY, ALARM_TEXT, SUPP_INFO = range(10)
+
+class AlarmTable(object):
+    """the alarm rows with the columns extracted when they are used.
+    """
+    def __init__(self, rows):
+        self.rows = rows if isinstance(rows, list) else list(rows)
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def column(self, index):
+        col = self._columns.get(index)
+        if col is None:
+            col = self._columns[index] = map(itemgetter(index), self.rows)
+        return col
+
+    def count_by(self, *indexes):
+        """return {(value of column, ...): count of rows}.
+        """
+        return Counter(izip(*[self.column(i) for i in indexes]))
+
+    def nsmallest(self, n, *indexes):
+        """return the first n rows ordered by the columns, the rows of the
+        same values are in the order of the table.
+        """
+        keys = izip(*([self.column(i) for i in indexes] + [count()]))
+        return [self.rows[key[-1]] for key in heapq.nsmallest(n, keys)]
+
+    def nlargest(self, n, index, *then):
+        """return the first n rows ordered by the column 'index' descending,
+        then by the columns 'then' ascending.
+        """
+        col = self.column(index)
+        largest = heapq.nlargest(n, col)
+        if not largest:
+            return []
+        ## only the rows not less than the n-th largest value are sorted.
+        threshold = largest[-1]
+        candidates = [i for i, value in enumerate(col) if value >= threshold]
+        thencols = [self.column(i) for i in then]
+        candidates.sort(key=lambda i: tuple(c[i] for c in thencols) + (i,))
+        candidates.sort(key=col.__getitem__, reverse=True)
+        return [self.rows[i] for i in candidates[:n]]
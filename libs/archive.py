@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Read the logs in the archives(.zip, .tar.gz, .tgz, .gz) without extracting
+them to disk.
+
+The members are decompressed one by one when they are iterated, the tar
+archives are read as a stream. The name of a member is the archive name and
+the path in the archive joined by '!', e.g. 'bundle.zip!MME09/sensor.log'.
+prefetch() decompresses the next members in a thread while the current one
+is checked. The members larger than spool_size are written to temporary
+files instead of memory, data is a SpooledMember then.
+Usage:
+    from libs.archive import isarchive, iter_archive_logs, prefetch
+
+    for name,data in prefetch(iter_archive_logs('bundle.tar.gz')):
+        print name,len(data)
+"""
+import os
+import gzip
+import shutil
+import tempfile
+import tarfile
+import zipfile
+import threading
+from Queue import Queue
+
+from logfile import istextfile
+
+ARCHIVE_POSTFIX = ['.zip','.tar.gz','.tgz','.gz']
+MEMBER_SEP = '!'
+
+class ArchiveError(Exception):
+    pass
+
+class SpooledMember(object):
+    """the member of archive written to the temporary file `path`, it's
+    removed by remove() after the member is checked.
+    """
+    def __init__(self,name,path):
+        self.name = name
+        self.path = path
+        ## the number of the checks which use the member.
+        self.refs = 1
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __repr__(self):
+        return "SpooledMember(%s, %s)" % (self.name,self.path)
+
+def isarchive(filename):
+    for postfix in ARCHIVE_POSTFIX:
+        if filename.endswith(postfix):
+            return True
+    return False
+
+def member_name(archive,name):
+    return "%s%s%s" % (archive,MEMBER_SEP,name)
+
+def _read_member(name,fp,spool_size=None):
+    """return the content of the member, or the SpooledMember if it's larger
+    than spool_size.
+    """
+    if spool_size is None:
+        return fp.read()
+    data = fp.read(spool_size + 1)
+    if len(data) <= spool_size:
+        return data
+    ## keep the postfix, the temporary file is a log(istextfile) too.
+    tmp = tempfile.NamedTemporaryFile(prefix='smartchecker_',
+                                      suffix=os.path.splitext(name)[1],delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+            del data
+            shutil.copyfileobj(fp,tmp,1024*1024)
+    except Exception:
+        os.remove(tmp.name)
+        raise
+    return SpooledMember(name,tmp.name)
+
+def _iter_zip(filename,spool_size=None):
+    with zipfile.ZipFile(filename) as zf:
+        for info in zf.infolist():
+            if not info.filename.endswith('/') and istextfile(info.filename):
+                with zf.open(info) as fp:
+                    yield info.filename,_read_member(info.filename,fp,spool_size)
+
+def _iter_tar(filename,spool_size=None):
+    ## the stream mode, the members are read in order without seeking.
+    with tarfile.open(filename,'r|*') as tf:
+        for info in tf:
+            if info.isfile() and istextfile(info.name):
+                yield info.name,_read_member(info.name,tf.extractfile(info),spool_size)
+
+def _iter_gzip(filename,spool_size=None):
+    name = os.path.basename(filename)[:-len('.gz')]
+    if istextfile(name):
+        with gzip.open(filename,'rb') as fp:
+            yield name,_read_member(name,fp,spool_size)
+
+def iter_archive_logs(filename,spool_size=None):
+    """yield (member name, data) of the logs in the archive, the members
+    which are not logs(istextfile) are skipped. data is the SpooledMember
+    of the members larger than spool_size.
+    """
+    if filename.endswith('.zip'):
+        reader = _iter_zip
+    elif filename.endswith(('.tar.gz','.tgz')):
+        reader = _iter_tar
+    elif filename.endswith('.gz'):
+        reader = _iter_gzip
+    else:
+        raise ArchiveError("unknown archive type: %s" % filename)
+
+    try:
+        for name,data in reader(filename,spool_size):
+            yield member_name(filename,name),data
+    except (IOError,OSError,zipfile.BadZipfile,tarfile.TarError) as e:
+        raise ArchiveError("failed to read %s: %s" % (filename,e))
+
+_END = object()
+
+def prefetch(iterable,size=2):
+    """iterate the items of iterable read by a thread, at most `size` items
+    are read ahead. the exception of the thread is raised in the iteration.
+    """
+    queue = Queue(size)
+
+    def _read():
+        try:
+            for item in iterable:
+                queue.put((item,None))
+        except Exception as e:
+            queue.put((None,e))
+        else:
+            queue.put((_END,None))
+
+    reader = threading.Thread(target=_read)
+    reader.daemon = True
+    reader.start()
+    while True:
+        item,error = queue.get()
+        if error is not None:
+            raise error
+        if item is _END:
+            break
+        yield item
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
-import os,yaml,re,json
+import os,yaml,re,json,inspect
 from subprocess import check_output,PIPE,CalledProcessError
 from collections import Counter
 from importlib import import_module
 from checkstatus import CheckStatus
+from usage import total_usage
 
 #from libs.tools import to_unicode
 
@@ -65,7 +66,7 @@ class ShellModule(object):
 
         self.path = path
 
-    def run(self,parameters):
+    def run(self,parameters,logspliter=None):
         result = ResultInfo(self.name)
 
         cmd = "%(cmd)s %(parameter)s" % dict(cmd=self.name,parameter=parameters)
@@ -92,6 +93,7 @@ class CheckList(object):
         self.info = {}
         self.modules = []
         self.filename = os.path.split(filename)[1]
+        self.filepath = filename
         if filename:
             self.load(filename)
 
@@ -159,12 +161,37 @@ def ImportCheckModules(checklist):
     return modules
 
 
+def _accept_logspliter(func):
+    """return True if the function accept the parsed log as 2nd argument.
+    """
+    try:
+        spec = inspect.getargspec(func)
+    except TypeError:
+        return False
+    nargs = len(spec.args)
+    if inspect.ismethod(func):
+        nargs -= 1
+    return bool(spec.varargs) or nargs > 1
+
+def run_module(module,logfile,logspliter=None):
+    """run the check module and return the ResultInfo.
+
+    the parsed log(logspliter) is handed to the modules which `run` function
+    accept it: `def run(logfile, logspliter=None)`, others are called with
+    the logfile only.
+    """
+    if logspliter is not None and _accept_logspliter(module.run):
+        return module.run(logfile,logspliter)
+    return module.run(logfile)
+
+
 class ResultInfo(object):
     """Storing the information of the check result.
     
     status:  one of the CheckStatus: PASSED/FAILED/UNKNOWN
     info:    a list contains the suplement messages.
     error:   a list contain the error messages
+    usage:   the ModuleUsage(time, memory, reads..) of the module run.
     """
     strformat = " Status: %(status)s\n   Info:\n%(info)s\n  error:%(error)s"
     keys = ['status','info','error']
@@ -174,6 +201,7 @@ class ResultInfo(object):
         self.module_id = kwargs.get('module_id', '')
         self.criteria  = kwargs.get('criteria',  '')
         self.priority  = kwargs.get('priority',  'Major')
+        self.usage     = None
 
         self.data = {'status' : CheckStatus.UNKNOWN,
                       'info'   : '',
@@ -270,6 +298,8 @@ class ResultList(object):
         self.hostname = hostname
         self.report_filename = ''
         self.template_type = ''
+        ## the seconds of the phases of checking: parse, modules, render.
+        self.timings = {}
 
     def append(self,obj):
         self._results.append(obj)
@@ -295,6 +325,17 @@ class ResultList(object):
         modules = [s.module_id for s in self._results if s.status==status]
         return modules
 
+    def total_usage(self):
+        """return the ModuleUsage of all the modules.
+        """
+        return total_usage(r.usage for r in self._results)
+
+    def slowest(self,count=3):
+        """return the results of the modules which take the most time.
+        """
+        measured = [r for r in self._results if r.usage is not None]
+        return sorted(measured,key=lambda r:r.usage.wall,reverse=True)[:count]
+
     def __iter__(self):
         return iter(self._results)
 
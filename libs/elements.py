@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Split the transcript of several elements into the logs of every element.
+
+The operators often collect several elements in one terminal session. The
+log is scanned once line by line, the element of the lines is known by the
+headers of the command outputs:
+
+    Flexi NS  SHMME09BNK                2016-07-20  22:20:01     (MML, ZQNI)
+    <HIST> SHMME09BNK ...                                        (MML history)
+    fsLogicalNetworkElemId: SHSAEGW03BNK                         (FlexiNG)
+
+When the element changes, the log is split at the login(ENTER USERNAME) or
+the bash prompt before the new element, or at the first command after the
+last output of the previous element. The parts of the same element are
+joined, every element is a LogRange of byte ranges of the log.
+Usage:
+    from libs.elements import split_elements
+
+    ranges = split_elements('log/MME_all.log')
+    if len(ranges) > 1:
+        for r in ranges:
+            check_logfile(checklist,r.name,data=r.read())
+"""
+import re
+
+from log_spliter import iter_log_lines
+
+_BOM = b"\xEF\xBB\xBF"
+
+ELEMENT_PATTERNS = [re.compile(r"^Flexi N[SG]\s+(\w+)\s+\d{4}-\d\d-\d\d"),
+                    re.compile(r"^<HIST>\s+(\w+)"),
+                    re.compile(r"^\s*fsLogicalNetworkElemId:\s*(\w+)")]
+## the login of MML session, the bash prompt of FlexiNG.
+SESSION_PATTERN = re.compile(r"^(ENTER USERNAME|ENTER PASSWORD|\[\S+@[^\]]*\])")
+COMMAND_PATTERN = re.compile(r"^< ")
+
+class LogRange(object):
+    """the log of one element: the byte ranges [(start, end)] of the file.
+    """
+    def __init__(self,filename,hostname,spans=None):
+        self.filename = filename
+        self.hostname = hostname
+        self.spans    = spans or []
+
+    @property
+    def name(self):
+        return "%s#%s" % (self.filename,self.hostname)
+
+    @property
+    def size(self):
+        return sum(end - start for start,end in self.spans)
+
+    def read(self):
+        data = []
+        with open(self.filename,'rb') as f:
+            for start,end in self.spans:
+                f.seek(start)
+                data.append(f.read(end - start))
+        return b''.join(data)
+
+    def __repr__(self):
+        return "LogRange(%s, %s)" % (self.name,self.spans)
+
+def element_hostname(line):
+    for pattern in ELEMENT_PATTERNS:
+        r = pattern.match(line)
+        if r:
+            return r.group(1)
+    return None
+
+def iter_element_spans(fp,offset=0):
+    """yield (hostname, start, end) of the parts of the log in order. the
+    hostname is None if no element is found.
+    """
+    start = offset
+    end = offset
+    current = None
+    ## the start of the last login after the last header of the current
+    ## element, and the first command after it.
+    session = command = None
+    in_session = False
+    for offset,line in iter_log_lines(fp,offset):
+        end = offset + len(line)
+        line = line.rstrip(b"\r\n")
+        if not line.strip():
+            continue
+        if SESSION_PATTERN.match(line):
+            if not in_session:
+                session = offset
+            in_session = True
+            continue
+        in_session = False
+        if command is None and COMMAND_PATTERN.match(line):
+            command = offset
+
+        hostname = element_hostname(line)
+        if hostname is None:
+            continue
+        if current is not None and hostname != current:
+            boundary = offset
+            for mark in (session,command):
+                if mark is not None:
+                    boundary = mark
+                    break
+            yield current,start,boundary
+            start = boundary
+        current = hostname
+        session = command = None
+    yield current,start,end
+
+def split_elements(filename):
+    """scan the log once, return the LogRanges of the elements in the order
+    they appear. the log of one element or without element returns one
+    LogRange of the whole log.
+    """
+    ranges = {}
+    order = []
+    with open(filename,'rb') as f:
+        offset = 3 if f.read(3) == _BOM else 0
+        f.seek(offset)
+        for hostname,start,end in iter_element_spans(f,offset):
+            if end <= start:
+                continue
+            if hostname not in ranges:
+                ranges[hostname] = LogRange(filename,hostname)
+                order.append(hostname)
+            ranges[hostname].spans.append((start,end))
+    ## the lines before the first element belong to it.
+    if len(order) > 1 and order[0] is None:
+        first = ranges[order[1]]
+        first.spans = ranges.pop(None).spans + first.spans
+        order.pop(0)
+    return [ranges[hostname] for hostname in order]
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 import re
 from hwparser import HardwareInfo
-from networkelement import NetworkElement
-from tools import MessageLogger
+from networkelement import NetworkElement, scan_data
+from tools import MessageLogger, iter_loglines
+from patterns import patterns
 
 version_names = ('major','release','hardware')
 logger = MessageLogger('flexing')
@@ -17,9 +18,7 @@ class FlexiNG(NetworkElement):
     """
     def parse_log(self,logfile):
 
-        loglines = file(logfile).readlines()
-
-        _hostver = _get_ng_hostname_version(loglines)
+        _hostver = _get_ng_hostname_version(iter_loglines(logfile))
         self._load_data(_hostver)
         ##extract the hostnme
 
@@ -36,15 +35,15 @@ class FlexiNG(NetworkElement):
         release = release or []
         hardware = hardware or []
         for ver in major:
-            if re.match(ver,self.version['major']):
+            if patterns.match(ver,self.version['major']):
                 match_flag['major'] = True
                 break
         for ver in release:
-            if re.match(ver,self.version['release']):
+            if patterns.match(ver,self.version['release']):
                 match_flag['release'] = True
                 break
         for ver in hardware:
-            if re.match(ver,self.version['hardware']):
+            if patterns.match(ver,self.version['hardware']):
                 match_flag['hardware'] = True
                 break
 
@@ -83,27 +82,24 @@ def _get_ng_version(loglines):
 
     return version
 
+ng_data_specs = {
+    'hostname' : {'names'       : ['hostname'],
+                  'command'     : None,
+                  'pattern'     : re.compile("fsLogicalNetworkElemId: (\w+)"),
+                  'match_method': 'search',
+                 },
+    'version'  : {'names'       : version_names,
+                  'command'     : None,
+                  'pattern'     : re.compile("fsStaticDataDelivery: R_NG([\w\d\._]+)_r(\d+)_AB(\d+)"),
+                  'match_method': 'search',
+                 },
+}
+
 def _get_ng_hostname_version(loglines):
-    names = ['hostname','version']
-    pat_host = re.compile("fsLogicalNetworkElemId: (\w+)")
-    pat_version = re.compile("fsStaticDataDelivery: R_NG([\w\d\._]+)_r(\d+)_AB(\d+)")
-
-    h_flag=v_flag=False
-    hostname = ''
-    version = {}
-    for line in loglines:
-        r1 = pat_host.search(line)
-        r2 = pat_version.search(line)
-        if r1:
-            hostname = r1.groups()[0]
-            h_flag = True
-        if r2:
-            version = dict(zip(version_names,r2.groups()))
-            v_flag = True
-
-        if h_flag and v_flag:
-            break      
-    return dict(zip(names,(hostname,version)))
+    data = scan_data(ng_data_specs,loglines)
+    hostname = data['hostname']['hostname'] if data['hostname'] else ''
+    version = data['version'] or {}
+    return {'hostname':hostname,'version':version}
 
 def get_hw_info(configlog):
     hwinfo = HardwareInfo()
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 import re
-from tools import read_cmdblock_from_log,MessageLogger
-from networkelement import NetworkElement, extract_data
+from tools import iter_loglines,MessageLogger
+from networkelement import NetworkElement, scan_data
 from checker import CheckStatus
+from patterns import patterns
 
 __version__ = "v0.5"
 
@@ -19,14 +20,13 @@ example:
     print ns.
     """
     def parse_log(self,logfile):
-        loglines = file(logfile).readlines()
+        ## the version and om config are extracted in one pass of the log.
+        data = scan_data(ns_data_specs,iter_loglines(logfile))
 
-        self._data['version'] = _get_ns_version(loglines)
+        self._data['version'] = _ns_version(data['version'])
 
         om_names = ['hostname','c_num','location']
-        pat = re.compile("(\d+)\s+(\w+)\s+(\d+)\s+(\d+)\s+(\w+)\s+(\w+)")
-   
-        self._load_data(_get_om_config(loglines),om_names)
+        self._load_data(data['om_config'],om_names)
 
     def match_version(self,versions):
         """check if the BU version match the target versions
@@ -37,10 +37,10 @@ example:
         nsversion = self.version.get('BU','')
         if isinstance(versions,list):
             for ver in versions:
-                if re.match(ver,nsversion):
+                if patterns.match(ver,nsversion):
                     return True
         else:
-            if re.match(versions,nsversion):
+            if patterns.match(versions,nsversion):
                 return True
         return False
 
@@ -72,6 +72,29 @@ example:
         return _reprtxt % self._data
  
 
+ns_data_specs = {
+    'version'   : {'names'       : None,
+                   'command'     : 'WQO:CR;',
+                   'end'         : command_end_mark,
+                   'pattern'     : re.compile("\s+(BU|FB|NW)\s+.*?\n\s+(\w\d [\d\.-]+)"),
+                   'match_method': 'findall',
+                   ## the version after the upgrade, the last one wins.
+                   'scan'        : 'all',
+                  },
+    'om_config' : {'names'       : ['conn','type','sw_level','c_num','hostname','location'],
+                   'command'     : 'QNI',
+                   'end'         : command_end_mark,
+                   'pattern'     : re.compile("(\d+)\s+(\w+)\s+(\d+)\s+(\d+)\s+(\w+)\s+(\w+)"),
+                   'match_method': 'search',
+                  },
+}
+
+def _ns_version(pkgids):
+    if not pkgids:
+        logger.error("Package ID not found in log: %s")
+        return None
+    return dict(pkgids)
+
 def _get_ns_version(loglines):
     """This function will parse the FlexiNS version info from log lines.
     Arguments:
@@ -82,15 +105,8 @@ def _get_ns_version(loglines):
     example: {'BU': 'N5 1.17-5', 'FB': 'N5 1.17-5', 'NW': 'N4 1.19-2', 'UT': 'N4 1.19-2'}
     
     """
-    pkgid_pat = re.compile("\s+(BU|FB|NW)\s+.*?\n\s+(\w\d [\d\.-]+)")
-
-    logtxt = read_cmdblock_from_log(loglines,'WQO:CR;',command_end_mark)
-    pkgids = pkgid_pat.findall(logtxt)
-    if not pkgids:
-        logger.error("Package ID not found in log: %s")
-        return None
-
-    return dict(pkgids)
+    specs = {'version':ns_data_specs['version']}
+    return _ns_version(scan_data(specs,loglines)['version'])
 
 def _get_om_config(loglines):
     """extract the om config from the loglines 
@@ -101,15 +117,8 @@ def _get_om_config(loglines):
     example: 
         {'cnum': '400248', 'hostname': 'NCMME30BNK', 'sw_level': '5', 'location': 'NC_HGT3F_M03', 'type': 'DX220', 'conn': '000'}
     """
-    config_names = ['conn','type','sw_level','c_num','hostname','location']
-    pat = re.compile("(\d+)\s+(\w+)\s+(\d+)\s+(\d+)\s+(\w+)\s+(\w+)")
-
-    logtxt = read_cmdblock_from_log(loglines,'QNI',command_end_mark)
-    r = pat.search(logtxt)
-    if r:
-        return dict(zip(config_names,r.groups()))
-    else:
-        return None
+    specs = {'om_config':ns_data_specs['om_config']}
+    return scan_data(specs,loglines)['om_config']
 
 
 def get_ns_version(configlog):
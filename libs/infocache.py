@@ -1,7 +1,75 @@
 # -*- coding: utf-8 -*-
+import threading
+
+_local = threading.local()
+
+def current_context():
+    """return the RunContext activated in the current thread, or None.
+    """
+    stack = getattr(_local,'stack',None)
+    return stack[-1] if stack else None
+
+class RunContext(object):
+    """The information of one checking run (one logfile). It's activated with
+    'with' in the thread running the check modules, so the logs checked in
+    other threads/processes have their own context.
+    Usage:
+    from infocache import RunContext, current_context
+
+    with RunContext(logfile,logspliter=logspliter) as context:
+        result = module.run(logfile,logspliter)
+        context.element      # the same as shareinfo.get('ELEMENT')
+
+    """
+    ## the keys of shareinfo which are stored as the attributes.
+    _attrs = {'ELEMENT'    : 'element',
+              'DEBUG'      : 'debug',
+              'LOGSPLITER' : 'logspliter',
+             }
+
+    def __init__(self,logfile=None,logspliter=None,debug=None):
+        self.logfile    = logfile
+        self.logspliter = logspliter
+        ## None means the global DEBUG in shareinfo is used.
+        self.debug      = debug
+        self.element    = None
+        ## {module_id: seconds}
+        self.timings    = {}
+        self.info       = {}
+
+    def set(self,key,value):
+        if key in self._attrs:
+            setattr(self,self._attrs[key],value)
+        else:
+            self.info[key] = value
+        return value
+
+    def get(self,key):
+        if key in self._attrs:
+            return getattr(self,self._attrs[key])
+        return self.info.get(key,None)
+
+    def __contains__(self,key):
+        if key in self._attrs:
+            return getattr(self,self._attrs[key]) is not None
+        return key in self.info
+
+    def __enter__(self):
+        if not hasattr(_local,'stack'):
+            _local.stack = []
+        _local.stack.append(self)
+        return self
+
+    def __exit__(self,*exc_info):
+        _local.stack.pop()
+
+    def __repr__(self):
+        return "RunContext<%s>" % self.logfile
 
 class InfoCache(object):
     """A singleton Class can store the information shared in global/modules.
+    When a RunContext is activated, the information is set to and read from
+    the context first, so the modules can still use shareinfo.get('ELEMENT').
     Usage:
     from infocache import shareinfo
 
@@ -20,10 +88,16 @@ class InfoCache(object):
         return self
 
     def set(self,key,value):
+        context = current_context()
+        if context is not None:
+            return context.set(key,value)
         self._cache[key] = value   
         return self._cache[key]
         
     def get(self,key):
+        context = current_context()
+        if context is not None and key in context:
+            return context.get(key)
         return self._cache.get(key,None)
  
     def clear(self):
@@ -33,12 +107,18 @@ class InfoCache(object):
         return self.get(key)
     
     def __setitem__(self,key,value):
-        self._cache[key] = value
+        self.set(key,value)
 
     def __repr__(self):
+        context = current_context()
+        if context is not None:
+            return "InfoCache:%s, %s" % (self._cache,context)
         return "InfoCache:%s" % self._cache
     
     def __contains__(self,key):
+        context = current_context()
+        if context is not None and key in context:
+            return True
         return key in self._cache
 
 shareinfo = InfoCache()        
\ No newline at end of file
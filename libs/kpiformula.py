@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""The KPI formulas of the counters.
+
+A KPI is defined as [formula, counter, ...], the formula is written as
+'GS:round($0$/($0$+$1$),4)*100', where $n$ is the value of the n-th counter.
+The formula is parsed once into the python AST, only the numbers, the
+counter references, + - * / and the functions in FUNCTIONS are allowed. The
+AST is compiled to the nested functions, no eval() is used.
+A KPI with only one counter is the value of the counter.
+Usage:
+    from libs.kpiformula import KPIEngine
+
+    engine = KPIEngine({'ATTACH Succ Ratio':['GS:round($0$/($0$+$1$),4)*100','M50C000','M50C001']})
+    print engine.evaluate({'M50C000':'99','M50C001':'1'})
+    for kpis in engine.evaluate_many(intervals):
+        ...
+"""
+import re
+import ast
+import operator
+
+FORMULA_PREFIX = 'GS'
+FUNCTIONS = {'round':round, 'abs':abs, 'min':min, 'max':max}
+
+_BINOPS = {ast.Add:operator.add, ast.Sub:operator.sub, ast.Mult:operator.mul,
+           ast.Div:operator.truediv}
+_UNARYOPS = {ast.USub:operator.neg, ast.UAdd:operator.pos}
+_counter_ref = re.compile(r"\$(\d+)\$")
+
+class FormulaError(ValueError):
+    pass
+
+def _compile_node(node, positions):
+    """return the function of the AST node, which takes the counter values
+    (a sequence of floats) and returns the value of the node.
+    positions maps the counter reference 'cN' to the index in the values.
+    """
+    if isinstance(node, ast.Num):
+        value = node.n
+        return lambda values: value
+    if isinstance(node, ast.Name):
+        if node.id not in positions:
+            raise FormulaError("Unknown name: %s" % node.id)
+        index = positions[node.id]
+        return lambda values: values[index]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        op = _BINOPS[type(node.op)]
+        left = _compile_node(node.left, positions)
+        right = _compile_node(node.right, positions)
+        return lambda values: op(left(values), right(values))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARYOPS:
+        op = _UNARYOPS[type(node.op)]
+        operand = _compile_node(node.operand, positions)
+        return lambda values: op(operand(values))
+    if isinstance(node, ast.Call):
+        if (not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS
+                or node.keywords or node.starargs or node.kwargs):
+            raise FormulaError("Function is not allowed: %s" % ast.dump(node.func))
+        func = FUNCTIONS[node.func.id]
+        args = [_compile_node(arg, positions) for arg in node.args]
+        return lambda values: func(*[arg(values) for arg in args])
+    raise FormulaError("Expression is not allowed: %s" % ast.dump(node))
+
+def compile_formula(formula, counters):
+    """return the function of the formula 'GS:...' which takes the values of
+    the counters, in the order of 'counters'.
+    """
+    prefix, sep, expr = formula.partition(':')
+    if prefix != FORMULA_PREFIX or not sep:
+        raise FormulaError("Invalid formula: %s" % formula)
+    for ref in _counter_ref.findall(expr):
+        if int(ref) >= len(counters):
+            raise FormulaError("$%s$ is not defined in: %s" % (ref, formula))
+    try:
+        tree = ast.parse(_counter_ref.sub(r"c\1", expr).strip(), mode='eval')
+    except SyntaxError as e:
+        raise FormulaError("Invalid formula: %s (%s)" % (formula, e))
+    positions = dict(("c%s" % i, i) for i in range(len(counters)))
+    return _compile_node(tree.body, positions)
+
+class KPIFormula(object):
+    """one KPI: the counters and the compiled formula.
+    """
+    def __init__(self, name, definition):
+        if not definition:
+            raise FormulaError("KPI %s has no counter" % name)
+        self.name = name
+        if len(definition) == 1:
+            self.formula = None
+            self.counters = tuple(definition)
+            self._func = None
+        else:
+            self.formula = definition[0]
+            self.counters = tuple(definition[1:])
+            self._func = compile_formula(self.formula, self.counters)
+
+    def evaluate(self, values):
+        """values: the values of self.counters. return None if any counter
+        is missing, 0 if the formula can not be computed(divided by 0).
+        """
+        if any(v is None for v in values):
+            return None
+        if self._func is None:
+            return values[0]
+        try:
+            return self._func([float(v) for v in values])
+        except (ArithmeticError, ValueError, TypeError):
+            return 0
+
+    def __repr__(self):
+        return "KPIFormula(%s)" % self.name
+
+class KPIEngine(object):
+    """evaluate all the KPIs with one vector of the counter values.
+    """
+    def __init__(self, definitions):
+        self.kpis = [KPIFormula(name, definitions[name]) for name in sorted(definitions)]
+        counters = []
+        for kpi in self.kpis:
+            for counter in kpi.counters:
+                if counter not in counters:
+                    counters.append(counter)
+        ## all the counters used by the KPIs, the order of the vector.
+        self.counters = tuple(counters)
+        positions = dict((c, i) for i, c in enumerate(self.counters))
+        self._positions = [(kpi, [positions[c] for c in kpi.counters]) for kpi in self.kpis]
+
+    def vector(self, values):
+        """return the vector of the counter values from the dict.
+        """
+        return [values.get(c) for c in self.counters]
+
+    def evaluate_vector(self, vector):
+        """return {kpi name: value} of the vector.
+        """
+        return dict((kpi.name, kpi.evaluate([vector[i] for i in indexes]))
+                    for kpi, indexes in self._positions)
+
+    def evaluate(self, values):
+        """return {kpi name: value}, values is {counter: value}.
+        """
+        return self.evaluate_vector(self.vector(values))
+
+    def evaluate_many(self, iterable):
+        """evaluate the KPIs of every {counter: value} of the elements or
+        intervals, yield {kpi name: value}.
+        """
+        for values in iterable:
+            yield self.evaluate(values)
@@ -8,6 +8,12 @@
 import os
 import sys
 import re
+import io
+import mmap
+import threading
+from bisect import bisect_left
+
+from .usage import count
 
 if sys.version_info.major == 3:
     PY3 = True
@@ -16,6 +22,15 @@ else:
 
 LOG_TYPE_FLEXI_NS = "flexins"
 LOG_TYPE_FLEXI_NG = "flexing"
+LOG_TYPE_RAW      = "raw"
+
+# the spliter type used for the `netype` of checklist. the element types
+# without command segments are handled by RawSpliter.
+NETYPE_LOG_TYPES = {'FlexiNS' : LOG_TYPE_FLEXI_NS,
+                    'FlexiNG' : LOG_TYPE_FLEXI_NG}
+
+# characters which make a command query a regex instead of a literal prefix.
+_REGEX_CHARS = set(".^$*+?{}[]\\|()")
 
 class SpliterException(Exception):
     """Abstract base class shared by all exceptions."""
@@ -34,38 +49,178 @@ class SpliterInterfaceException(SpliterException):
     pass
 
 
+_BOM = b"\xEF\xBB\xBF"
+
+def iter_log_lines(fp, offset=0):
+    """iterate the (offset, line) of the binary file object fp, the offset is
+    the byte offset of the line in the file.
+    """
+    for line in iter(fp.readline, b""):
+        yield offset, line
+        offset += len(line)
+
+def iter_text_lines(text, offset=0):
+    """iterate the (offset, line) of the text in memory, the same as
+    iter_log_lines. offset is the position of the text in the file.
+    """
+    start = 0
+    size = len(text)
+    while start < size:
+        end = text.find("\n", start)
+        end = size if end < 0 else end + 1
+        yield offset + start, text[start:end]
+        start = end
+
+def read_log_range(file_name, start, end):
+    """return the lines between the byte offsets [start, end) of file_name,
+    the lines are stripped as the parsed command output.
+    """
+    with open(file_name, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    count('bytes_read', len(data))
+    if PY3:
+        data = data.decode("utf_8", "replace")
+    return [line.rstrip("\r\n\t ") for line in data.split("\n")[:-1]]
+
+
+class MappedLog(object):
+    """The read-only memory map of the log file, it's mapped when the first
+    view is taken. The views share the pages of the map, the data is copied
+    only when a part of the view is used as a string. If `data` is given, the
+    views are taken on the data in memory instead of the file.
+    """
+    def __init__(self, file_name, data=None):
+        self.file_name = file_name
+        self._map = data
+        self._lock = threading.Lock()
+
+    def get_map(self):
+        if self._map is None:
+            with self._lock:
+                if self._map is None:
+                    with open(self.file_name, "rb") as f:
+                        if os.fstat(f.fileno()).st_size:
+                            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                        else:
+                            self._map = b""
+        return self._map
+
+    def view(self, start=0, end=None):
+        """return the bytes [start, end) of the file as a read-only buffer
+        (memoryview in python 3), the regexes could search it directly.
+        """
+        data = self.get_map()
+        if end is None:
+            end = len(data)
+        count('bytes_read', end - start)
+        if PY3:
+            return memoryview(data)[start:end]
+        return buffer(data, start, end - start)
+
+    def close(self):
+        """unmap the file, it's mapped again if a view is taken later. the
+        mapped file could not be replaced or removed on windows.
+        """
+        with self._lock:
+            if isinstance(self._map, mmap.mmap):
+                try:
+                    self._map.close()
+                except BufferError:
+                    # the views(memoryview) are still used.
+                    return
+                self._map = None
+
+    def __repr__(self):
+        return "MappedLog(%s)" % self.file_name
+
+
 class LogSegment(object):
-    def __init__(self, command, result):
+    """The command and its output lines. With `offsets`(start, end) and
+    `log_file`, the output is read from the file when `result` is used.
+    With the MappedLog `mapped`, `block` is the output in the mapped file.
+    """
+    def __init__(self, command, result, log_file=None, offsets=None, mapped=None):
         self.__command = command
         self.__result = result
+        self.__log_file = log_file
+        self.__offsets = offsets
+        self.__mapped = mapped
 
     @property
     def command(self):
         return self.__command
 
+    @property
+    def offsets(self):
+        return self.__offsets
+
     @property
     def result(self):
+        if self.__result is None and self.__offsets:
+            return read_log_range(self.__log_file, *self.__offsets)
         return self.__result
 
+    @property
+    def block(self):
+        """the output of the command as a read-only view on the mapped log
+        file, without copying the lines. the lines of result are joined if
+        the segment has no offsets.
+        """
+        if self.__offsets and self.__mapped is not None:
+            return self.__mapped.view(*self.__offsets)
+        return "".join(line + "\n" for line in self.result)
+
     def __str__(self):
         _str = "COMMAND:\n"
         _str += "   %s\n"%self.__command
         _str += "RESULT:\n"
-        for one_line_result in self.__result:
+        for one_line_result in self.result or []:
             _str += "   %s\n"%one_line_result
         return _str
 
 
 class SpliterBase(object):
+    # the parsed segments are saved in the cache.
+    cache_segments = True
+
     def __init__(self):
         super(SpliterBase, self).__init__()
         self._log = []
-        self._raw_log = ""
+        # the raw log is read when it's used, see get_raw_log.
+        self._raw_log = None
+        self._raw_lock = threading.Lock()
         self._log_file = ""
+        # the offset of the raw log in the file, 3 if the BOM is removed.
+        self._raw_offset = 0
+        self._mapped = None
+        self._loglines = None
+        self._offsets_only = False
+        # the content of the log read from an archive, the log_file is the
+        # name of the archive member.
+        self._data = None
+        # the ParseCache of the parsed segments and element data.
+        self._cache = None
+        # command index: {command: [position of segment in self._log]}
+        self._index = {}
+        # sorted distinct commands, for the prefix lookup by bisect.
+        self._commands = []
+        self._query_cache = {}
         self.__index = 0
     
             
-    def load(self, file_name):
+    def load(self, file_name, offsets_only=False, cache=None, data=None):
+        """read and parse the log file. with offsets_only, the raw log is not
+        kept in memory and the segments keep the byte offsets of the output
+        only. the segments are read from the cache(ParseCache) if the log
+        has been parsed before.
+
+        if data is given, it's the content of the log(a member of archive),
+        file_name is only the name of log. the data is parsed in memory and
+        not cached.
+        """
+        if data is not None:
+            return self.__load_data(file_name, data)
         if not os.path.exists(file_name):
             raise SpliterLogFileException("%s does not exist"%file_name)
         if not os.path.isfile(file_name):
@@ -74,40 +229,205 @@ class SpliterBase(object):
             raise SpliterLogFileException("%s is not readable"%file_name)
 
         self._log_file = file_name
+        self._mapped = MappedLog(file_name)
+        self._offsets_only = offsets_only
+        self._cache = cache
+
+        # the log is not read if the segments are cached.
+        kind = self.__class__.__name__ + (".offsets" if offsets_only else "")
+        segments = self.get_cached(kind) if self.cache_segments else None
+        if segments is not None:
+            self._log = [LogSegment(command, result, file_name, offsets, self._mapped)
+                         for command, result, offsets in segments]
+        else:
+            if offsets_only:
+                try:
+                    self._log = list(self.iterparse(file_name, offsets_only=True))
+                except (IOError, OSError) as e:
+                    raise SpliterLogFileException(e)
+                segments = [(log.command, None, log.offsets) for log in self._log]
+            else:
+                self.__read_raw_log(file_name)
+                self.parse()
+                segments = [(log.command, log.result, log.offsets) for log in self._log]
+            if self.cache_segments:
+                self.set_cached(kind, segments)
+        self.build_index()
+
+    def __load_data(self, file_name, data):
+        self._log_file = file_name
+        self._data = data
+        self._mapped = MappedLog(file_name, data)
+        self._offsets_only = False
+        self._cache = None
+        count('bytes_read', len(data))
+        if PY3:
+            self._raw_log = data.decode("utf_8_sig")
+        else:
+            self._raw_log = data
+            self.__remove_BOM()
+        self.parse()
+        self.build_index()
+
+    def open_log(self):
+        """return the log opened as a binary file.
+        """
+        if self._data is not None:
+            return io.BytesIO(self._data)
+        return open(self._log_file, "rb")
+
+    def __read_raw_log(self, file_name):
         if PY3:
             with open(file_name, encoding='utf_8_sig') as f:
                 try:
                     self._raw_log = f.read()
                 except Exception as e:
                     raise SpliterLogFileException(e)
+            count('bytes_read', len(self._raw_log))
         else:
-            with open(file_name) as f:
+            # the binary mode keeps the "\r\n", the offsets of the lines are
+            # the positions in the file on windows too.
+            with open(file_name, "rb") as f:
                 try:
                     self._raw_log = f.read()
                     self.__remove_BOM()
                 except Exception as e:
                     raise SpliterLogFileException(e)
-        self.parse()
+            count('bytes_read', len(self._raw_log))
 
-    def get_raw_log(self):
-        return self._raw_log
+    def _load_raw_log(self):
+        """return the raw log, it's read from the log file at the first use.
+        """
+        with self._raw_lock:
+            if self._raw_log is None and self._log_file:
+                self.__read_raw_log(self._log_file)
+        return self._raw_log or ""
 
-    def get_log(self, command, match_head = False, fuzzy = False):
-        logs = []
-        if match_head and fuzzy:
-            raise SpliterInterfaceException("Do not use match_head and fuzzy simultaneously")
+    @property
+    def log_file(self):
+        return self._log_file
+
+    def close(self):
+        """release the mapped log file, the blocks are mapped again if they
+        are used after.
+        """
+        if self._mapped is not None:
+            self._mapped.close()
+
+    def get_cached(self, kind):
+        """return the data of 'kind' cached for the log file, or None.
+        """
+        if self._cache is None:
+            return None
+        return self._cache.get(self._log_file, kind)
+
+    def set_cached(self, kind, data):
+        if self._cache is not None:
+            self._cache.set(self._log_file, kind, data)
+
+    @property
+    def offsets_only(self):
+        return self._offsets_only
+
+    def get_raw_log(self):
+        if self._offsets_only:
+            with open(self._log_file, "rb") as f:
+                raw_log = f.read()
+            count('bytes_read', len(raw_log))
+            if raw_log[0:3] == _BOM:
+                raw_log = raw_log[3:]
+            return raw_log.decode("utf_8") if PY3 else raw_log
+        return self._load_raw_log()
+
+    def get_view(self):
+        """return the whole log for the regex searching without copying it:
+        the raw log in memory, or the read-only view on the mapped file. use
+        get_raw_log if the string methods are needed.
+        """
+        if self._offsets_only:
+            view = self._mapped.view()
+            return view[3:] if view[0:3] == _BOM else view
+        return self._load_raw_log()
+
+    def get_blocks(self, command, **kwargs):
+        """return the outputs(LogSegment.block) of the command, the
+        arguments are the same as get_log.
+        """
+        return [log.block for log in self.get_log(command, **kwargs)]
+
+    def get_loglines(self):
+        """return the lines of log, the same as `file(logfile).readlines()`.
+        """
+        if self._offsets_only:
+            raw_log = self.get_raw_log()
+            return raw_log.splitlines(True)
+        if self._loglines is None:
+            lines = self._load_raw_log().split("\n")
+            self._loglines = [line + "\n" for line in lines[:-1]]
+            if lines[-1]:
+                self._loglines.append(lines[-1])
+        return self._loglines
+
+    def normalize_command(self, command):
+        command = command.strip()
         if command[0] != "Z":
             command = "Z%s"%command
-        pattern = "%s"%command
-        if match_head:
-            pattern = "%s.*"%command
-        if fuzzy:
-            pattern = (".*").join(command)
+        return command
+
+    def build_index(self):
+        """index the segments by command, it's called after `parse`.
+        """
+        self._index = {}
+        self._query_cache = {}
+        for position, log in enumerate(self._log):
+            self._index.setdefault(log.command, []).append(position)
+        self._commands = sorted(self._index)
+
+    def get_log(self, command, match_head = False, fuzzy = False, exact = False):
+        """return the segments of command in the order of the log.
+
+        command is matched from the head of segment's command by default.
+            match_head,  the same as the default.
+            fuzzy,       the characters of command appear in order.
+            exact,       the segment's command equals to the command.
+        """
+        if match_head and fuzzy:
+            raise SpliterInterfaceException("Do not use match_head and fuzzy simultaneously")
+        count('log_lookup')
+        return [self._log[pos] for pos in self._find_positions(command, fuzzy, exact)]
+
+    def _find_positions(self, command, fuzzy=False, exact=False):
+        """return the positions of the command's segments in self._log.
+        """
+        command = self.normalize_command(command)
+        if exact:
+            return self._index.get(command, [])
+
+        key = (command, fuzzy)
+        if key not in self._query_cache:
+            if fuzzy:
+                commands = self.__match_commands((".*").join(command))
+            elif _REGEX_CHARS.intersection(command):
+                commands = self.__match_commands(command)
+            else:
+                commands = self.__prefix_commands(command)
+            positions = []
+            for cmd in commands:
+                positions.extend(self._index[cmd])
+            self._query_cache[key] = sorted(positions)
+        return self._query_cache[key]
+
+    def __prefix_commands(self, prefix):
+        commands = []
+        for cmd in self._commands[bisect_left(self._commands, prefix):]:
+            if not cmd.startswith(prefix):
+                break
+            commands.append(cmd)
+        return commands
+
+    def __match_commands(self, pattern):
         regex = re.compile(pattern)
-        for log in self._log:
-            if regex.match(log.command):
-                logs.append(log)
-        return logs
+        return [cmd for cmd in self._commands if regex.match(cmd)]
 
     def __remove_BOM(self):
         # Some windows editor would automatically insert "\xEF\xBB\xBF"
@@ -117,6 +437,7 @@ class SpliterBase(object):
         # is to be dealed with.
         if self._raw_log[0:3] == "\xEF\xBB\xBF":
             self._raw_log = self._raw_log[3:]
+            self._raw_offset = 3
 
     def __str__(self):
         _str = ""
@@ -127,6 +448,13 @@ class SpliterBase(object):
     def __len__(self):
         return len(self._log)
 
+    # the modules use `logspliter or logfile`, the parsed log without
+    # segments(RawSpliter) is still used instead of the logfile name.
+    def __nonzero__(self):
+        return True
+
+    __bool__ = __nonzero__
+
     def __iter__(self):
         self.__index = 0
         return self
@@ -144,35 +472,73 @@ class SpliterBase(object):
         return self.__next__()
 
     def parse(self):
+        if PY3:
+            ## the raw log is decoded, the offsets of text are not the
+            ## offsets in the file.
+            lines = ((0, line) for line in self._raw_log.split("\n"))
+            for command, result, _offsets in self._split(lines):
+                self._log.append(LogSegment(command, result))
+            return
+        lines = iter_text_lines(self._raw_log, self._raw_offset)
+        for command, result, offsets in self._split(lines):
+            self._log.append(LogSegment(command, result, self._log_file, offsets, self._mapped))
+
+    def iterparse(self, file_name, offsets_only=False):
+        """parse the log file line by line and yield the LogSegments, the
+        whole log is never read into memory.
+        """
+        mapped = self._mapped if file_name == self._log_file else MappedLog(file_name)
+        with open(file_name, "rb") as f:
+            offset = 3 if f.read(3) == _BOM else 0
+            f.seek(offset)
+            lines = iter_log_lines(f, offset)
+            if PY3:
+                lines = ((pos, line.decode("utf_8", "replace")) for pos, line in lines)
+            for command, result, offsets in self._split(lines, offsets_only):
+                if offsets_only:
+                    yield LogSegment(command, None, file_name, offsets, mapped)
+                else:
+                    yield LogSegment(command, result, file_name, offsets, mapped)
+
+    def _split(self, lines, offsets_only=False):
+        """the state machine of the command segments. lines are the
+        (offset, line), yield (command, result, (start, end)) of segments.
+        """
         raise SpliterClassException("unknown splliter type %s"%type)
 
 
 class FlexiNSSpliter(SpliterBase):
-    def __init__(self,logfile=None):
+    def __init__(self,logfile=None,offsets_only=False,cache=None,data=None):
         super(FlexiNSSpliter, self).__init__()
         self.__command_start_patten = re.compile(r"^< .*")
         self.__command_execute_patten = re.compile(r"(< )?.*;$")
         self.__command_stop_patten = re.compile(r".*<[_\w]{2}_>$")
+        self.__command_set_patten = re.compile(r"<[\w|_]{3}>")
+        self.__root_command_patten = re.compile(r"< Z.*")
         
         if logfile:
-            self.load(logfile)
+            self.load(logfile, offsets_only, cache, data)
             
     def __get_command(self, command_line):
         return command_line if command_line[0:2] != "< " else command_line[2:]
 
     def __get_current_command_set(self, command_line):
-        raw_set = re.findall(r"<[\w|_]{3}>", command_line)
+        raw_set = self.__command_set_patten.findall(command_line)
         if len(raw_set) == 0:
             return ""
         return raw_set[0][1:4].replace("_", "")
 
-    def parse(self):
-        log_lines = self._raw_log.split("\n")
+    def _split(self, lines, offsets_only=False):
+        """the state machine of the command segments. lines are the
+        (offset, line), yield (command, result, (start, end)) of segments.
+        """
         current_command_set = ""
         current_command = ""
         current_result = []
         start_flag = False
-        for log_line in log_lines:
+        result_start = 0
+        for offset, log_line in lines:
+            next_offset = offset + len(log_line)
             log_line = log_line.rstrip("\r\n\t ")
             # command stop
             if self.__command_stop_patten.match(log_line):
@@ -180,7 +546,7 @@ class FlexiNSSpliter(SpliterBase):
                 if start_flag:
                     if current_command[0] != "Z":
                         current_command = "Z%s"%current_command
-                    self._log.append(LogSegment(current_command, current_result))
+                    yield current_command, current_result, (result_start, offset)
                 start_flag = False
                 current_result = []
 
@@ -192,35 +558,165 @@ class FlexiNSSpliter(SpliterBase):
                     current_command = "%s%s"%(current_command_set, current_command)
                 start_flag = True
                 current_result = []
+                result_start = next_offset
 
             # start a new command
             elif self.__command_start_patten.match(log_line):
                 #refresh the current command set with "Z"
-                if re.match(r"< Z.*", log_line):
+                if self.__root_command_patten.match(log_line):
                     current_command_set = ""
                 start_flag = False
 
             # comman output
             else:
-                if start_flag:
+                if start_flag and not offsets_only:
                     current_result.append(log_line)
 
 
+def command_node(command):
+    """return the node(AS-1, SAB-1) which the FlexiNG command is run on:
+    `ssh <node> ...` or the grep of `/var/log/syslog-<node>.log`, or None.
+    """
+    r = _NODE_SSH_PATTERN.match(command) or _NODE_SYSLOG_PATTERN.search(command)
+    return r.group(1) if r else None
+
+_NODE_SSH_PATTERN = re.compile(r"ssh\s+(?:-\S+\s+)*(?:\S+@)?([\w.-]+)")
+_NODE_SYSLOG_PATTERN = re.compile(r"/syslog-([\w.-]+?)\.log")
+
+
 class FlexiNGSpliter(SpliterBase):
-    def __init__(self):
+    """Spliter of the FlexiNG logs. the segments are the fsclish commands
+    (`show ...`) and the bash commands(`ldapsearch`, `ssh <node> ...`, the
+    greps of syslog). the bash commands are the lines of '# <command>' after
+    the bash prompt, or starting with the known shell commands, the other
+    '# ' lines are output(the comments of ldapsearch). the segments are
+    indexed by the node they are run on too:
+
+        spliter.get_log("ssh AS-1 showstat")
+        spliter.get_log("ssh", node="AS-1")
+    """
+    def __init__(self,logfile=None,offsets_only=False,cache=None,data=None):
         super(FlexiNGSpliter, self).__init__()
+        self.__bash_prompt_patten = re.compile(r"^\[[^\s@\]]+@[^\]]*\]\s*(?:[#$]\s*(.*))?$")
+        self.__clish_prompt_patten = re.compile(r"^\S+@\S+ \[[^\]]*\]\s*>\s?(.*)$")
+        self.__bash_command_patten = re.compile(r"^#\s+(\S.*)$")
+        self.__shell_command_patten = re.compile(r"(ssh|ldapsearch|fsclish|[ezf]?grep|cat|tail|head|showstat)\b")
+        # node index: {node: [position of segment in self._log]}
+        self._nodes = {}
+
+        if logfile:
+            self.load(logfile, offsets_only, cache, data)
+
+    def normalize_command(self, command):
+        return " ".join(command.split())
+
+    def build_index(self):
+        super(FlexiNGSpliter, self).build_index()
+        self._nodes = {}
+        for position, log in enumerate(self._log):
+            node = command_node(log.command)
+            if node:
+                self._nodes.setdefault(node, []).append(position)
+
+    def get_nodes(self):
+        """return the sorted nodes which the commands are run on.
+        """
+        return sorted(self._nodes)
+
+    def get_log(self, command, match_head = False, fuzzy = False, exact = False, node = None):
+        """return the segments of command in the order of the log, the same
+        as SpliterBase.get_log. with node, only the segments run on the node
+        are returned.
+        """
+        if node is None:
+            return super(FlexiNGSpliter, self).get_log(command, match_head, fuzzy, exact)
+        if match_head and fuzzy:
+            raise SpliterInterfaceException("Do not use match_head and fuzzy simultaneously")
+        count('log_lookup')
+        on_node = set(self._nodes.get(node, []))
+        return [self._log[pos] for pos in self._find_positions(command, fuzzy, exact)
+                if pos in on_node]
+
+    def __get_command(self, log_line, after_prompt):
+        """return (command, is_bash_prompt) of the line. command is None for
+        the output lines, '' for the prompts without command.
+        """
+        r = self.__bash_prompt_patten.match(log_line)
+        if r:
+            return r.group(1) or "", not r.group(1)
+        r = self.__clish_prompt_patten.match(log_line)
+        if r:
+            return r.group(1), False
+        r = self.__bash_command_patten.match(log_line)
+        if r and (after_prompt or self.__shell_command_patten.match(r.group(1))):
+            return r.group(1), False
+        return None, False
+
+    def _split(self, lines, offsets_only=False):
+        """the state machine of the command segments. a segment ends at the
+        next command or prompt.
+        """
+        current_command = ""
+        current_result = []
+        result_start = 0
+        after_prompt = False
+        next_offset = 0
+        for offset, log_line in lines:
+            next_offset = offset + len(log_line)
+            log_line = log_line.rstrip("\r\n\t ")
+            command, after_prompt = self.__get_command(log_line, after_prompt)
+            # comman output
+            if command is None:
+                if current_command and not offsets_only:
+                    current_result.append(log_line)
+                continue
+
+            if current_command:
+                yield current_command, current_result, (result_start, offset)
+            current_command = self.normalize_command(command)
+            current_result = []
+            result_start = next_offset
+
+        if current_command:
+            yield current_command, current_result, (result_start, next_offset)
+
+
+class RawSpliter(SpliterBase):
+    """Spliter keeps the raw log only, for the logs without command segments,
+    such as the OSS json data.
+    """
+    cache_segments = False
+
+    def __init__(self,logfile=None,offsets_only=False,cache=None,data=None):
+        super(RawSpliter, self).__init__()
+
+        # the raw log is read from the file when it's used, the OSS reports
+        # are read row by row and never kept in memory.
+        if logfile:
+            self.load(logfile, True, cache, data)
 
     def parse(self):
-        raise SpliterClassException("does not implement")
+        pass
+
+    def iterparse(self, file_name, offsets_only=False):
+        return iter([])
 
 
 class LogSpliter(object):
-    def __new__(cls, type=LOG_TYPE_FLEXI_NS,logfile=None):
+    def __new__(cls, type=LOG_TYPE_FLEXI_NS,logfile=None,offsets_only=False,cache=None,data=None):
         if type == LOG_TYPE_FLEXI_NS:
             ob = object.__new__(FlexiNSSpliter)
         elif type == LOG_TYPE_FLEXI_NG:
             ob = object.__new__(FlexiNGSpliter)
+        elif type == LOG_TYPE_RAW:
+            ob = object.__new__(RawSpliter)
         else:
             raise SpliterClassException("unknown splliter type %s"%type)
-        ob.__init__(logfile)
+        ob.__init__(logfile,offsets_only,cache,data)
         return ob
+
+
+def netype_log_type(netype):
+    """return the spliter type for the netype of checklist.
+    """
+    return NETYPE_LOG_TYPES.get(netype, LOG_TYPE_RAW)
@@ -6,13 +6,23 @@ __author__  = 'jun1.liu@nokia.com'
 
 import os
 import re
+from cStringIO import StringIO
 from collections import defaultdict
 
 LOGFILE_POSTFIX = ['.log','.txt','.json']
 
-log_patterns = {'FlexiNG' : re.compile("fsclish"),
-                'FlexiNS' : re.compile("COMMAND EXECUTED"),
-                'FlexiNSNG_OSS' : re.compile(".")}
+## the log type is known by the markers in the head and the tail of the log,
+## the OSS reports are json objects.
+SNIFF_SIZE = 64*1024
+log_markers = {'FlexiNG' : re.compile(r"fsclish|fsLogicalNetworkElemId|^Flexi NG\s",re.M),
+               'FlexiNS' : re.compile(r"COMMAND EXECUTED|^Flexi NS\s",re.M)}
+OSS_LOG_TYPE = 'FlexiNSNG_OSS'
+_BOM = b"\xEF\xBB\xBF"
+
+## {abspath: ((size, mtime), log types)} of the sniffed logs, at most
+## SNIFF_CACHE_SIZE logs.
+SNIFF_CACHE_SIZE = 10000
+_sniff_cache = {}
 
 class LogFileError(Exception):
     pass
@@ -23,36 +33,83 @@ def istextfile(filename):
             return True
     return False
 
+def sniff_data(head,tail=b''):
+    """return the set of log types found in the head and the tail of a log.
+    """
+    if head.startswith(_BOM):
+        head = head[len(_BOM):]
+    if head.lstrip()[:1] in (b'{',b'['):
+        return set([OSS_LOG_TYPE])
+    types = set()
+    for netype,pattern in log_markers.items():
+        if pattern.search(head) or pattern.search(tail):
+            types.add(netype)
+    return types
+
+def sniff_log_types(filename,data=None):
+    """return the set of log types of the log, only the first and the last
+    SNIFF_SIZE bytes are read. the types of the logfile are cached by the
+    path, size and mtime of the file.
+    """
+    if data is not None:
+        return sniff_data(data[:SNIFF_SIZE],data[max(len(data) - SNIFF_SIZE,SNIFF_SIZE):])
+
+    st = os.stat(filename)
+    abspath = os.path.abspath(filename)
+    identity = (st.st_size,st.st_mtime)
+    entry = _sniff_cache.get(abspath)
+    if entry and entry[0] == identity:
+        return entry[1]
+
+    with open(filename,'rb') as f:
+        head = f.read(SNIFF_SIZE)
+        f.seek(max(st.st_size - SNIFF_SIZE,SNIFF_SIZE))
+        tail = f.read()
+    types = sniff_data(head,tail)
+    if len(_sniff_cache) >= SNIFF_CACHE_SIZE:
+        prune_sniff_cache()
+        if len(_sniff_cache) >= SNIFF_CACHE_SIZE:
+            _sniff_cache.clear()
+    _sniff_cache[abspath] = (identity,types)
+    return types
+
+def prune_sniff_cache():
+    """remove the logs which do not exist any more from the cache.
+    """
+    for abspath in list(_sniff_cache):
+        if not os.path.exists(abspath):
+            del _sniff_cache[abspath]
+
 class LogFile:
-    """Handling the logfile for analysis
+    """Handling the logfile for analysis, data is the content of the log
+    read from an archive.
     """
 
-    def __init__(self,filename):
+    def __init__(self,filename,data=None):
         _path,_name = os.path.split(filename)
         self.path = _path
         self.filename = None
+        self.logname = filename
+        self.data = data
 
-        _postfix = filename.split('.')[-1]
-        if filename and istextfile(filename):
-            self.fp = file(filename)
-            self.filename = _name            
-        else:
-            self.fp = None
+        if data is not None or (filename and istextfile(filename)):
+            self.filename = _name
 
     @property   
     def state(self):
-        return bool(self.fp)
+        return self.data is not None or \
+               bool(self.filename and os.path.isfile(self.logname))
 
     def loglines(self):
-        return self.fp.readlines()
+        if self.data is not None:
+            return StringIO(self.data).readlines()
+        with open(self.logname) as f:
+            return f.readlines()
 
     def match(self,netype):
         """return True if the log type match the netype.
         """
-        for line in self.loglines():
-            if log_patterns[netype].search(line):
-                return True
-        return False
+        return netype in sniff_log_types(self.logname,self.data)
 
     def __repr__(self):
         return "LogFile(%s)" % self.filename
@@ -5,6 +5,8 @@ __author__  = 'jun1.liu@nokia.com'
 
 from collections import defaultdict
 
+COMMAND_END_MARK = "COMMAND EXECUTED"
+
 class NetworkElement(object):
     """Abstract Class parse and stroe basic infomation of network Element   
     """
@@ -15,7 +17,23 @@ class NetworkElement(object):
         self.checkresult = None
         
         if logfile:
-            self.parse_log(logfile)
+            self.load_log(logfile)
+
+    def load_log(self,logfile):
+        """parse the log, the data is read from the cache of the parsed log
+        (LogSpliter) if it has been extracted before.
+        """
+        kind = self.__class__.__name__
+        _data = None
+        if hasattr(logfile,'get_cached'):
+            _data = logfile.get_cached(kind)
+        if _data is not None:
+            self._data.update(_data)
+            return
+
+        self.parse_log(logfile)
+        if hasattr(logfile,'set_cached'):
+            logfile.set_cached(kind,self._data)
 
     def parse_log(self,logfile):
         """Extract the data from log and store it to self._data.
@@ -56,6 +74,85 @@ the version could be a list include multi version id. or a string of version id.
     def version(self):
         return self._data['version']
 
+def _match_data(datainfo,text):
+    """match the pattern of datainfo in text, return the groups/list or None.
+    """
+    method = datainfo.get('match_method','search')
+    pat = datainfo['pattern']
+
+    if method == 'search':
+        r = pat.search(text)
+        if not r:
+            return None
+        _data = r.groups()
+    elif method == 'findall':
+        _data = pat.findall(text)
+        if not _data:
+            return None
+    else:
+        raise ValueError("unknown match_method: %s" % method)
+    return _data
+
+def _named_data(datainfo,_data):
+    names = datainfo.get('names')
+    if names and _data is not None:
+        return dict(zip(names,_data))
+    return _data
+
+def scan_data(specs,loglines):
+    """extract the data of all the specs from the loglines in one pass, the
+    scanning stops once every spec has been captured, the specs of
+    scan 'all' are captured to the end of loglines.
+    Arguments:
+        specs:      a dict of {key: datainfo}, datainfo is the same as the one
+                    of extract_data, and:
+             command:   the command block is from the line including 'command'
+                        to the line including 'end'. if command is None, the
+                        pattern is matched line by line.
+                 end:   the end mark of command block, 'COMMAND EXECUTED'
+                        by default.
+               names:   if names is None, the matched groups/list is returned.
+                scan:   'first'(default), the data of the first match.
+                        'all', the data of all the blocks/lines: the lists
+                        of findall are joined, the last match of search.
+        loglines:   the lines or an iterator of lines.
+    Return:
+        a dict of {key: data}, data is None if it's not found.
+    """
+    found = dict.fromkeys(specs)
+    pending = dict(specs)
+    ## the lines of the command blocks in reading. {key: [lines]}
+    blocks = {}
+
+    for line in loglines:
+        for key,datainfo in pending.items():
+            command = datainfo.get('command')
+            if command is None:
+                _data = _match_data(datainfo,line)
+            elif key in blocks:
+                blocks[key].append(line)
+                if datainfo.get('end',COMMAND_END_MARK) not in line:
+                    continue
+                _data = _match_data(datainfo,"".join(blocks.pop(key)))
+            else:
+                if command in line:
+                    blocks[key] = [line]
+                continue
+
+            if _data is None:
+                continue
+            if datainfo.get('scan','first') == 'first':
+                found[key] = _data
+                del pending[key]
+            elif datainfo.get('match_method','search') == 'findall':
+                found[key] = (found[key] or []) + _data
+            else:
+                found[key] = _data
+        if not pending:
+            break
+
+    return dict((key,_named_data(specs[key],_data)) for key,_data in found.items())
+
 def extract_data(datainfo,loglines):
     """return a dict include the data extract from the loglines.
     Arguments:
@@ -67,23 +164,4 @@ def extract_data(datainfo,loglines):
     Return:
         a dict include the data with name.
     """
-    logtxt = read_cmdblock_from_log(loglines,datainfo['command'])
-
-    names = datainfo['names']
-    method = datainfo['match_method']
-    pat = datainfo['pattern']
-
-    if method == 'search':
-        r = pat.search(logtxt)
-        if r:
-            _data = r.groups()
-        else:
-            return None    
-    elif method == 'findall':
-        r = pat.findall(logtxt)
-        if r:
-            _data = r
-        else:
-            return None
-
-    return dict(zip(names,_data))        
\ No newline at end of file
+    return scan_data({'data':datainfo},loglines)['data']
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Read the report files of OSS_query_v2 row by row.
+
+The report is written in JSON Lines: the first line is the json object
+{"columndesc": [...]}, and every following line is the json array of one
+row, the same as an item of 'columns' in the old report. The old report
+(one json object with 'columndesc' and 'columns') is still readable, but it
+is loaded as a whole.
+Usage:
+    from libs.ossreport import read_report
+
+    columndesc,rows = read_report(logspliter or logfile)
+    for row in rows:
+        print row[0]
+"""
+import json
+from usage import count
+
+_BOM = b'\xef\xbb\xbf'
+
+def report_filename(logfile):
+    """the logfile could be a filename or a log spliter.
+    """
+    return getattr(logfile,'log_file',None) or logfile
+
+def open_report(logfile):
+    """open the report as a binary file, the log spliter opens the report
+    read from an archive in memory.
+    """
+    if hasattr(logfile,'open_log'):
+        return logfile.open_log()
+    return open(report_filename(logfile),'rb')
+
+def _iter_rows(fp):
+    size = fp.tell()
+    try:
+        with fp:
+            for line in fp:
+                size += len(line)
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    finally:
+        count('bytes_read',size)
+
+def read_report(logfile):
+    """return (columndesc, the iterator of rows) of the report.
+    """
+    fp = open_report(logfile)
+    line = fp.readline()
+    if line[0:3] == _BOM:
+        line = line[3:]
+    try:
+        header = json.loads(line)
+    except ValueError:
+        header = None
+    if isinstance(header,dict) and 'columns' not in header:
+        return header.get('columndesc',[]),_iter_rows(fp)
+
+    ## the old report, a json object in multiple lines.
+    with fp:
+        fp.seek(0)
+        text = fp.read()
+    count('bytes_read',len(text))
+    if text[0:3] == _BOM:
+        text = text[3:]
+    report = json.loads(text)
+    return report.get('columndesc',[]),iter(report.get('columns',[]))
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""The on-disk cache of the parsed logs.
+
+The parsed data(command segments, element info) of a logfile is pickled to
+the cache directory, keyed by the size, mtime and content hash of the
+logfile. The least recently used entries are removed when the total size
+exceeds the max_size.
+Usage:
+    from parsecache import ParseCache
+
+    cache = ParseCache('cache/', max_size=500*1024*1024)
+    data = cache.get('log/MME09.log','FlexiNS')
+    if data is None:
+        data = parse('log/MME09.log')
+        cache.set('log/MME09.log','FlexiNS',data)
+"""
+import os
+import time
+import hashlib
+import cPickle as pickle
+
+## change it when the format of the cached data is changed.
+CACHE_VERSION = 2
+CACHE_POSTFIX = '.pickle'
+LEDGER_NAME = '_ledger'
+## the file modified within this seconds after its mtime could be changed
+## again without changing the mtime(the resolution of mtime), it's hashed
+## again.
+MTIME_RESOLUTION = 2
+
+def file_hash(filename,blocksize=1024*1024):
+    """return the sha1 hex digest of the file content.
+    """
+    sha1 = hashlib.sha1()
+    with open(filename,'rb') as f:
+        for block in iter(lambda: f.read(blocksize),b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+def _replace_file(src,dst):
+    ## os.rename can not overwrite the existing file on windows.
+    if os.name == 'nt' and os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src,dst)
+
+class ParseCache(object):
+    """The LRU cache of parsed logs in the directory 'path'.
+    """
+    def __init__(self,path,max_size=500*1024*1024):
+        self.path = path
+        self.max_size = max_size
+        ## {abspath: (size, mtime, hash, hashed time)}, the content hash is
+        ## computed again if the size or mtime of the file is changed, or
+        ## the file was hashed within MTIME_RESOLUTION after its mtime.
+        self._ledger = None
+
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def key(self,filename):
+        """return the cache key of the file: size + mtime + content hash.
+        """
+        st = os.stat(filename)
+        identity = (st.st_size,st.st_mtime)
+        ledger = self._load_ledger()
+        abspath = os.path.abspath(filename)
+        entry = ledger.get(abspath)
+        if entry and len(entry) == 4 and entry[:2] == identity and \
+           entry[3] - st.st_mtime > MTIME_RESOLUTION:
+            digest = entry[2]
+        else:
+            hashed = time.time()
+            digest = file_hash(filename)
+            ledger[abspath] = identity + (digest,hashed)
+            self._save_ledger()
+        return "%s_%s_%s" % (identity[0],int(identity[1]),digest)
+
+    def entry_path(self,filename,kind):
+        return os.path.join(self.path,"%s.%s.v%s%s" % (self.key(filename),kind,
+                                                      CACHE_VERSION,CACHE_POSTFIX))
+
+    def get(self,filename,kind):
+        """return the cached data of 'kind' for the file, or None.
+        """
+        try:
+            path = self.entry_path(filename,kind)
+            with open(path,'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return None
+        ## update the mtime for LRU.
+        try:
+            os.utime(path,None)
+        except OSError:
+            pass
+        return data
+
+    def set(self,filename,kind,data):
+        """save the data of 'kind' for the file, return False if failed.
+        """
+        try:
+            path = self.entry_path(filename,kind)
+            tmppath = "%s.%s.tmp" % (path,os.getpid())
+            with open(tmppath,'wb') as f:
+                pickle.dump(data,f,pickle.HIGHEST_PROTOCOL)
+            _replace_file(tmppath,path)
+        except (IOError,OSError,pickle.PicklingError):
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """remove the least recently used entries until the total size is
+        less than max_size.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.path):
+            if not name.endswith(CACHE_POSTFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.path,name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime,st.st_size,name))
+            total += st.st_size
+
+        for mtime,size,name in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.path,name))
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.path):
+            if name.endswith(CACHE_POSTFIX) or name == LEDGER_NAME:
+                os.remove(os.path.join(self.path,name))
+        self._ledger = None
+
+    def _load_ledger(self):
+        if self._ledger is None:
+            try:
+                with open(os.path.join(self.path,LEDGER_NAME),'rb') as f:
+                    self._ledger = pickle.load(f)
+            except Exception:
+                self._ledger = {}
+        return self._ledger
+
+    def _save_ledger(self):
+        path = os.path.join(self.path,LEDGER_NAME)
+        tmppath = "%s.%s.tmp" % (path,os.getpid())
+        try:
+            with open(tmppath,'wb') as f:
+                pickle.dump(self._ledger,f,pickle.HIGHEST_PROTOCOL)
+            _replace_file(tmppath,path)
+        except (IOError,OSError):
+            pass
+
+    def __repr__(self):
+        return "ParseCache(%s)" % self.path
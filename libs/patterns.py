@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""The registry of the regex patterns and TextFSM templates used by the check
+modules. Every pattern/template is compiled once per process and shared by
+all the runs and logfiles.
+Usage:
+    from libs.patterns import patterns
+
+    pat = patterns.compile(r"COMMAND\s+EXECUTED")
+    r = patterns.search(r"(\d+)\s+(\w+)", line)
+    rows = patterns.fsm_parse('modules/flexins/fsm_module/woi.fsm', logtxt)
+    print patterns.stats()
+"""
+import os
+import re
+import threading
+from collections import Counter
+from usage import count as _count
+
+def normalize_path(filename):
+    """the template paths in modules are written with '\\', make them work on
+    the other platforms.
+    """
+    return os.path.normpath(filename.replace('\\',os.sep).replace('/',os.sep))
+
+class PatternRegistry(object):
+    """compile and cache the regex patterns and TextFSM templates, count the
+    compiles and the cache hits.
+    """
+    def __init__(self):
+        self._patterns = {}
+        ## {template path: (TextFSM, lock)}
+        self._templates = {}
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def compile(self,pattern,flags=0):
+        key = (type(pattern),pattern,flags)
+        with self._lock:
+            regex = self._patterns.get(key)
+            if regex is None:
+                regex = self._patterns[key] = re.compile(pattern,flags)
+                self._stats['regex_compiled'] += 1
+            else:
+                self._stats['regex_hits'] += 1
+        return regex
+
+    def search(self,pattern,string,flags=0):
+        _count('regex')
+        return self.compile(pattern,flags).search(string)
+
+    def match(self,pattern,string,flags=0):
+        _count('regex')
+        return self.compile(pattern,flags).match(string)
+
+    def findall(self,pattern,string,flags=0):
+        _count('regex')
+        return self.compile(pattern,flags).findall(string)
+
+    def sub(self,pattern,repl,string,count=0,flags=0):
+        _count('regex')
+        return self.compile(pattern,flags).sub(repl,string,count)
+
+    def fsm(self,template):
+        """return the (TextFSM, lock) of the template file.
+        """
+        path = normalize_path(template)
+        with self._lock:
+            entry = self._templates.get(path)
+            if entry is not None:
+                self._stats['fsm_hits'] += 1
+                return entry
+
+        import textfsm
+        with open(path) as f:
+            _fsm = textfsm.TextFSM(f)
+
+        with self._lock:
+            ## the template may be compiled by another thread meanwhile.
+            if path not in self._templates:
+                self._templates[path] = (_fsm,threading.Lock())
+                self._stats['fsm_compiled'] += 1
+            return self._templates[path]
+
+    def fsm_parse(self,template,text):
+        """parse the text with the TextFSM template, return the rows.
+        """
+        _count('fsm_parse')
+        _fsm,lock = self.fsm(template)
+        with lock:
+            _fsm.Reset()
+            return _fsm.ParseText(text)
+
+    def stats(self):
+        """return the counts of compiles and cache hits:
+        {'regex_compiled':.., 'regex_hits':.., 'fsm_compiled':.., 'fsm_hits':..}
+        """
+        with self._lock:
+            _stats = dict.fromkeys(['regex_compiled','regex_hits','fsm_compiled','fsm_hits'],0)
+            _stats.update(self._stats)
+        return _stats
+
+    def clear(self):
+        with self._lock:
+            self._patterns = {}
+            self._templates = {}
+            self._stats = Counter()
+
+    def __repr__(self):
+        return "PatternRegistry(patterns:%s, templates:%s)" % (len(self._patterns),len(self._templates))
+
+patterns = PatternRegistry()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""The time series of the PM counters in the OSS NESta reports.
+
+The rows of the report (NE_NAME, Date, Time, StatType, counter...) are
+loaded into one series per NE and counter, the values are kept in arrays
+ordered by the time. The series computes the threshold flags, deltas,
+rolling baselines and anomaly flags for the counter based modules.
+Usage:
+    from libs.ossreport import read_report
+    from libs.pmseries import PMTable
+
+    columndesc,rows = read_report(logspliter or logfile)
+    pm = PMTable(columndesc,rows)
+    for series in pm.series('QOS_DL_DROP_QCI'):
+        print series.ne, series.max(), series.anomalies(window=4)
+"""
+import math
+from array import array
+
+## the columns before the counters in NESta report.
+NE_NAME, DATE, TIME, STAT_TYPE = range(4)
+COUNTER_START = 4
+
+def to_value(text):
+    """return the float value of the counter, None for the empty value.
+    """
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+class CounterSeries(object):
+    """the values of one counter of one NE, ordered by the time.
+    """
+    def __init__(self, ne, counter):
+        self.ne = ne
+        self.counter = counter
+        self.times = []
+        self.values = array('d')
+        self._sorted = True
+
+    def append(self, time, value):
+        if self.times and time < self.times[-1]:
+            self._sorted = False
+        self.times.append(time)
+        self.values.append(value)
+
+    def sort(self):
+        if not self._sorted:
+            points = sorted(zip(self.times, self.values))
+            self.times = [t for t, v in points]
+            self.values = array('d', [v for t, v in points])
+            self._sorted = True
+
+    def __len__(self):
+        return len(self.values)
+
+    def max(self):
+        return max(self.values) if self.values else None
+
+    def over(self, threshold):
+        """return the flags of the values greater than threshold.
+        """
+        return [v > threshold for v in self.values]
+
+    def deltas(self):
+        """return the changes from the previous value, 0 for the first.
+        """
+        values = self.values
+        return [0.0] + [values[i] - values[i-1] for i in xrange(1, len(values))]
+
+    def baseline(self, window=4):
+        """return the mean of the previous 'window' values, None if there
+        is no previous value.
+        """
+        result = []
+        total = 0.0
+        values = self.values
+        for i, v in enumerate(values):
+            n = min(i, window)
+            result.append(total / n if n else None)
+            total += v
+            if i >= window:
+                total -= values[i-window]
+        return result
+
+    def anomalies(self, window=4, factor=3.0, min_change=None):
+        """return the flags of the values which are more than 'factor'
+        standard deviations and more than 'min_change' away from the mean
+        of the previous 'window' values. if the previous values are all the
+        same (e.g. all 0), the value is flagged only when 'min_change' is
+        given. the first 'window' values are not flagged.
+        """
+        flags = [False] * min(window, len(self.values))
+        values = self.values
+        for i in xrange(window, len(values)):
+            previous = values[i-window:i]
+            mean = sum(previous) / window
+            std = math.sqrt(sum((p - mean) ** 2 for p in previous) / window)
+            change = abs(values[i] - mean)
+            if std == 0 and min_change is None:
+                flags.append(False)
+            else:
+                flags.append(change > factor * std and change > (min_change or 0))
+        return flags
+
+    def increases(self, window=4, factor=3.0, min_change=None):
+        """return the flags of the anomalies greater than the baseline.
+        """
+        baseline = self.baseline(window)
+        anomalies = self.anomalies(window, factor, min_change)
+        return [f and v > b for f, v, b in zip(anomalies, self.values, baseline)]
+
+    def points(self, flags):
+        """return the (time, value) of the flagged values.
+        """
+        return [(t, v) for t, v, f in zip(self.times, self.values, flags) if f]
+
+    def __repr__(self):
+        return "CounterSeries(%s, %s, %s points)" % (self.ne, self.counter, len(self))
+
+class PMTable(object):
+    """the series of all the NEs and counters in one NESta report.
+    """
+    def __init__(self, columndesc, rows=()):
+        self.counters = list(columndesc[COUNTER_START:])
+        ## {(ne, counter): CounterSeries}
+        self._series = {}
+        self._elements = []
+        for row in rows:
+            self.append(row)
+
+    def append(self, row):
+        ne = row[NE_NAME]
+        time = row[DATE] + ' ' + row[TIME]
+        for index, counter in enumerate(self.counters, COUNTER_START):
+            value = to_value(row[index]) if index < len(row) else None
+            if value is None:
+                continue
+            key = (ne, counter)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = CounterSeries(ne, counter)
+                if ne not in self._elements:
+                    self._elements.append(ne)
+            series.append(time, value)
+
+    def elements(self):
+        """return the NE names in the order of the report.
+        """
+        return list(self._elements)
+
+    def get(self, ne, counter):
+        series = self._series.get((ne, counter))
+        if series is not None:
+            series.sort()
+        return series
+
+    def series(self, counter=None):
+        """return the series of the counter (all counters if None), in the
+        order of the NEs.
+        """
+        counters = self.counters if counter is None else [counter]
+        result = []
+        for ne in self._elements:
+            for c in counters:
+                series = self.get(ne, c)
+                if series is not None:
+                    result.append(series)
+        return result
+
+    def __len__(self):
+        return len(self._series)
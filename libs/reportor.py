@@ -1,24 +1,72 @@
 # -*- coding: utf-8 -*-
 
 import re,os
-from jinja2 import Environment, FileSystemLoader,Template
-from jinja2.exceptions import TemplateNotFound
+import threading
+from jinja2 import Environment, FileSystemLoader,Template,FileSystemBytecodeCache
+from jinja2.exceptions import TemplateNotFound,TemplateError
+
+EXTENSIONS = ['jinja2.ext.do']
+
+## the Environments shared in the process, {(template path, cache path): env}
+_environments = {}
+_env_lock = threading.Lock()
+
+def get_environment(path='./',cache_path=None):
+    """return the Environment of the template path shared in the process.
+    the loaded templates are kept in the Environment and reloaded when the
+    template files are changed. if cache_path is given, the compiled
+    templates are saved in the directory and reused by the next runs.
+    """
+    key = (os.path.abspath(path),cache_path and os.path.abspath(cache_path))
+    env = _environments.get(key)
+    if env is not None:
+        return env
+
+    with _env_lock:
+        env = _environments.get(key)
+        if env is None:
+            bytecode_cache = None
+            if cache_path:
+                if not os.path.isdir(cache_path):
+                    os.makedirs(cache_path)
+                bytecode_cache = FileSystemBytecodeCache(cache_path)
+            env = Environment(loader=FileSystemLoader(path),
+                              extensions=EXTENSIONS,
+                              bytecode_cache=bytecode_cache,
+                              auto_reload=True)
+            _environments[key] = env
+    return env
+
+def precompile_templates(path='./',cache_path=None):
+    """load all the templates in the template path into the shared
+    Environment, return the names of compiled templates. the templates with
+    errors are skipped, the error is raised when it's used.
+    """
+    env = get_environment(path,cache_path)
+    compiled = []
+    for name in env.list_templates():
+        try:
+            env.get_template(name)
+        except TemplateError:
+            continue
+        compiled.append(name)
+    return compiled
 
 
 class JinjaTemplate(object):
-    """A generator of Jinja Template
+    """A generator of Jinja Template, the templates of the same path are
+loaded once in the process.
 Usage:
     tmpl = JinjiaTemplate()
     tmpl.load(filename=template_filename)
     tmpl.load('template_str')
     tmpl.render()
     """
-    def __init__(self,path='./'):
+    def __init__(self,path='./',cache_path=None):
         self.template_path = path
-        self.loader = FileSystemLoader(path)
-        self.extensions = ['jinja2.ext.do']
-        self.env=Environment(loader=self.loader,
-                             extensions=self.extensions)
+        self.extensions = EXTENSIONS
+        self.env = get_environment(path,cache_path)
+        self.loader = self.env.loader
         
     def load(self,template_string=None,filename=None):
         if filename:
@@ -37,6 +85,15 @@ Usage:
     
     def render(self, **kwargs):
         return self.template.render(**kwargs)
+
+    def dump(self, filename, data, buffer_size=64*1024):
+        """render the template with the dict data to the file chunk by chunk
+        in utf-8, the rendered text is never kept in memory as a whole. the
+        file is flushed when buffer_size bytes are buffered.
+        """
+        with open(filename,'wb',buffer_size) as fp:
+            for chunk in self.template.generate(data):
+                fp.write(chunk.encode('utf-8') if isinstance(chunk,unicode) else chunk)
     
 class CheckReport(object):
     """Class generate report with multi formats.
@@ -51,8 +108,6 @@ class CheckReport(object):
         self.data = {}
         self.report = None
         self.template_path = template_path
-
-        self.env = Environment(loader=FileSystemLoader(self.template_path))
         
     def load_data(self):
         """excute the getdata functions from reportConfig
@@ -70,7 +125,7 @@ class CheckReport(object):
 
         #print "%s/%s" % (template_env.loader.searchpath[0],template_name)
         try:
-            tmpl = template_env.get_template(template_name)
+            tmpl = get_environment(self.template_path).get_template(template_name)
         except TemplateNotFound,e:
             msg = "template: %s not found." % e
             return False, msg
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Run the check modules of one log in the order of their dependencies.
+
+A check module declares the shared information it sets and reads:
+
+    provides = ['ELEMENT']      # nsinfo.py sets shareinfo 'ELEMENT'
+    requires = ['ELEMENT']      # the TN modules read it
+
+The module runs after all the modules providing what it requires, and the
+modules providing the same key run in the checklist order. A module
+declaring neither 'provides' nor 'requires' runs after all the modules before it
+and before all the modules after it, the same as the serial checking.
+The modules without dependencies between them run in a pool of threads, the
+results are returned in the checklist order.
+Usage:
+    from libs.scheduler import run_modules
+
+    results = run_modules(checklist.modules, lambda m: run_module(m,logfile), jobs=4)
+"""
+import sys
+import threading
+import Queue
+
+class SchedulerError(Exception):
+    pass
+
+def module_declared(module):
+    return hasattr(module,'provides') or hasattr(module,'requires')
+
+def build_graph(modules):
+    """return the list of the dependencies(set of the indexes in modules) of
+    every module.
+    """
+    providers = {}
+    for idx,m in enumerate(modules):
+        for key in getattr(m,'provides',[]):
+            providers.setdefault(key,[]).append(idx)
+
+    deps = [set() for m in modules]
+    barrier = None
+    for idx,m in enumerate(modules):
+        if not module_declared(m):
+            ## depends on all the modules before it.
+            deps[idx].update(range(idx))
+            barrier = idx
+            continue
+        if barrier is not None:
+            deps[idx].add(barrier)
+        for key in getattr(m,'requires',[]):
+            deps[idx].update(i for i in providers.get(key,[]) if i != idx)
+        for key in getattr(m,'provides',[]):
+            earlier = [i for i in providers[key] if i < idx]
+            if earlier:
+                deps[idx].add(earlier[-1])
+    check_graph(modules,deps)
+    return deps
+
+def check_graph(modules,deps):
+    """raise SchedulerError if there is a dependency cycle.
+    """
+    state = {}
+    def visit(idx,path):
+        if state.get(idx) == 'done':
+            return
+        if state.get(idx) == 'visiting':
+            names = [getattr(modules[i],'__name__',str(i)) for i in path + [idx]]
+            raise SchedulerError("Dependency cycle: %s" % ' -> '.join(names))
+        state[idx] = 'visiting'
+        for dep in sorted(deps[idx]):
+            visit(dep,path + [idx])
+        state[idx] = 'done'
+    for idx in range(len(modules)):
+        visit(idx,[])
+
+def run_modules(modules,runner,jobs=1,context=None):
+    """run runner(module) for every module, return the results in the order
+    of modules. the modules are run in 'jobs' threads, the threads activate
+    the RunContext 'context' of the log.
+    """
+    deps = build_graph(modules)
+    if jobs <= 1 or len(modules) <= 1:
+        ## a topological order which keeps the checklist order if possible.
+        results = [None] * len(modules)
+        done = set()
+        while len(done) < len(modules):
+            for idx in range(len(modules)):
+                if idx not in done and deps[idx] <= done:
+                    results[idx] = runner(modules[idx])
+                    done.add(idx)
+                    break
+        return results
+
+    results = [None] * len(modules)
+    remaining = [set(d) for d in deps]
+    dependents = [[] for m in modules]
+    for idx,d in enumerate(deps):
+        for dep in d:
+            dependents[dep].append(idx)
+
+    tasks = Queue.Queue()
+    finished = Queue.Queue()
+    ## set when a module failed, the queued modules are skipped.
+    stopped = threading.Event()
+
+    def worker():
+        while True:
+            idx = tasks.get()
+            if idx is None:
+                break
+            if stopped.is_set():
+                continue
+            try:
+                if context is not None:
+                    with context:
+                        result = runner(modules[idx])
+                else:
+                    result = runner(modules[idx])
+                finished.put((idx,result,None))
+            except Exception:
+                finished.put((idx,None,sys.exc_info()))
+
+    threads = [threading.Thread(target=worker) for i in range(min(jobs,len(modules)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    try:
+        for idx in range(len(modules)):
+            if not remaining[idx]:
+                tasks.put(idx)
+        for n in range(len(modules)):
+            idx,result,exc_info = finished.get()
+            if exc_info:
+                raise exc_info[0],exc_info[1],exc_info[2]
+            results[idx] = result
+            for dependent in dependents[idx]:
+                remaining[dependent].discard(idx)
+                if not remaining[dependent]:
+                    tasks.put(dependent)
+    finally:
+        stopped.set()
+        for thread in threads:
+            tasks.put(None)
+        for thread in threads:
+            thread.join()
+    return results
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Test the boundaries of the elements split from one log.
+
+    python libs/test_elements.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from libs.elements import split_elements
+
+MME09 = """< ZWQO:CR;
+
+Flexi NS  SHMME09BNK                2016-07-20  22:20:01
+
+PACKAGES CREATED IN SHMME09BNK:
+
+COMMAND EXECUTED
+"""
+
+MME08 = MME09.replace('MME09','MME08')
+
+def write_log(text):
+    fd,filename = tempfile.mkstemp(suffix='.log')
+    with os.fdopen(fd,'wb') as f:
+        f.write(text)
+    return filename
+
+def check_split(text,logs):
+    filename = write_log(text)
+    try:
+        ranges = split_elements(filename)
+        assert [r.hostname for r in ranges] == [hostname for hostname,_ in logs]
+        assert [r.read() for r in ranges] == [log for _,log in logs]
+        assert [r.spans[0][0] for r in ranges][1:] == [len(logs[0][1])]
+    finally:
+        os.remove(filename)
+
+def test_split_at_login():
+    ## the login before MME08 belongs to MME08.
+    login = "ENTER USERNAME < SYSTEM\nENTER PASSWORD < ******\n"
+    check_split(MME09 + login + MME08,
+                [('SHMME09BNK',MME09),('SHMME08BNK',login + MME08)])
+
+def test_split_at_command():
+    ## without login, the log is split at the first command after MME09.
+    check_split(MME09 + "\n" + MME08,
+                [('SHMME09BNK',MME09 + "\n"),('SHMME08BNK',MME08)])
+
+def test_one_element():
+    filename = write_log(MME09 + MME09)
+    try:
+        ranges = split_elements(filename)
+        assert len(ranges) == 1
+        assert ranges[0].read() == MME09 + MME09
+    finally:
+        os.remove(filename)
+
+if __name__ == "__main__":
+    for name,func in sorted(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print name,'OK'
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Test the command segments of log_spliter on the logs of windows(CRLF).
+
+    python libs/test_log_spliter.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from libs.log_spliter import LogSpliter, LOG_TYPE_FLEXI_NS, LOG_TYPE_FLEXI_NG
+
+NS_LOG = ["\xEF\xBB\xBF",
+          "< ZWQO:CR;",
+          "",
+          "LOADING PROGRAM VERSION 23.11-0",
+          "",
+          "Flexi NS  SHMME09BNK                2016-07-20  22:20:01",
+          "",
+          "PACKAGES CREATED IN SHMME09BNK:",
+          "N1 NS15 SU  Y  Y",
+          "",
+          "COMMAND EXECUTED",
+          "",
+          "<WQ_>",
+          "< ZUSI:COMP;",
+          "",
+          "UNIT       PHYS  STATE",
+          "IPDU-0     0000  WO-EX",
+          "IPDU-1     0001  SP-EX",
+          "",
+          "COMMAND EXECUTED",
+          "",
+          "<US_>"]
+
+NG_LOG = ["[root@CFPU-0 ~]# fsclish",
+          "root@SHSAEGW03BNK [SHSAEGW03BNK] > show ng state",
+          "fsLogicalNetworkElemId: SHSAEGW03BNK",
+          "state: active",
+          "root@SHSAEGW03BNK [SHSAEGW03BNK] > show ng memory",
+          "used: 1024",
+          "free: 2048",
+          "root@SHSAEGW03BNK [SHSAEGW03BNK] > exit"]
+
+def write_log(lines):
+    fd,filename = tempfile.mkstemp(suffix='.log')
+    with os.fdopen(fd,'wb') as f:
+        f.write(lines[0] + "\r\n".join(lines[1:]) + "\r\n")
+    return filename
+
+def block_lines(block):
+    return [line.rstrip("\r\n\t ") for line in str(block).split("\n")[:-1]]
+
+def check_blocks(log_type,lines,offsets_only=False):
+    filename = write_log(lines)
+    try:
+        spliter = LogSpliter(type=log_type,logfile=filename,offsets_only=offsets_only)
+        assert len([seg for seg in spliter if seg.result]) == 2
+        for seg in spliter:
+            assert block_lines(seg.block) == seg.result
+        spliter.close()
+        ## the log is mapped again after close.
+        for seg in spliter:
+            assert block_lines(seg.block) == seg.result
+        spliter.close()
+    finally:
+        os.remove(filename)
+
+def test_ns_crlf():
+    check_blocks(LOG_TYPE_FLEXI_NS,NS_LOG)
+
+def test_ns_crlf_offsets():
+    check_blocks(LOG_TYPE_FLEXI_NS,NS_LOG,offsets_only=True)
+
+def test_ng_crlf():
+    check_blocks(LOG_TYPE_FLEXI_NG,[""] + NG_LOG)
+
+def test_ng_crlf_offsets():
+    check_blocks(LOG_TYPE_FLEXI_NG,[""] + NG_LOG,offsets_only=True)
+
+def test_str_offsets():
+    filename = write_log(NS_LOG)
+    try:
+        expected = str(LogSpliter(type=LOG_TYPE_FLEXI_NS,logfile=filename))
+        spliter = LogSpliter(type=LOG_TYPE_FLEXI_NS,logfile=filename,offsets_only=True)
+        assert str(spliter) == expected
+        assert "   IPDU-1     0001  SP-EX\n" in expected
+        spliter.close()
+    finally:
+        os.remove(filename)
+
+if __name__ == "__main__":
+    for name,func in sorted(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print name,'OK'
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Test the data extracted by scan_data from the logs.
+
+    python libs/test_networkelement.py
+"""
+import os
+import re
+import sys
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from libs.networkelement import scan_data
+from libs.flexins import ns_data_specs
+
+WQO_BLOCK = """< ZWQO:CR;
+
+PACKAGES CREATED IN SHMME09BNK:
+
+  STATUS     PACKAGE-ID          DIRECTORY
+  BU         SHNS15_3            NS15_3
+             N5 15.3-0
+  FB         SHNS15_2            NS15_2
+             N5 15.2-0
+
+COMMAND EXECUTED
+"""
+
+## the log of the upgrade, the version is shown before and after it.
+NS_LOG = (WQO_BLOCK + "< ZWSU;\n\nUPGRADE STARTED\n\nCOMMAND EXECUTED\n"
+          + WQO_BLOCK.replace('15.3-0','16.0-0').replace('15.2-0','15.3-0'))
+
+def lines(text):
+    return [line + "\n" for line in text.split("\n")]
+
+def test_last_version_wins():
+    data = scan_data({'version':ns_data_specs['version']},lines(NS_LOG))
+    assert dict(data['version']) == {'BU':'N5 16.0-0','FB':'N5 15.3-0'}
+
+def test_first_match():
+    spec = {'command': 'ZWQO:CR;',
+            'pattern': re.compile("BU\s+.*?\n\s+(\w\d [\d\.-]+)"),
+           }
+    data = scan_data({'bu':spec},lines(NS_LOG))
+    assert data['bu'] == ('N5 15.3-0',)
+
+def test_line_mode_last():
+    spec = {'command': None,
+            'names'  : ['version'],
+            'pattern': re.compile("^\s+(\w\d [\d\.-]+)"),
+            'scan'   : 'all',
+           }
+    data = scan_data({'bu':spec,'missing':{'pattern':re.compile('NOTFOUND')}},lines(NS_LOG))
+    assert data['bu'] == {'version':'N5 15.3-0'}
+    assert data['missing'] is None
+
+if __name__ == "__main__":
+    for name,func in sorted(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print name,'OK'
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Test the cache of the parsed logs.
+
+    python libs/test_parsecache.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from libs.parsecache import ParseCache
+from libs.log_spliter import LogSpliter, LOG_TYPE_FLEXI_NS
+
+NS_LOG = """< ZWQO:CR;
+
+Flexi NS  SHMME09BNK                2016-07-20  22:20:01
+
+PACKAGES CREATED IN SHMME09BNK:
+N1 NS15 SU  Y  Y
+
+COMMAND EXECUTED
+
+<WQ_>
+"""
+
+def write(filename,text,mtime=None):
+    with open(filename,'wb') as f:
+        f.write(text)
+    if mtime is not None:
+        os.utime(filename,(mtime,mtime))
+
+def test_hit():
+    path = tempfile.mkdtemp()
+    try:
+        cache = ParseCache(os.path.join(path,'cache'))
+        logfile = os.path.join(path,'MME09.log')
+        write(logfile,NS_LOG,time.time() - 60)
+        assert cache.get(logfile,'FlexiNSSpliter') is None
+        assert cache.set(logfile,'FlexiNSSpliter',[('ZWQO:CR',['a'],(0,10))])
+        assert cache.get(logfile,'FlexiNSSpliter') == [('ZWQO:CR',['a'],(0,10))]
+        ## the ledger is saved, the new cache object gets the data too.
+        cache = ParseCache(os.path.join(path,'cache'))
+        assert cache.get(logfile,'FlexiNSSpliter') == [('ZWQO:CR',['a'],(0,10))]
+    finally:
+        shutil.rmtree(path)
+
+def test_miss_after_modification():
+    path = tempfile.mkdtemp()
+    try:
+        cache = ParseCache(os.path.join(path,'cache'))
+        logfile = os.path.join(path,'MME09.log')
+        ## the log is rewritten at the same size in the same second.
+        mtime = int(time.time())
+        write(logfile,NS_LOG,mtime)
+        cache.set(logfile,'FlexiNSSpliter','old')
+        write(logfile,NS_LOG.replace('NS15','NS16'),mtime)
+        assert cache.get(logfile,'FlexiNSSpliter') is None
+
+        ## the changed mtime.
+        cache.set(logfile,'FlexiNSSpliter','new')
+        write(logfile,NS_LOG.replace('NS15','NS17'),mtime - 3600)
+        assert cache.get(logfile,'FlexiNSSpliter') is None
+    finally:
+        shutil.rmtree(path)
+
+def test_spliter_cached():
+    path = tempfile.mkdtemp()
+    try:
+        cache = ParseCache(os.path.join(path,'cache'))
+        logfile = os.path.join(path,'MME09.log')
+        write(logfile,NS_LOG,time.time() - 60)
+        spliter = LogSpliter(type=LOG_TYPE_FLEXI_NS,logfile=logfile,cache=cache)
+        result = spliter.get_log('ZWQO')[0].result
+
+        ## the log is not read if the segments are cached.
+        spliter = LogSpliter(type=LOG_TYPE_FLEXI_NS,logfile=logfile,cache=cache)
+        assert spliter._raw_log is None
+        assert spliter.get_log('ZWQO')[0].result == result
+        assert spliter.get_raw_log() == NS_LOG
+    finally:
+        shutil.rmtree(path)
+
+def test_lru_eviction():
+    path = tempfile.mkdtemp()
+    try:
+        cache = ParseCache(os.path.join(path,'cache'),max_size=2500)
+        logfiles = []
+        for idx in range(3):
+            logfile = os.path.join(path,'MME%s.log' % idx)
+            write(logfile,NS_LOG + str(idx),time.time() - 60)
+            logfiles.append(logfile)
+
+        now = time.time()
+        for idx,logfile in enumerate(logfiles[:2]):
+            cache.set(logfile,'kind','x' * 1000)
+            os.utime(cache.entry_path(logfile,'kind'),(now - 100 + idx,) * 2)
+        ## the first log is used, the second one is the least recently used.
+        assert cache.get(logfiles[0],'kind') == 'x' * 1000
+        cache.set(logfiles[2],'kind','x' * 1000)
+
+        assert cache.get(logfiles[1],'kind') is None
+        assert cache.get(logfiles[0],'kind') == 'x' * 1000
+        assert cache.get(logfiles[2],'kind') == 'x' * 1000
+    finally:
+        shutil.rmtree(path)
+
+if __name__ == "__main__":
+    for name,func in sorted(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print name,'OK'
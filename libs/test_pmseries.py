@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Test the baselines and anomalies of the PM counter series.
+
+    python libs/test_pmseries.py
+"""
+import os
+import sys
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from libs.pmseries import CounterSeries, PMTable
+
+def make_series(values):
+    series = CounterSeries('SAEGW','QOS_DL_DROP_QCI')
+    for index,value in enumerate(values):
+        series.append('2016-07-25 %02d:00' % index,value)
+    return series
+
+def test_baseline():
+    series = make_series([2,4,6,8,10])
+    assert series.baseline(window=2) == [None,2.0,3.0,5.0,7.0]
+    assert series.baseline(window=4) == [None,2.0,3.0,4.0,5.0]
+
+def test_anomalies():
+    series = make_series([10,12,10,12,11,60,11])
+    assert series.anomalies(window=4) == [False] * 5 + [True,False]
+    ## the first values are not flagged, also in the short series.
+    assert make_series([1,100]).anomalies(window=4) == [False,False]
+
+def test_anomalies_flat_window():
+    series = make_series([0,0,0,0,3,0,0,0,0,50000])
+    ## the small change after the zeros is not an anomaly.
+    assert not any(series.anomalies(window=4))
+    flags = series.anomalies(window=4,min_change=10000)
+    assert series.points(flags) == [('2016-07-25 09:00',50000)]
+
+def test_anomalies_min_change():
+    series = make_series([100,102,100,102,130])
+    assert series.anomalies(window=4)[-1]
+    assert not series.anomalies(window=4,min_change=100)[-1]
+
+def test_increases():
+    series = make_series([100,102,100,102,200,101,100,102,101,100,0])
+    flags = series.increases(window=4)
+    assert series.anomalies(window=4)[-1]
+    ## the decrease is not an increase.
+    assert series.points(flags) == [('2016-07-25 04:00',200)]
+
+def test_table():
+    columndesc = ['NE_NAME','Date','Time','StatType','QOS_DL_DROP_QCI']
+    rows = [['SAEGW2','2016/07/25','11:00','1','5'],
+            ['SAEGW1','2016/07/25','11:00','1','3'],
+            ['SAEGW1','2016/07/25','10:00','1',''],
+            ['SAEGW2','2016/07/25','10:00','1','4']]
+    pm = PMTable(columndesc,rows)
+    assert pm.elements() == ['SAEGW2','SAEGW1']
+    assert list(pm.get('SAEGW2','QOS_DL_DROP_QCI').values) == [4.0,5.0]
+    assert len(pm.get('SAEGW1','QOS_DL_DROP_QCI')) == 1
+
+if __name__ == "__main__":
+    for name,func in sorted(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print name,'OK'
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Test the order of the check modules run by the scheduler.
+
+    python libs/test_scheduler.py
+"""
+import os
+import sys
+import time
+import types
+import threading
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from libs.scheduler import build_graph, check_graph, run_modules, SchedulerError
+
+def stub(name,provides=None,requires=None):
+    m = types.ModuleType(name)
+    if provides is not None:
+        m.provides = provides
+    if requires is not None:
+        m.requires = requires
+    return m
+
+class Recorder(object):
+    """run the modules, record the start and end of every module.
+    """
+    def __init__(self,delay=0.0):
+        self.delay = delay
+        self.events = []
+        self.lock = threading.Lock()
+
+    def __call__(self,module):
+        with self.lock:
+            self.events.append(('start',module.__name__))
+        time.sleep(self.delay)
+        with self.lock:
+            self.events.append(('end',module.__name__))
+        return module.__name__
+
+    def started(self):
+        return [name for event,name in self.events if event == 'start']
+
+    def check_order(self,before,after):
+        assert self.events.index(('end',before)) < self.events.index(('start',after)), self.events
+
+def test_build_graph():
+    modules = [stub('tn',requires=['ELEMENT']),
+               stub('nsinfo',provides=['ELEMENT']),
+               stub('version',provides=['ELEMENT']),
+               stub('kpi',provides=[],requires=[])]
+    deps = build_graph(modules)
+    ## the modules providing the same key run in the checklist order.
+    assert deps == [set([1,2]),set(),set([1]),set()]
+
+def test_barrier():
+    modules = [stub('a',provides=['X']),
+               stub('b',requires=['X']),
+               stub('legacy'),
+               stub('c',requires=[]),
+               stub('d',requires=['X'])]
+    deps = build_graph(modules)
+    assert deps[2] == set([0,1])
+    assert deps[3] == set([2])
+    assert deps[4] == set([0,2])
+
+def test_cycle():
+    modules = [stub('a',provides=['X'],requires=['Y']),
+               stub('b',provides=['Y'],requires=['X'])]
+    try:
+        build_graph(modules)
+    except SchedulerError as e:
+        assert 'a -> b -> a' in str(e), e
+    else:
+        assert False, "the cycle is not found"
+    ## the graph without cycle.
+    check_graph(modules,[set([1]),set()])
+
+def make_modules():
+    return [stub('tn',requires=['ELEMENT']),
+            stub('nsinfo',provides=['ELEMENT']),
+            stub('kpi',requires=[]),
+            stub('legacy'),
+            stub('alarm',requires=['ELEMENT']),
+            stub('sensor',requires=[])]
+
+def check_run(jobs):
+    modules = make_modules()
+    recorder = Recorder(delay=0.01)
+    results = run_modules(modules,recorder,jobs=jobs)
+    ## the results are in the checklist order.
+    assert results == [m.__name__ for m in modules]
+    recorder.check_order('nsinfo','tn')
+    for name in ('tn','nsinfo','kpi'):
+        recorder.check_order(name,'legacy')
+    for name in ('alarm','sensor'):
+        recorder.check_order('legacy',name)
+    return recorder
+
+def test_run_serial():
+    recorder = check_run(jobs=1)
+    assert recorder.started() == ['nsinfo','tn','kpi','legacy','alarm','sensor']
+
+def test_run_jobs():
+    for jobs in (2,4):
+        check_run(jobs)
+
+def test_run_parallel():
+    ## the modules without dependencies run at the same time.
+    barrier = threading.Event()
+    def runner(module):
+        if module.__name__ == 'a':
+            assert barrier.wait(5)
+        else:
+            barrier.set()
+        return module.__name__
+    modules = [stub('a',requires=[]),stub('b',requires=[])]
+    assert run_modules(modules,runner,jobs=2) == ['a','b']
+
+def test_run_error():
+    def runner(module):
+        if module.__name__ == 'b':
+            raise ValueError(module.__name__)
+        return module.__name__
+    modules = [stub('a',provides=['X']),stub('b',requires=['X']),stub('c',requires=['X'])]
+    for jobs in (1,3):
+        try:
+            run_modules(modules,runner,jobs=jobs)
+        except ValueError as e:
+            assert str(e) == 'b'
+        else:
+            assert False, "the error is not raised"
+
+def test_run_context():
+    class Context(object):
+        entered = 0
+        def __enter__(self):
+            Context.entered += 1
+        def __exit__(self,*args):
+            pass
+    modules = [stub('a',requires=[]),stub('b',requires=[]),stub('c',requires=[])]
+    run_modules(modules,lambda m: m.__name__,jobs=2,context=Context())
+    assert Context.entered == 3
+
+if __name__ == "__main__":
+    for name,func in sorted(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print name,'OK'
@@ -6,6 +6,7 @@ from tools import *
 """
 import sys,codecs
 from infocache import shareinfo
+from usage import count
 
 ## below united import for other modules
 from messagelogger import MessageLogger
@@ -19,6 +20,62 @@ def to_unicode(line):
     else:
         return line.decode('utf-8')
 
+def read_loglines(logfile):
+    """return the lines of log. logfile could be a filename or the parsed
+    log(LogSpliter) handed to the check modules.
+    """
+    if hasattr(logfile,'get_loglines'):
+        return logfile.get_loglines()
+    lines = file(logfile).readlines()
+    count('bytes_read',sum(len(line) for line in lines))
+    return lines
+
+def iter_loglines(logfile):
+    """iterate the lines of log without reading the whole file, for the
+    scanning which could stop early.
+    """
+    if hasattr(logfile,'get_loglines'):
+        return iter(logfile.get_loglines())
+    return _iter_file_lines(logfile)
+
+def _iter_file_lines(filename):
+    size = 0
+    try:
+        with open(filename) as f:
+            for line in f:
+                size += len(line)
+                yield line
+    finally:
+        count('bytes_read',size)
+
+def read_logtext(logfile):
+    """return the whole text of log. the same as read_loglines.
+    """
+    if hasattr(logfile,'get_raw_log'):
+        return logfile.get_raw_log()
+    text = ''.join(file(logfile).readlines())
+    count('bytes_read',len(text))
+    return text
+
+def read_logview(logfile):
+    """return the whole log for the regex searching(search/finditer/findall),
+    it's a read-only view on the mapped log file if the log is parsed with
+    offsets only, the file is not copied into memory.
+    """
+    if hasattr(logfile,'get_view'):
+        return logfile.get_view()
+    return read_logtext(logfile)
+
+def print_textfile(filename,chunk_size=64*1024):
+    """write the utf-8 text file to the console chunk by chunk.
+    """
+    with codecs.open(filename,'rb','utf-8') as fp:
+        while True:
+            text = fp.read(chunk_size)
+            if not text:
+                break
+            sys.stdout.write(text)
+
 def debugmsg(msg):
     if shareinfo.get('DEBUG'):
         print(msg) 
@@ -82,6 +139,8 @@ def read_cmdblock_from_log(loglines,startline,endline):
         the text block of the command if command was found or
         an empty string('')  if command was not found.
 
+    the parsed log(LogSpliter) could return the blocks of command without
+    scanning the lines: logfile.get_blocks(command).
     """
     blocks = []
     blocklines = [] 
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""The resource usage of the check modules.
+
+ModuleUsage measures one run of a check module: the wall time, the cpu time,
+the growth of the peak memory, the bytes read from the log files and the
+counts of the regex calls, TextFSM parses and log lookups. The libs reading
+the log or matching the patterns call count(), the counts are added to the
+usage measured in the current thread.
+The cpu time is the time of the thread on Linux, the time of the process on
+the other platforms. The peak memory is the peak RSS of the process, so the
+growth is only accurate when the modules run one by one(module_jobs = 1).
+Usage:
+    from libs.usage import ModuleUsage, count
+
+    with ModuleUsage(module_id) as usage:
+        result = run_module(m,logfile,logspliter)
+    result.usage = usage
+    print usage          # wall:0.12s cpu:0.10s mem:+1.2MB read:0B regex:3 fsm:1 lookup:5
+
+    count('bytes_read',len(data))       # in the libs reading the log
+"""
+import sys
+import time
+import threading
+try:
+    import resource
+except ImportError:     ## Windows
+    resource = None
+
+COUNTERS = ['bytes_read','regex','fsm_parse','log_lookup']
+
+## RUSAGE_THREAD is not defined in python 2, it's 1 on Linux.
+if resource is None:
+    _RUSAGE_CPU = None
+elif hasattr(resource,'RUSAGE_THREAD'):
+    _RUSAGE_CPU = resource.RUSAGE_THREAD
+elif sys.platform.startswith('linux'):
+    _RUSAGE_CPU = 1
+else:
+    _RUSAGE_CPU = resource.RUSAGE_SELF
+
+## ru_maxrss is in bytes on macOS, in kilobytes on the others.
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+_local = threading.local()
+
+def _cpu_time():
+    if _RUSAGE_CPU is None:
+        return time.clock()
+    r = resource.getrusage(_RUSAGE_CPU)
+    return r.ru_utime + r.ru_stime
+
+def peak_memory():
+    """return the peak RSS of the process in bytes, 0 if it's unknown.
+    """
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+def format_bytes(n):
+    for unit in ['B','KB','MB']:
+        if abs(n) < 1024:
+            return "%s%s" % (n if unit == 'B' else "%.1f" % n,unit)
+        n = n / 1024.0
+    return "%.1fGB" % n
+
+def current_usage():
+    """return the ModuleUsage measured in the current thread, or None.
+    """
+    stack = getattr(_local,'stack',None)
+    return stack[-1] if stack else None
+
+def count(key,n=1):
+    """add n to the counter 'key' of the usage measured in the current thread.
+    """
+    usage = current_usage()
+    if usage is not None:
+        usage.counters[key] = usage.counters.get(key,0) + n
+
+class ModuleUsage(object):
+    """the resource usage of one check module, or the total of the modules.
+    """
+    def __init__(self,name=''):
+        self.name     = name
+        self.wall     = 0.0
+        self.cpu      = 0.0
+        ## the growth of the peak memory, in bytes.
+        self.memory   = 0
+        self.counters = dict.fromkeys(COUNTERS,0)
+
+    @property
+    def bytes_read(self):
+        return self.counters.get('bytes_read',0)
+
+    def __enter__(self):
+        if not hasattr(_local,'stack'):
+            _local.stack = []
+        _local.stack.append(self)
+        self._start = (time.time(),_cpu_time(),peak_memory())
+        return self
+
+    def __exit__(self,*exc_info):
+        wall,cpu,memory = self._start
+        self.wall   += time.time() - wall
+        self.cpu    += _cpu_time() - cpu
+        self.memory += peak_memory() - memory
+        _local.stack.pop()
+
+    def add(self,other):
+        self.wall   += other.wall
+        self.cpu    += other.cpu
+        self.memory += other.memory
+        for key,value in other.counters.items():
+            self.counters[key] = self.counters.get(key,0) + value
+        return self
+
+    def as_dict(self):
+        data = dict(name=self.name,wall=self.wall,cpu=self.cpu,memory=self.memory)
+        data.update(self.counters)
+        return data
+
+    def __str__(self):
+        return "wall:%.2fs cpu:%.2fs mem:+%s read:%s regex:%s fsm:%s lookup:%s" % (
+                self.wall,self.cpu,format_bytes(self.memory),
+                format_bytes(self.bytes_read),self.counters.get('regex',0),
+                self.counters.get('fsm_parse',0),self.counters.get('log_lookup',0))
+
+    def __repr__(self):
+        return "ModuleUsage<%s>(%s)" % (self.name,self)
+
+def total_usage(usages,name='total'):
+    """return the ModuleUsage of the sum of usages, None is skipped.
+    """
+    total = ModuleUsage(name)
+    for usage in usages:
+        if usage is not None:
+            total.add(usage)
+    return total
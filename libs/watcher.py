@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Watch the logs in a directory, find the new or modified logs to check.
+
+The size and mtime of the logs are compared in every poll. A log is ready
+when it's not changed for `settle` seconds, so the logs still being written
+are not checked. The content hashes of the checked logs are saved in the
+ledger file, the logs of the same content are skipped, also after restart.
+Usage:
+    from libs.watcher import LogWatcher
+
+    watcher = LogWatcher('cache/watch_ledger', settle=30)
+    while True:
+        for filename in watcher.poll(['log/MME09.log','log/MME08.log']):
+            check(filename)
+            watcher.done(filename)
+        time.sleep(10)
+"""
+import os
+import time
+import cPickle as pickle
+
+from parsecache import file_hash, _replace_file
+
+class LogWatcher(object):
+    """find the logs which are new or modified and not checked before.
+    """
+    def __init__(self,ledger_path,settle=30):
+        self.ledger_path = ledger_path
+        self.settle = settle
+        ## {abspath: (size, mtime, first seen time)} of the changed logs.
+        self._pending = {}
+        ## {abspath: (size, mtime, hash)} of the logs returned by poll.
+        self._ready = {}
+        self._ledger = self._load_ledger()
+
+    def identity(self,filename):
+        st = os.stat(filename)
+        return (st.st_size,st.st_mtime)
+
+    def poll(self,filenames):
+        """return the logs in filenames which are ready to check.
+        """
+        now = time.time()
+        files = self._ledger['files']
+        ready = []
+        seen = set()
+        for filename in filenames:
+            abspath = os.path.abspath(filename)
+            seen.add(abspath)
+            try:
+                identity = self.identity(filename)
+            except OSError:
+                continue
+            entry = files.get(abspath)
+            if entry and entry[:2] == identity:
+                continue
+            pending = self._pending.get(abspath)
+            if not pending or pending[:2] != identity:
+                self._pending[abspath] = identity + (now,)
+                ## the old logs are ready at once, e.g. after restart.
+                if now - identity[1] < self.settle:
+                    continue
+            elif now - pending[2] < self.settle and now - identity[1] < self.settle:
+                continue
+
+            del self._pending[abspath]
+            try:
+                digest = file_hash(filename)
+            except (IOError,OSError):
+                continue
+            if digest in self._ledger['hashes']:
+                files[abspath] = identity + (digest,)
+                continue
+            self._ready[abspath] = identity + (digest,)
+            ready.append(filename)
+
+        ## forget the removed logs.
+        for abspath in list(self._pending):
+            if abspath not in seen:
+                del self._pending[abspath]
+        return ready
+
+    def done(self,filename):
+        """record the log returned by poll as checked.
+        """
+        entry = self._ready.pop(os.path.abspath(filename),None)
+        if entry:
+            self._ledger['files'][os.path.abspath(filename)] = entry
+            self._ledger['hashes'].add(entry[2])
+            self._save_ledger()
+
+    def _load_ledger(self):
+        try:
+            with open(self.ledger_path,'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return {'files':{},'hashes':set()}
+
+    def _save_ledger(self):
+        path = os.path.dirname(self.ledger_path)
+        tmppath = "%s.%s.tmp" % (self.ledger_path,os.getpid())
+        try:
+            if path and not os.path.isdir(path):
+                os.makedirs(path)
+            with open(tmppath,'wb') as f:
+                pickle.dump(self._ledger,f,pickle.HIGHEST_PROTOCOL)
+            _replace_file(tmppath,self.ledger_path)
+        except (IOError,OSError):
+            pass
+
+    def __repr__(self):
+        return "LogWatcher(%s)" % self.ledger_path
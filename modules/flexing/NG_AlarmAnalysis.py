@@ -9,10 +9,11 @@ u"""
 """
 
 import re
-import json
 from libs.checker import ResultInfo,CheckStatus
 from libs.infocache import shareinfo
 from libs.tools import MessageBuffer,debugmsg
+from libs.ossreport import read_report
+from libs.alarmtable import AlarmTable,NE_NAME,ALARM_NUMBER,ALARM_TIME,SEVERITY,ALARM_TEXT
 from libs.flexing import FlexiNG
 
 
@@ -28,13 +29,14 @@ criteria  = u"""
 （2）检查告警信息。
 （3）如果出现critical告警，则显示为Error，建议报现场工程师或客户检修。
 """
-result = ResultInfo(name,priority=priority)
 error = ''
 
 
 ##--------------------------------------------
 ## Optional variables
 target_version = ['3.1','3.2','15','16']    
+## the shared information set by the module, see libs/scheduler.py
+provides = ['ELEMENT']
 
 
 check_commands = [
@@ -47,11 +49,6 @@ blankstr = '                    '
 AlarmTopCount = 5
 AlarmSeverityThr = '1'
 
-def read_block(logfile,blkname):
-    loglines = file(logfile).readlines()
-
-    return ''.join(loglines)
-
 # for display the data with fixed width, need expand the column string
 def expandstr(data_rec,length):
     i = 0
@@ -62,69 +59,44 @@ def expandstr(data_rec,length):
     return data_rec
 
 # Count the alarm by alarm number 
-def getAlarmCount(data_logs,check_info):
-    data_logs.sort(key=lambda l:(l[0],l[2]))
-    data_buf = {}
-    data_key = []
-    for data_log in data_logs:
-        data_key.append(data_log[0])  # NE_NAME
-        data_key.append(data_log[2])  # Alarm Number
-        data_key.append(data_log[7])  # Alarm Severity
-        data_key.append(data_log[8])  # Alarm Text
-        data_keystr  = '\t'.join(data_key)
-        if data_key in data_buf.keys():
-            data_buf[data_keystr] = data_buf[data_keystr] + 1
-        else:
-            data_buf[data_keystr] = 1
-        data_key = []
+def getAlarmCount(alarms,check_info):
+    data_buf = alarms.count_by(NE_NAME,ALARM_NUMBER,SEVERITY,ALARM_TEXT)
 
     alarm_desc_title = [u'网元名称',u'告警号',u'告警级别',u'告警描述',u'数量']
     check_info.append('\t'.join(alarm_desc_title))
-    for data_buf_key in sorted(data_buf.keys()):
-        # make every sensor data item not less than 20 chars
-        check_info.append(data_buf_key + '\t' + str(data_buf[data_buf_key]))
+    for data_buf_key in sorted(('\t'.join(key),num) for key,num in data_buf.iteritems()):
+        check_info.append(data_buf_key[0] + '\t' + str(data_buf_key[1]))
         
 # Top 5 alarms according the severity
-def getTopAlarmbySeverity(data_logs,check_info):
+def getTopAlarmbySeverity(alarms,check_info):
     
     status = CheckStatus.PASSED
     check_info.append('\n' + u'按告警级别排序')
     alarm_desc_title = [u'网元名称',u'对象名',u'告警号',u'告警时间',u'告警清除时间',u'告警状态',u'告警类型',u'告警级别',u'告警描述',u'告警补充信息']
     check_info.append('\t'.join(alarm_desc_title))
-    data_logs.sort(key=lambda l:(l[7]))
     
-    i = 0
-    for data_log in data_logs:
-        if (i < AlarmTopCount):
-            if (str(data_log[7]) == AlarmSeverityThr):
-                status = CheckStatus.FAILED
-            check_info.append('\t'.join(data_log))
-            i = i + 1
-        else:
-            break
+    for data_log in alarms.nsmallest(AlarmTopCount,SEVERITY,NE_NAME,ALARM_NUMBER):
+        if (str(data_log[SEVERITY]) == AlarmSeverityThr):
+            status = CheckStatus.FAILED
+        check_info.append('\t'.join(data_log))
         
     return status
     
 
 # Top 5 alarms according the Alarm Time 
-def getTopAlarmbyTime(data_logs,check_info):
+def getTopAlarmbyTime(alarms,check_info):
     check_info.append('\n' + u'按告警时间倒序排序')
     alarm_desc_title = [u'网元名称',u'对象名',u'告警号',u'告警时间',u'告警清除时间',u'告警状态',u'告警类型',u'告警级别',u'告警描述',u'告警补充信息']
     check_info.append('\t'.join(alarm_desc_title))
-    data_logs.sort(key=lambda l:(l[3]),reverse = True)
     
-    i = 0
-    for data_log in data_logs:
-        if (i < AlarmTopCount):
-            check_info.append('\t'.join(data_log))
-            i = i + 1
-        else:
-            break
+    for data_log in alarms.nlargest(AlarmTopCount,ALARM_TIME,SEVERITY,NE_NAME,ALARM_NUMBER):
+        check_info.append('\t'.join(data_log))
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
 
+    result = ResultInfo(name,priority=priority)
     check_info = []
     
     # init shareinfo
@@ -132,19 +104,15 @@ def run(logfile):
     ng._data['hostname'] = 'SAEGW'
     shareinfo.set('ELEMENT',ng)
     
-    logtxt = read_block(logfile,'OSS_Alarm_Info')
-    logjson = json.loads(logtxt)
+    data_desc,data_logs = read_report(logspliter or logfile)
     status = CheckStatus.UNCHECKED
-    #print logjson
-	# From the logdata get packet drop count
-    data_desc = logjson['columndesc']
-    data_logs = logjson['columns']
+    alarms = AlarmTable(data_logs)
 
-    if (len(data_desc) > 0 and len(data_logs) > 0):
+    if (len(data_desc) > 0 and len(alarms) > 0):
         status = CheckStatus.PASSED
-        getAlarmCount(data_logs,check_info)
-        status = getTopAlarmbySeverity(data_logs,check_info)
-        getTopAlarmbyTime(data_logs,check_info)
+        getAlarmCount(alarms,check_info)
+        status = getTopAlarmbySeverity(alarms,check_info)
+        getTopAlarmbyTime(alarms,check_info)
 	
 	#print status
     #print check_info
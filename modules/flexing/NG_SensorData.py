@@ -11,9 +11,9 @@ u"""
 import re
 from libs.checker import ResultInfo,CheckStatus
 from libs.infocache import shareinfo
-from libs.tools import MessageBuffer,debugmsg
+from libs.tools import MessageBuffer,debugmsg,read_logtext
 
-import textfsm
+from libs.patterns import patterns
 
 
 ## Mandatory variables 
@@ -28,13 +28,14 @@ criteria  = u"""
 （2）检查各板卡的Sensor数据，温度按大小排出Top 10。
 （3）如果Sensor数据中出现温度有超过75摄氏度，则显示为Error，建议报现场工程师或客户检修。
 """
-result = ResultInfo(name,priority=priority)
 error = ''
 
 
 ##--------------------------------------------
 ## Optional variables
 target_version = ['3.1','3.2','15','16']    
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 sensor_scripts = {
 	'SENSOR_TEMPERATURE             ':'modules\\flexing\\fsm_module\\sensor_Temperature.fsm'
 }
@@ -75,16 +76,15 @@ slot_ipmb_adress = {
 TEMPERATURE_THRESHOLD = 75
 
 def read_block(logfile,blkname):
-    loglines = file(logfile).readlines()
-
-    return ''.join(loglines)
+    return read_logtext(logfile)
 
  
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
 
+    result = ResultInfo(name,priority=priority)
     blankstr = '                    '
     # Check NG Version
     check_info = []
@@ -101,14 +101,13 @@ def run(logfile):
         else:
             check_info.append(u"- NG version: " + ng.version['major'] + u" 不在受影响版本列表中. \n")
 
-    logtxt = read_block(logfile,'NG_Sensor_Temperature_status')
+    logtxt = read_block(logspliter or logfile,'NG_Sensor_Temperature_status')
     status = CheckStatus.UNCHECKED
     
 	# From the logfile get Sensor Temperature
-    for name,script in sensor_scripts.items():
-        check_info.append(name)
-        fsm = textfsm.TextFSM(open(script))
-        fsminfos=fsm.ParseText(logtxt)
+    for sensor_name,script in sensor_scripts.items():
+        check_info.append(sensor_name)
+        fsminfos=patterns.fsm_parse(script,logtxt)
         #print len(fsminfos)
         if (len(fsminfos)>0):
             status = CheckStatus.PASSED
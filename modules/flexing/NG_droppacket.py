@@ -9,10 +9,11 @@ u"""
 """
 
 import re
-import json
 from libs.checker import ResultInfo,CheckStatus
 from libs.infocache import shareinfo
 from libs.tools import MessageBuffer,debugmsg
+from libs.ossreport import read_report
+from libs.pmseries import PMTable
 from libs.flexing import FlexiNG
 
 
@@ -28,13 +29,14 @@ criteria  = u"""
 （2）检查丢包数据。
 （3）如果丢包数据15分钟多于1MB，则显示为Error，建议报现场工程师或客户检修。
 """
-result = ResultInfo(name,priority=priority)
 error = ''
 
 
 ##--------------------------------------------
 ## Optional variables
 target_version = ['3.1','3.2','15','16']    
+## the shared information set by the module, see libs/scheduler.py
+provides = ['ELEMENT']
 
 check_commands = [
     ('@ssh ossclient', "#below commands should be executed some site can conntect to OSS."),
@@ -42,14 +44,14 @@ check_commands = [
 ]
 
 DROPPACKET_THRESHOLD = 1000000
+## the dropped packets are compared with the mean of the previous periods,
+## the increases more than ANOMALY_FACTOR standard deviations and more than
+## ANOMALY_MIN_INCREASE packets are shown.
+BASELINE_WINDOW = 8
+ANOMALY_FACTOR = 3.0
+ANOMALY_MIN_INCREASE = 10000
 blankstr = '                    '
 
-def read_block(logfile,blkname):
-    loglines = file(logfile).readlines()
-
-    return ''.join(loglines)
-
-
 def expandstr(data_rec,length):
     i = 0
     while (i < len(data_rec)):
@@ -60,8 +62,9 @@ def expandstr(data_rec,length):
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
 
+    result = ResultInfo(name,priority=priority)
     check_info = []
     
     # init shareinfo
@@ -69,26 +72,29 @@ def run(logfile):
     ng._data['hostname'] = 'SAEGW'
     shareinfo.set('ELEMENT',ng)
     
-    logtxt = read_block(logfile,'OSS_DropPacket_Data')
-    logjson = json.loads(logtxt)
+    data_desc,data_logs = read_report(logspliter or logfile)
     status = CheckStatus.UNCHECKED
-    #print logjson
+    pm = PMTable(data_desc)
 	# From the logdata get packet drop count
-    data_desc = logjson['columndesc']
-    data_logs = logjson['columns']
-
-    if (len(data_desc) > 0 and len(data_logs) > 0):
-        status = CheckStatus.PASSED
-        
-        check_info.append('\t'.join(expandstr(data_desc,20)))
-
+    if (len(data_desc) > 0):
         for data_log in data_logs:
-            # check the temperature with TEMPERATURE_THRESHOLD
-            if float(data_log[4]) > DROPPACKET_THRESHOLD:
-                status = CheckStatus.FAILED
+            pm.append(data_log)
+            if status == CheckStatus.UNCHECKED:
+                status = CheckStatus.PASSED
+                check_info.append('\t'.join(expandstr(data_desc,20)))
             # make every sensor data item not less than 20 chars
-            
             check_info.append('\t'.join(expandstr(data_log,20)))
+
+    anomaly_info = []
+    for series in pm.series(pm.counters[0]) if pm.counters else []:
+        # check the dropped packets with DROPPACKET_THRESHOLD
+        if any(series.over(DROPPACKET_THRESHOLD)):
+            status = CheckStatus.FAILED
+        for time,value in series.points(series.increases(BASELINE_WINDOW,ANOMALY_FACTOR,ANOMALY_MIN_INCREASE)):
+            anomaly_info.append('\t'.join([series.ne,time,'%d' % value]))
+    if anomaly_info:
+        check_info.append('\n' + u'丢包数量与前%s个周期相比异常增加' % BASELINE_WINDOW)
+        check_info.extend(anomaly_info)
             
 	
 	#print status
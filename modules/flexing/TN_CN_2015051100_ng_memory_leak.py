@@ -7,7 +7,8 @@ u"""由于有NG3.x 版本SAEGW的AS/SAB存在内存泄露的问题，导致发
 import re
 from libs.checker import CheckStatus,ResultInfo
 from libs.infocache import shareinfo
-from libs.tools import MessageBuffer,debugmsg
+from libs.tools import MessageBuffer,debugmsg,read_loglines,read_logview
+from libs.log_spliter import FlexiNGSpliter
 
 __author__ = 'jun1.liu@nokia.com'
 __date__   = '20160315'
@@ -33,10 +34,14 @@ criteria      = u"""
 
 ## Optional variables 
 pat_memfail = re.compile("ssh ([\w\d-]+) showstat\|.*?mem_alloc_failed_for_linear_filters = (\d+)",re.DOTALL)
+pat_memfail_counter = re.compile("mem_alloc_failed_for_linear_filters = (\d+)")
 pat_memallo = re.compile("info ([\w\d-]+) featuremem.*FASTPATH_MALLOC dynamic allocated bytes \[chunks\]: (\d+)/(\d+)")
 pat_hicut   = re.compile("fngDpiHicut:\s+(\d+)")
+pat_nodetype = re.compile("[\d+-]")
 
 target_version = ['3.1','3.2','15']
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 logline_format = "    - %s\n"
 
 check_commands = [
@@ -57,14 +62,30 @@ check_commands = [
 def has_node(memlist,node):
     "return True if node is in memlist"
     return node in [_node for _node, _ in memlist]
+
+def read_output_lines(logfile,command):
+    """return the output lines of the commands, or all the lines of log if
+    it's not parsed by FlexiNGSpliter.
+    """
+    if isinstance(logfile,FlexiNGSpliter):
+        return [line for log in logfile.get_log(command) for line in log.result]
+    return read_loglines(logfile)
+
+def read_memory_fail_counters(logfile):
+    """return the list of (node, mem_alloc_failed_for_linear_filters).
+    """
+    if isinstance(logfile,FlexiNGSpliter):
+        return [(node,cnt) for node in logfile.get_nodes()
+                for blk in logfile.get_blocks("ssh",node=node)
+                for cnt in pat_memfail_counter.findall(blk)]
+    return pat_memfail.findall(read_logview(logfile))
     
-def check_memory_fail_counter(loglines):
-    _logblk=''.join(loglines)
+def check_memory_fail_counter(logfile):
     status = CheckStatus.UNKNOWN
     info = MessageBuffer(lineformat=logline_format)
     error = ''
     
-    _results = pat_memfail.findall(_logblk)
+    _results = read_memory_fail_counters(logfile)
     for node,cnt in set(_results):
         if int(cnt) > 0:
             status = CheckStatus.FAILED
@@ -93,7 +114,7 @@ def check_memory_allocation(loglines):
         if r2:
             mem = int(r2.groups()[1])/1024.0/1024.0
             node = r2.groups()[0]
-            node_type = re.sub('[\d+-]','',node)
+            node_type = pat_nodetype.sub('',node)
             #print "mem allocated!",node,mem,node_type,mem_threshold[node_type]
             if has_node(_mem[node_type],node):
                 #print "%s already exisit,pop out:%s" % (node,_mem[node_type][-2:])
@@ -124,9 +145,8 @@ def check_memory_allocation(loglines):
     return status,info.buffer,error
     
 ## Mandatory function: run
-def run(logfile, *args,**kwargs):
+def run(logfile, logspliter=None, *args,**kwargs):
     "this function execute the check steps and return "
-    loglines = file(logfile).readlines()
     result = ResultInfo(name,priority=priority)
     info = []
     error = ''
@@ -142,7 +162,7 @@ def run(logfile, *args,**kwargs):
         match = ng.match_version(major=target_version)
 
         if match['major']:
-            status,info,error = check_memory_fail_counter(loglines)
+            status,info,error = check_memory_fail_counter(logspliter or logfile)
             if status == CheckStatus.FAILED and len(info)>0:
                 result.status = status
         else:
@@ -150,12 +170,12 @@ def run(logfile, *args,**kwargs):
             info.append(logline_format % ("this NG version is `%s`, not affected by this TN." % major_version))
 
     ## check function 2
-    status,_info,error = check_memory_allocation(loglines)
+    status,_info,error = check_memory_allocation(read_output_lines(logspliter or logfile,"grep"))
     info.append(''.join(_info))
     
     ## check Hicut setting
     #hicut = ng.config.get('hicut')
-    hicut = hicut_setting(loglines)
+    hicut = hicut_setting(read_output_lines(logspliter or logfile,"show config"))
     if hicut == '1':
         status = CheckStatus.FAILED
         error = '- The Hicut feature is still enable: fngDpiHicut=1'
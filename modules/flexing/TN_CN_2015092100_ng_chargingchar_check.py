@@ -18,7 +18,9 @@ other cc=1,2,3,5,6,7,9 can use the same way.
 import re
 from libs.checker import ResultInfo,CheckStatus
 from libs.infocache import shareinfo
+from libs.tools import read_logview
 from libs.flexing import FlexiNG
+from libs.log_spliter import FlexiNGSpliter
 
 __author__ = "richard.hu@nokia.com"
 
@@ -38,7 +40,6 @@ criteria  = u"""发生问题的前提条件：
 
 注意：本报告仅显示第三项内容的检查结果。
 """
-result = ResultInfo(name,priority=priority)
 error = ''
 ##--------------------------------------------
 
@@ -47,6 +48,8 @@ error = ''
 ##--------------------------------------------
 ## Optional variables
 target_version = ['3.1_1.0','3.2','15']    
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 
 ## first get the block of each 'show session-profile'
 ## from each block we will get the session-profile 's name and charging-index config 
@@ -62,16 +65,22 @@ check_commands = [
 ]
 
 def read_block(logfile,blkname):
-    loglines = file(logfile).readlines()
+    return read_logview(logfile)
 
-    return ''.join(loglines)
+def read_session_profiles(logfile):
+    """return the text blocks of 'show ng session-profile'.
+    """
+    if isinstance(logfile,FlexiNGSpliter):
+        return [str(blk) for blk in logfile.get_blocks("show ng session-profile")]
+    pat=pats_charchar['session-profile-block']
+    return [r.group() for r in pat.finditer(read_logview(logfile))]
 
     
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
-    logtxt = read_block(logfile,'NG_Charing_status')
+def run(logfile,logspliter=None):
+    result = ResultInfo(name,priority=priority)
     
     charging_index_status=[]
     status = CheckStatus.UNCHECKED
@@ -90,16 +99,9 @@ def run(logfile):
             charging_index_status.append(u"- NG version: " + ng.version['major'] + u" 不在受影响版本列表中. \n")
     
     # Get every session-profile-block
-    session_profile_block=[]
-    pat=pats_charchar['session-profile-block']
-    logtmp=logtxt
-    r=pat.search(logtxt)
-    if (r):
+    session_profile_block=read_session_profiles(logspliter or logfile)
+    if session_profile_block:
         status = CheckStatus.PASSED
-        while r<>None:
-            session_profile_block.append(r.group())
-            logtmp=logtmp[r.end():]
-            r=pat.search(logtmp)
     
     # From each block get session-profile-name and charging-index info
     for block in session_profile_block:
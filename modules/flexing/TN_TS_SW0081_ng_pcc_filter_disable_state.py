@@ -11,7 +11,9 @@ SOLUTION:
 import re
 from libs.checker import ResultInfo,CheckStatus
 from libs.infocache import shareinfo
+from libs.tools import read_logview,read_loglines
 from libs.flexing import FlexiNG
+from libs.log_spliter import FlexiNGSpliter
 
 __author__ = 'wei.yao@huanuo-nokia.com'
 
@@ -23,7 +25,6 @@ priority  = 'critical'
 name      = "Check PCC rule filter in disabled state"
 desc      = __doc__
 criteria  = u"There is PCC rule filter in DISABLE status"
-result    = ResultInfo(name,priority=priority)
 error     = ''
 ##--------------------------------------------
 
@@ -31,6 +32,8 @@ error     = ''
 ##--------------------------------------------
 ## Optional variables    
 target_version = ['3.2','15']
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 ## first get the block of each 'filter-state'
 
 pats_stat = {'pcc-rule-cmd': re.compile(r"show ng service-awareness pcc-rule"),
@@ -45,14 +48,28 @@ check_commands = [
 ]
 
 def read_block(logfile,blkname):
-    loglines = file(logfile).readlines()
-    return ''.join(loglines)
+    return read_logview(logfile)
+
+def read_pcc_rules(logfile):
+    """return the lines of 'show ng service-awareness pcc-rule', or all the
+    lines of log if it's not parsed by FlexiNGSpliter. return None if the
+    command is not found.
+    """
+    if isinstance(logfile,FlexiNGSpliter):
+        logs = logfile.get_log("show ng service-awareness pcc-rule")
+        if not logs:
+            return None
+        return [line + "\n" for log in logs for line in log.result]
+    if not pats_stat['pcc-rule-cmd'].search(read_block(logfile,'pcc_rule')):
+        return None
+    return read_loglines(logfile)
 
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
 
+    result = ResultInfo(name,priority=priority)
     check_info = []
     
     ng = shareinfo.get('ELEMENT')
@@ -67,14 +84,11 @@ def run(logfile):
         else:
             check_info.append(u"- NG version: " + ng.version['major'] + u" 不在受影响版本列表中. \n")
 
-    loglines = file(logfile).readlines()
-    logtxt = read_block(logfile,'pcc_rule')
+    loglines = read_pcc_rules(logspliter or logfile)
     
     status = CheckStatus.UNCHECKED
     
-    pat=pats_stat['pcc-rule-cmd']
-    r=pat.search(logtxt)
-    if r:
+    if loglines is not None:
         if status == CheckStatus.UNCHECKED:
             status = CheckStatus.PASSED
     else:
@@ -14,11 +14,13 @@ priority  = 'default'   # default,normal,major,critical
 name      = "FlexiNG basic configuration and info collecting"
 desc      = __doc__
 criteria  = "Configurations were recognized successfully."
-result    = ResultInfo(name)
 
 
 ## Optional variables
 ##--------------------------------------------
+## the shared information set by the module, see libs/scheduler.py
+provides = ['ELEMENT']
+
 check_commands = [
     ('#'*60,"Please use `ngexec` to execute below commands:"),
     ('@bash\nldapsearch "fsLogicalNetworkElemId=*"',"list the hostname & version info. must be run in shell mode not fsclish"),
@@ -39,9 +41,10 @@ info_template="""FlexiNG Info:
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
     """The 'run' function is a mandatory fucntion. and it must return a ResultInfo.
     """
+    result = ResultInfo(name)
     #附加信息内容
     info = []
     #检查的结果状态
@@ -49,7 +52,7 @@ def run(logfile):
     #错误信息
     errmsg = []
     
-    ng = FlexiNG(logfile=logfile)
+    ng = FlexiNG(logfile=logspliter or logfile)
     if ng.hostname == "UNKNOWN" or (not ng.version):
         status = CheckStatus.UNKNOWN
         info.append("can't determinate the hostname or version. 无法判断主机名或版本信息\n")
@@ -15,8 +15,9 @@ from libs.checker import ResultInfo,CheckStatus
 from libs.flexins import FlexiNS
 from libs.flexins import get_ns_version
 from libs.infocache import shareinfo
+from libs.tools import read_logtext
 
-import textfsm
+from libs.patterns import patterns
 
 
 ## Mandatory variables 
@@ -31,13 +32,14 @@ criteria  = u"""
 （2）检查各板卡的Sensor数据，温度按大小排出Top 10。
 （3）如果Sensor数据中出现温度有超过70摄氏度，则显示为Error，建议报现场工程师或客户检修。
 """
-result = ResultInfo(name,priority=priority)
 error = ''
 
 
 ##--------------------------------------------
 ## Optional variables
 target_version = ['N5 1.17-5','N5 1.19-3']    
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 sensor_scripts = {
 	'SENSOR_TEMPERATURE             ':'modules\\flexins\\fsm_module\\ns_sensor_Temperature.fsm'
 }
@@ -86,16 +88,15 @@ slot_ipmb_adress = {
 TEMPERATURE_THRESHOLD = 70
 
 def read_block(logfile,blkname):
-    loglines = file(logfile).readlines()
-
-    return ''.join(loglines)
+    return read_logtext(logfile)
 
  
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
 
+    result = ResultInfo(name,priority=priority)
     blankstr = '                    '
     check_info = []
     # Check NS Version
@@ -112,14 +113,13 @@ def run(logfile):
     
     check_info.append(ns_version_status)
 
-    logtxt = read_block(logfile,'NS_Sensor_Temperature_status')
+    logtxt = read_block(logspliter or logfile,'NS_Sensor_Temperature_status')
     status = CheckStatus.UNCHECKED
     
     # From the logfile get Sensor Temperature
-    for name,script in sensor_scripts.items():
-        check_info.append(name)
-        fsm = textfsm.TextFSM(open(script))
-        fsminfos=fsm.ParseText(logtxt)
+    for sensor_name,script in sensor_scripts.items():
+        check_info.append(sensor_name)
+        fsminfos=patterns.fsm_parse(script,logtxt)
         #print len(fsminfos)
         if (len(fsminfos)>0):
             status = CheckStatus.PASSED
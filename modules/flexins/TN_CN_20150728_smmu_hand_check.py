@@ -20,7 +20,6 @@ name = "SMMU GRNPRB hand checking"
 desc = __doc__
 criteria = u''' 检查SMMU GRNPRB hand group 2 的hand数，50为通过
 '''
-result = ResultInfo(name,priority=priority)
 #error = ''
 ##--------------------------------------------
 
@@ -29,15 +28,19 @@ result = ResultInfo(name,priority=priority)
 ##--------------------------------------------
 ## Optional variables
 target_version = ['NS30', 'NS40', 'NS15']
+## the module reads no shared information, see libs/scheduler.py
+requires = []
 check_commands= [('ZDDE:SMMU,x:"ZL:9","ZLP:9,FAM","Z9H:404";','Show GRNPRB hand state,x is the unit id of SMMU.')]
 #match_start= 'HAND FO:PREV NEXT TIME     GR STATE    STABITS  JBUFFER      RCOMP FAM  PROC FO'
 patten = re.compile("^[0-9,A-F]{4} [0-9,A-F]{2} [0-9,A-F]{4}")
+unit_patten = re.compile(r".+SMMU,(\d+)")
 smmu_info="SMMU-%s GRNPRB hands number: %s"
 ##
 
-def read_block(logfile,blkname):
-    logspliter=LogSpliter(type=LOG_TYPE_FLEXI_NS)
-    logspliter.load(logfile)
+def read_block(logfile,blkname,logspliter=None):
+    if logspliter is None:
+        logspliter=LogSpliter(type=LOG_TYPE_FLEXI_NS)
+        logspliter.load(logfile)
     return logspliter.get_log(blkname,fuzzy=True)
 
 ##--------------------------------------------
@@ -52,15 +55,16 @@ def log_collection():
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------
-def run(logfile):
+def run(logfile,logspliter=None):
+    result = ResultInfo(name,priority=priority)
     rsult_info=[]
     total_status=CheckStatus.UNKNOWN
 
 
-    blocks = read_block(logfile,'ZDDE:SMMU,')
+    blocks = read_block(logfile,'ZDDE:SMMU,',logspliter)
 
     for block in blocks:
-        m=re.match(r".+SMMU,(\d+)",block.command)
+        m=unit_patten.match(block.command)
         unit_index=''
         if m:
             unit_index=m.groups(1)[0]
@@ -10,6 +10,8 @@ FlexiNS/MME Cause code mapping Checking
 """
 import re
 from libs.checker import ResultInfo,CheckStatus
+from libs.tools import read_loglines
+from libs.patterns import patterns
 
 ## Mandatory variables 
 ##-----------------------------------------------------
@@ -32,6 +34,8 @@ criteria  = u"""(1)检查NS/MME软件版本为 ['N5 1.19-3','N5 1.17-5'] 或者
 ##-----------------------------------------------------
 # available target versions:
 target_versions = ['N5 1.19-3','N5 1.17-5']
+## the module reads no shared information, see libs/scheduler.py
+requires = []
 check_commands = [
 	("ZWOI:;","show the NS data of the parameters defined in the PRFILE"),
 	("ZWQO:CR;","show the NS packages information"),
@@ -46,7 +50,7 @@ know_version_identify_Patt = r"\s*(N\d+\s+\d+.\d+-\d+)\s*"
 def version_up_NS15_id(NsVersionId):
 	up_id = 0
 	version_id_Patt = r"\s*N(\d+)\s+\d+.\d+-\d+\s*"
-	m=re.search(version_id_Patt,NsVersionId)
+	m=patterns.search(version_id_Patt,NsVersionId)
 	if m:
 		big_version_id = m.group(1)
 		if int(big_version_id) >= 5:
@@ -70,17 +74,19 @@ def Find_NS_MME_Patt_Return_Info_List(LogFile,CommandStr,InfoPatt,ReturnInfoLen)
 	Command_end_Patt=r"\s*COMMAND\s+EXECUTED\s*$"
 	Find_Info_Patt=InfoPatt
 ##	print "Find_Info_Patt =",Find_Info_Patt
+	Command_start_Patt=patterns.compile(Command_start_Patt)
+	Command_end_Patt=patterns.compile(Command_end_Patt)
+	Find_Info_Patt=patterns.compile(Find_Info_Patt)
 	return_Len = ReturnInfoLen+1
-	fp=open(LogFile,'r')
-	for line in fp.readlines():
+	for line in read_loglines(LogFile):
 		if Command_start==False and Command_end==False:
-			m=re.search(Command_start_Patt,line)
+			m=Command_start_Patt.search(line)
 			if m:
 				Command_start=True
 				continue
 		elif Command_start==True and Command_end==False:
-			m0=re.search(Command_end_Patt,line)
-			m1=re.search(Find_Info_Patt,line)
+			m0=Command_end_Patt.search(line)
+			m1=Find_Info_Patt.search(line)
 			if m0:
 				Command_end=True
 				continue
@@ -94,7 +100,6 @@ def Find_NS_MME_Patt_Return_Info_List(LogFile,CommandStr,InfoPatt,ReturnInfoLen)
 				continue
 		else:
 			break
-	fp.close()
 	return return_info_list
 
 def returnNotMatchItemInList(List_two,ItemName):
@@ -105,14 +110,14 @@ def returnNotMatchItemInList(List_two,ItemName):
 	return ItemName_New
 
 ## Mandatory function: run
-def run(logfile):
+def run(logfile,logspliter=None):
 	result = ResultInfo(name,priority=priority)
 	info   = []
 	errmsg = ''
 	errid = 1
 	Ns_version_Patt=r"\s*\S+\s+BU\s+\S+\s+(\w+\d+\s*\S+)\s+Y\s+Y\s*$"
 	try :
-		version = Find_NS_MME_Patt_Return_Info_List(logfile,'WQO:CR;',Ns_version_Patt,1)[0]
+		version = Find_NS_MME_Patt_Return_Info_List(logspliter or logfile,'WQO:CR;',Ns_version_Patt,1)[0]
 	except IndexError:
 		version = ''
 ##	print "\n****Find version id is : ",version
@@ -120,7 +125,7 @@ def run(logfile):
 		result.status = CheckStatus.PASSED
 		info.append(u"    - 检查到 NS/MME 软件版本为：'%s' ,它属于或者高于NS15版本." % version)
 	else:
-		m=re.search(know_version_identify_Patt,version)
+		m=patterns.search(know_version_identify_Patt,version)
 		if m:
 			result.status = CheckStatus.FAILED
 			info.append(u"    - 检查到 NS/MME 软件版本为：'%s' ,它不属于或者低于NS15版本." % version)
@@ -134,7 +139,7 @@ def run(logfile):
 	
 	InfoPatt_mapping=r"\s*02244\s+MME_CC_MAPPING_ENABLED\s+(\S+)\s+YES\s*$"
 	try:
-		MME_CC_MAPPING_ENABLED_Value = int(Find_NS_MME_Patt_Return_Info_List(logfile,'WOI:;',InfoPatt_mapping,1)[0],16)
+		MME_CC_MAPPING_ENABLED_Value = int(Find_NS_MME_Patt_Return_Info_List(logspliter or logfile,'WOI:;',InfoPatt_mapping,1)[0],16)
 	except IndexError:
 		MME_CC_MAPPING_ENABLED_Value = None
 ##	print "MME_CC_MAPPING_ENABLED_Value = ",MME_CC_MAPPING_ENABLED_Value
@@ -148,8 +153,8 @@ def run(logfile):
 		return result
 	EPCEMM_Patt = r"\s*(\S*)\s+EMM\s*$"
 	EPCESM_Patt = r"\s*(\S*)\s+ESM\s*$"
-	Cause_code_set_EMM_Name_List = Find_NS_MME_Patt_Return_Info_List(logfile,'KAL:;',EPCEMM_Patt,1)
-	Cause_code_set_ESM_Name_List = Find_NS_MME_Patt_Return_Info_List(logfile,'KAL:;',EPCESM_Patt,1)
+	Cause_code_set_EMM_Name_List = Find_NS_MME_Patt_Return_Info_List(logspliter or logfile,'KAL:;',EPCEMM_Patt,1)
+	Cause_code_set_ESM_Name_List = Find_NS_MME_Patt_Return_Info_List(logspliter or logfile,'KAL:;',EPCESM_Patt,1)
 	Cause_code_set_EPCEMM = returnNotMatchItemInList(Cause_code_set_EMM_Name_List,'EMMDEF')
 	Cause_code_set_EPCESM = returnNotMatchItemInList(Cause_code_set_ESM_Name_List,'ESMDEF')
 
@@ -165,19 +170,19 @@ def run(logfile):
 	EsmIntcause165_Command = 'KAL:NAME=%s,TYPE=ESM,PROC=PDNCR,INTCAUSE=165:;' % (Cause_code_set_EPCESM)
 	
 	try:
-		EmmExternal142 = int(Find_NS_MME_Patt_Return_Info_List(logfile,EmmIntcause142_Command,EmmIntcause142_Patt,1)[0])
+		EmmExternal142 = int(Find_NS_MME_Patt_Return_Info_List(logspliter or logfile,EmmIntcause142_Command,EmmIntcause142_Patt,1)[0])
 	except IndexError:
 		EmmExternal142 = None
 		errmsg =errmsg + u"%s.未检测到命令\" %s \"的输出\n" % (errid,EmmIntcause142_Command)
 		errid+=1
 	try:
-		EmmExternal96= int(Find_NS_MME_Patt_Return_Info_List(logfile,EmmIntcause96_Command,EmmIntcause96_Patt,1)[0])
+		EmmExternal96= int(Find_NS_MME_Patt_Return_Info_List(logspliter or logfile,EmmIntcause96_Command,EmmIntcause96_Patt,1)[0])
 	except IndexError:
 		EmmExternal96 = None
 		errmsg =errmsg + u"%s.未检测到命令\" %s \"的输出\n" % (errid,EmmIntcause96_Command)
 		errid+=1
 	try:
-		EsmExternal165 = int(Find_NS_MME_Patt_Return_Info_List(logfile,EsmIntcause165_Command,EsmIntcause165_Patt,1)[0])
+		EsmExternal165 = int(Find_NS_MME_Patt_Return_Info_List(logspliter or logfile,EsmIntcause165_Command,EsmIntcause165_Patt,1)[0])
 	except IndexError:
 		EsmExternal165 = None
 		errmsg =errmsg + u"%s.未检测到命令\" %s \"的输出\n" % (errid,EsmIntcause165_Command)
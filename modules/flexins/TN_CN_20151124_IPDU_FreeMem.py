@@ -8,6 +8,8 @@ u"""FlexiNS/MME IPDU空闲内存持续减少的问题
 """
 import re
 from libs.checker import ResultInfo,CheckStatus
+from libs.tools import read_loglines
+from libs.patterns import patterns
 
 ## Mandatory variables 
 ##-----------------------------------------------------
@@ -29,6 +31,8 @@ criteria  = u"""\
 ##-----------------------------------------------------
 # available target versions:
 target_versions = ['N5 1.19-3','N5 1.17-5']
+## the module reads no shared information, see libs/scheduler.py
+requires = []
 check_commands = [
     ("ZWQO:CR;","show the VERSION in the MME/SGSN"),
 	("ZAHO:;","show the alarms in the MME/SGSN"),
@@ -41,7 +45,7 @@ know_version_identify_Patt = r"\s*(N\d+\s+\d+.\d+-\d+)\s*"
 def version_up_NS15_id(NsVersionId):
 	up_id = 0
 	version_id_Patt = r"\s*N(\d+)\s+\d+.\d+-\d+\s*"
-	m=re.search(version_id_Patt,NsVersionId)
+	m=patterns.search(version_id_Patt,NsVersionId)
 	if m:
 		big_version_id = m.group(1)
 		if int(big_version_id) >= 5:
@@ -65,18 +69,19 @@ def Find_NS_MME_Patt_Return_Info_List(LogFile,CommandStr,InfoPatt,ReturnInfoLen)
 	Command_end_Patt=r"\s*COMMAND\s+EXECUTED\s*$"
 	Find_Info_Patt=InfoPatt
 ##	print "Find_Info_Patt =",Find_Info_Patt
+	Command_start_Patt=patterns.compile(Command_start_Patt)
+	Command_end_Patt=patterns.compile(Command_end_Patt)
+	Find_Info_Patt=patterns.compile(Find_Info_Patt)
 	return_Len = ReturnInfoLen+1
-	fp=open(LogFile,'r')
-	
-	for line in fp.readlines():
+	for line in read_loglines(LogFile):
 		if Command_start==False and Command_end==False:
-			m=re.search(Command_start_Patt,line)
+			m=Command_start_Patt.search(line)
 			if m:
 				Command_start=True
 				continue
 		elif Command_start==True and Command_end==False:
-			m0=re.search(Command_end_Patt,line)
-			m1=re.search(Find_Info_Patt,line)
+			m0=Command_end_Patt.search(line)
+			m1=Find_Info_Patt.search(line)
 			if m0:
 				Command_end=True
 				continue
@@ -91,7 +96,6 @@ def Find_NS_MME_Patt_Return_Info_List(LogFile,CommandStr,InfoPatt,ReturnInfoLen)
 		else:
 			break
 	
-	fp.close()
 	return return_info_list
 
 def F_MME_Patt_Return_Info_List(LogFile,CommandStr,InfoPatt1,Deviation=0,InforPatt2="",groupid1=0,groupid2=0):
@@ -117,30 +121,31 @@ def F_MME_Patt_Return_Info_List(LogFile,CommandStr,InfoPatt1,Deviation=0,InforPa
 	Command_end_Patt=r"\s*COMMAND\s+EXECUTED\s*$"
 	Find_Info_Patt=InfoPatt1
 ##	print "Find_Info_Patt =",Find_Info_Patt
+	Command_start_Patt=patterns.compile(Command_start_Patt)
+	Command_end_Patt=patterns.compile(Command_end_Patt)
+	Find_Info_Patt=patterns.compile(Find_Info_Patt)
 	#return_Len = ReturnInfoLen+1
 
-	fp=open(LogFile,'r')
-
-        LogLines=fp.readlines()
+	LogLines=read_loglines(LogFile)
 	i=-1
 	for line in LogLines:
 		i=i+1
 
 		if Command_start==False and Command_end==False:
-			m=re.search(Command_start_Patt,line)
+			m=Command_start_Patt.search(line)
 			if m:
 				Command_start=True
 				continue
 		elif Command_start==True and Command_end==False:
 		#command begining but not finished
-			m0=re.search(Command_end_Patt,line)
+			m0=Command_end_Patt.search(line)
 			
 			if m0:
 				#command finished
 				Command_end=True
 				break
 			#13198 root      20   0  620m 291m 3584 S 70.6  1.2   9363:13 lnx-mmeGTPLBS
-			m1=re.search(Find_Info_Patt,line)
+			m1=Find_Info_Patt.search(line)
 			
 			if m1:
 				#The first pattern hit, check the seconde pattern in deviation line
@@ -150,7 +155,7 @@ def F_MME_Patt_Return_Info_List(LogFile,CommandStr,InfoPatt1,Deviation=0,InforPa
 				if groupid1<>0 : return_info_list[1][1]=m1.group(groupid1)
 				
 				if Deviation<>0:					
-					m2=re.search(InforPatt2,LogLines[i+Deviation])
+					m2=patterns.search(InforPatt2,LogLines[i+Deviation])
 					if m2 : 
 						m_second=m2.group(0)
 						if m_second : return_info_list[2][0]=m2.group(0)
@@ -158,7 +163,6 @@ def F_MME_Patt_Return_Info_List(LogFile,CommandStr,InfoPatt1,Deviation=0,InforPa
 
 	#if m_first : return_info_list.append(m_first)
 	#if m_second : return_info_list.append(m_second)
-	fp.close()
 	return return_info_list
 
 
@@ -170,7 +174,7 @@ def returnNotMatchItemInList(List_two,ItemName):
 	return ItemName_New
 
 ## Mandatory function: run
-def run(logfile):
+def run(logfile,logspliter=None):
 	result = ResultInfo(name,priority=priority)
 	info   = []
 	errmsg = ''
@@ -178,7 +182,7 @@ def run(logfile):
 	abnormal_flag=0
 	
 	try :
-		version = Find_NS_MME_Patt_Return_Info_List(logfile,'WQO:CR;',Ns_version_Patt,1)[0]
+		version = Find_NS_MME_Patt_Return_Info_List(logspliter or logfile,'WQO:CR;',Ns_version_Patt,1)[0]
 	except IndexError:
 		version = ''
 ##	print "\n****Find version id is : ",version
@@ -186,7 +190,7 @@ def run(logfile):
 		result.status = CheckStatus.PASSED
 		info.append(u"    - 检查到 NS/MME 软件版本为：'%s' ,它属于或者高于NS15版本." % version)
 	else:
-		m=re.search(know_version_identify_Patt,version)
+		m=patterns.search(know_version_identify_Patt,version)
 		if m:
 			result.status = CheckStatus.FAILED
 			info.append(u"    - 检查到 NS/MME 软件版本为：'%s' ,它不属于或者低于NS15版本." % version)
@@ -207,7 +211,7 @@ def run(logfile):
 	InfoPatt2=r""
 	
 	try:
-		MME_Usage = F_MME_Patt_Return_Info_List(logfile,CommandPatt,InfoPatt1,0,InfoPatt2,1,0)
+		MME_Usage = F_MME_Patt_Return_Info_List(logspliter or logfile,CommandPatt,InfoPatt1,0,InfoPatt2,1,0)
 	except IndexError:
 		MME_Usage[0][0] = "Unkown Error!"
 		MME_Usage[0][1] = -1
@@ -236,7 +240,7 @@ def run(logfile):
 	InfoPatt_mapping1=r"\s*1143\s+AMOUNT OF FREE MEMORY REDUCED"
 	InfoPatt_mapping2=r"IPDU-"
 	try:
-		MME_Alarm_1143 = F_MME_Patt_Return_Info_List(logfile,'AHO:;',InfoPatt_mapping1,-1,InfoPatt_mapping2)
+		MME_Alarm_1143 = F_MME_Patt_Return_Info_List(logspliter or logfile,'AHO:;',InfoPatt_mapping1,-1,InfoPatt_mapping2)
 	except IndexError:
 		MME_Alarm_1143[0][0] = "Unkown Error!"
 		MME_Alarm_1143[0][1] = -1
@@ -260,7 +264,7 @@ def run(logfile):
 	InfoPatt1=r"^.*\s+(\S+)\s+\S+\s+lnx-mmeGTPLBS"
 	InfoPatt2=r""
 	try:
-		MME_Usage = F_MME_Patt_Return_Info_List(logfile,CommandPatt,InfoPatt1,0,InfoPatt2,1,0)
+		MME_Usage = F_MME_Patt_Return_Info_List(logspliter or logfile,CommandPatt,InfoPatt1,0,InfoPatt2,1,0)
 	except IndexError:
 		MME_Usage[0][0] = "Unkown Error!"
 		MME_Usage[0][1] = -1
@@ -52,10 +52,13 @@ criteria  = u'''
 # -----------------------------------------------------
 # available target versions:
 target_versions = ['N5 1.19-3']
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 check_commands = [
     ('ZDDE:IPDU,:"cat /opt/mme/conf/mmeGTPLBS-0x0968.ini",:;',
      "print the file content of LNX968NX.INI"),
 ]
+throttling_pattern = re.compile("\s*S11_THROTTLING_ENABLED\s*=\s*(\d){1}")
 
 
 def debugmsg(msg):
@@ -88,12 +91,11 @@ def is_throttling_on(logs):
     """
     info = []
     status = CheckStatus.UNKNOWN
-    pattern = re.compile("\s*S11_THROTTLING_ENABLED\s*=\s*(\d){1}")
     if len(logs) == 0:
         debugmsg("can not get the s11 throttling related command in the log file")
         raise Exception(u'日志文件中无法找到需要检测的信息，请确所认收集日志是是否执行“ZDDE:IPDU,:"cat /opt/mme/conf/mmeGTPLBS-0x0968.ini",:;”。')
     for cmd_result in logs[0].result:
-        matched = pattern.match(cmd_result)
+        matched = throttling_pattern.match(cmd_result)
         if matched:
             throttling = matched.group(1)
             debugmsg("current throtlling is set to [%s]" % throttling)
@@ -111,13 +113,14 @@ def is_throttling_on(logs):
     return (status, info)
 
 
-def run(logfile):
+def run(logfile, logspliter=None):
     """module entry of S11 Throttling validation
 
     Parse the log file and return the result of the validation.
 
     Arguments:
         logfile { str } -- the name of the log file
+        logspliter { log_spliter.SpliterBase } -- the parsed log file
 
     Returns:
         { libs.checker.ResultInfo }
@@ -151,8 +154,10 @@ def run(logfile):
 
     # throttling feature checking
     try:
-        logspt = LogSpliter()
-        logspt.load(logfile)
+        logspt = logspliter
+        if logspt is None:
+            logspt = LogSpliter()
+            logspt.load(logfile)
         logs = logspt.get_log(
             "DDE:IPDUcat /opt/mme/conf/mmeGTPLBS-0x0968.ini", fuzzy=True)
     except Exception as e:
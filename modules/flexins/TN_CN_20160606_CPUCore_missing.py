@@ -24,29 +24,30 @@ criteria  = u"""
 （1）检查MME版本为 ['N5','N6'] 或者更高版本。
 （2）检查IPDU/MMDU/CPPU板卡的CPU Core的数量。等于12则为PASSED，小于12为FAILED。
 """
-result = ResultInfo(name,module_id=module_id,priority=priority)
 error = ''
 
 
 ##--------------------------------------------
 ## Optional variables
 target_version = ['N5','N6']    
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 
 check_commands = [
     ("ZWQO:CR;","show the NS packages information"),
     ('ZDDE:{@UNIT_ID}:"cat /proc/cpuinfo | grep processor",;',"show CPU info of all CPU blade"),
 ]
+processor_pat = re.compile("processor\s+: \d{1,2}")
+unit_pat = re.compile("ZDDE:(\w+),(\d+)")
+
 def process_num(block):
-    num = 0
-    pat = re.compile("processor")
-    _processors=re.findall("processor\s+: \d{1,2}",''.join(block))
+    _processors=processor_pat.findall(block)
     
     return len(_processors)
      
-def caculate_cpu_cores(logfile):
-    log=LogSpliter(logfile=logfile)
+def caculate_cpu_cores(logfile,logspliter=None):
+    log=logspliter or LogSpliter(logfile=logfile)
     #log.load(logfile)
-    unit_pat = re.compile("ZDDE:(\w+),(\d+)")
     
     core_nums = {}
     for blk in log.get_log("cpuinfo",fuzzy=True):
@@ -55,7 +56,7 @@ def caculate_cpu_cores(logfile):
             unit = "-".join(_unit[0])
         else:
             continue
-        core_nums[unit] = process_num(blk.result)
+        core_nums[unit] = process_num(blk.block)
         
     return core_nums
 
@@ -63,7 +64,8 @@ def caculate_cpu_cores(logfile):
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
+    result = ResultInfo(name,module_id=module_id,priority=priority)
     status = CheckStatus.UNCHECKED 
     errmsg = []    
     
@@ -75,7 +77,7 @@ def run(logfile):
         result.update(status=CheckStatus.UNKNOWN,info=[msg],error=error)
     
     elif vstatus== CheckStatus.VERSION_MATCHED:
-        cpuinfo = caculate_cpu_cores(logfile)
+        cpuinfo = caculate_cpu_cores(logfile,logspliter)
         _msg = []
 
         for unit,corenum in cpuinfo.items():
@@ -17,6 +17,7 @@ from libs.checker import ResultInfo,CheckStatus
 from libs.flexins import FlexiNS
 from libs.flexins import get_ns_version
 from libs.infocache import shareinfo
+from libs.tools import read_logview
 
 
 ## Mandatory variables 
@@ -31,13 +32,14 @@ criteria  = u"""
 （2）检查OMU，MCHU的硬盘碎片率是否大于60%。大于为FAILED，小于则为PASSED。
 （3）如果log中没有相应的指令log，结果为UNKNOWN。
 """
-result = ResultInfo(name,priority=priority)
 error = ''
 
 
 ##--------------------------------------------
 ## Optional variables
 target_version = ['N5 1.17-5','N5 1.19-3']    
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 
 pats_fragment = {'OMU-WDU0': re.compile(r"ZDDE:OMU.*?WDU-0.*?Fragmentation degree ",re.S),
         'OMU-WDU1': re.compile(r"ZDDE:OMU.*?WDU-1.*?Fragmentation degree ",re.S),
@@ -54,16 +56,15 @@ check_commands = [
     ("ZDDE:MCHU:\"ZMA:W0,F3,,,,,\",\"ZMA:W1,F3,,,,,\",\"ZGSC:,00FC\";","show MCHU WDU fragment ratio"),
 ]
 def read_block(logfile,blkname):
-    loglines = file(logfile).readlines()
-
-    return ''.join(loglines)
+    return read_logview(logfile)
 
  
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
 
+    result = ResultInfo(name,priority=priority)
     fragment_status={name:'' for name in pats_fragment}
     
     # Check NS Version
@@ -78,20 +79,20 @@ def run(logfile):
         else:
             fragment_status['nsversion']=u"    - NS version: " + nsversion + u" 不在支持版本清单里. \n"
     
-    logtxt = read_block(logfile,'NS_fragment_status')
+    logtxt = read_block(logspliter or logfile,'NS_fragment_status')
     
     
     status = CheckStatus.UNCHECKED
     
-    for name,pat in pats_fragment.items():
+    for fragment_name,pat in pats_fragment.items():
         r=pat.search(logtxt)
         #print r.end()
         if r:
             logpos=r.end()
             if status == CheckStatus.UNCHECKED:
                 status = CheckStatus.PASSED
-            fragment_status[name] = logtxt[logpos:logpos+5]
-            if fragment_status[name] > '60.0':
+            fragment_status[fragment_name] = logtxt[logpos:logpos+5]
+            if fragment_status[fragment_name] > '60.0':
                 status = CheckStatus.FAILED
             
     #print fragementstatus_str, fragment_status
@@ -9,6 +9,8 @@ from libs.checker import ResultInfo,CheckStatus
 from libs.flexins import FlexiNS
 from libs.flexins import get_ns_version
 from libs.infocache import shareinfo
+from libs.tools import read_logview
+from libs.kpiformula import KPIEngine
 
 
 ## Mandatory variables 
@@ -22,7 +24,6 @@ criteria  = u"""
 （1）检查MME/SGSN版本为 ['N5 1.19-3','N5 1.17-5'] 或者更高版本。
 （2）按照log中的Counter值，计算KPI。
 """
-result = ResultInfo(name,priority=priority)
 error = ''
 
 #
@@ -42,6 +43,8 @@ error = ''
 ##--------------------------------------------
 ## Optional variables
 target_version = ['N5 1.17-5','N5 1.19-3']    
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 
 pats_counters = {'Counter': re.compile(r"(M[\d]+C[\d]+)[\s]+(.*)([\d]{10})\n",re.M)
 }
@@ -73,68 +76,31 @@ counter_get_commands = [
     ("ZTPP:MMMT;","show MMMT counter"),
     ("ZTPP:SMMT;","show SMMT counter"),
 ]
-value_counters = {}
-
 counterlist=['M72C012','M72C014','GS:4,5:(round($4$/($4$+$5$),4)*100)','M72C013','M72C015','GS:7,8:(round($7$/($7$+$8$),4)*100)','M72C000','M72C001','M72C002','M72C003']
 
-def getKPIvalue(kpi_name,kpi_func_param,value_counters):
-	# Get the param length, if 0, error ,if 1 ,mean kpi = counter
-	# if 2 or larger, mearn kpi = eval(counter1,counter2,......)
-	k=len(kpi_func_param)
-	if (k==0):
-		return None
-	elif (k==1):
-		if (value_counters[kpi_func_param[0]])<>None:
-			return value_counters[kpi_func_param[0]]
-		else:
-			return None
-
-	# the formula string sample: 'GS:4,5:round($4$/($4$+$5$),4)*100'
-	kpi_formula=kpi_func_param[0]
-	#print 'kpi_formula='+kpi_formula
-	kpi_formula_struc=kpi_formula.split(':')
-	if ((len(kpi_formula_struc)==0) or kpi_formula_struc[0]<>'GS'):
-		return None
-	
-	gs_desc=kpi_formula_struc[1]
-	#print 'gs_desc='+gs_desc
-	gs_counters_list=kpi_func_param[1:]
-	#print gs_counters_list
-	items_counter=len(gs_counters_list)
-	itemno=0
-	for item in gs_counters_list:
-	#print item
-		#gs_item=gs_desc.replace('$'+item+'$',str(value_counters[gs_counters_list(item-1)]))
-		#print 'gs_counters_list[itemno]='+gs_counters_list[itemno]
-		#print 'value_counters[gs_counters_list[itemno]]='+value_counters[gs_counters_list[itemno]]
-		if (value_counters[gs_counters_list[itemno]])==None:
-			return None
-		gs_desc=gs_desc.replace('$'+str(itemno)+'$',str(float(value_counters[gs_counters_list[itemno]])))
-		#print 'gs_real real:'+gs_realitem
-		itemno=itemno+1
-	try:
-		#print 'gs_desc='+gs_desc
-		gs_result=eval(gs_desc)
-		#print 'gs_result='+str(gs_result)
-	except:
-		gs_result=0
-	
-	#print gs_result		
-	return gs_result
+## the formulas are parsed and checked once when the module is loaded,
+## the formula string sample: 'GS:round($0$/($0$+$1$),4)*100'
+kpi_engine = KPIEngine(kpi_formula)
 
+def getCounters(logtxt):
+	"""return {counter: value} of the counters in the log, in one pass.
+	"""
+	value_counters = {}
+	for r in pats_counters['Counter'].finditer(logtxt):
+		value_counters[r.group(1)] = r.group(3)
+	return value_counters
 
 
 def read_block(logfile,blkname):
-    loglines = file(logfile).readlines()
-
-    return ''.join(loglines)
+    return read_logview(logfile)
 
  
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
 
+	result = ResultInfo(name,priority=priority)
 	info_result=[]
 	ns_kpi_values={name:'' for name in kpi_formula}
 	
@@ -151,30 +117,20 @@ def run(logfile):
 			ns_version_status=u"    - NS version: " + nsversion + u" 不在支持版本清单里. \n"
     
 	info_result.append(ns_version_status)
-	logtxt = read_block(logfile,'NS_KPI_CHECK')
+	logtxt = read_block(logspliter or logfile,'NS_KPI_CHECK')
     
     
 	status = CheckStatus.UNCHECKED
     
 	# From the KPI logfile get Counters
-	for name,pat in pats_counters.items():
-		if(name=='Counter'):
-			r=pat.search(logtxt)
-			#print r.end()
-			while r:
-				logpos=r.end()
-				if status == CheckStatus.UNCHECKED:
-					status = CheckStatus.PASSED
-				#print 'Counter: '+r.group(1)+';'+ '='+ r.group(3)
-				value_counters[r.group(1)] = r.group(3)
-				logtxt=logtxt[logpos:]
-				r=pat.search(logtxt)
+	value_counters = getCounters(logtxt)
+	if value_counters:
+		status = CheckStatus.PASSED
 				
 	# According the KPI formula get the KPI Value
+	kpi_values = kpi_engine.evaluate(value_counters)
 	for kpi_name in kpi_formula.keys():
-		kpi_func_param = kpi_formula[kpi_name]
-		kpi_value = getKPIvalue(kpi_name,kpi_func_param,value_counters)
-		info_result.append(kpi_name+' = \t\t'+str(kpi_value))
+		info_result.append(kpi_name+' = \t\t'+str(kpi_values[kpi_name]))
 	
 	#print fragementstatus_str, fragment_status
 	if status == CheckStatus.UNCHECKED:
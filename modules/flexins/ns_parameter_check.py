@@ -9,8 +9,9 @@ from libs.checker import ResultInfo,CheckStatus
 from libs.flexins import FlexiNS
 from libs.flexins import get_ns_version
 from libs.infocache import shareinfo
+from libs.tools import read_logtext
 
-import textfsm
+from libs.patterns import patterns
 
 ## Mandatory variables 
 ##--------------------------------------------
@@ -23,7 +24,6 @@ criteria  = u"""
 （1）检查MME/SGSN版本为 ['N5 1.19-3','N5 1.17-5'] 或者更高版本。
 （2）整理输出log中的参数。
 """
-result = ResultInfo(name,priority=priority)
 error = ''
 
 #
@@ -43,6 +43,8 @@ error = ''
 ##--------------------------------------------
 ## Optional variables
 target_version = ['N5 1.17-5','N5 1.19-3']    
+## the shared information read by the module, see libs/scheduler.py
+requires = ['ELEMENT']
 
 parameter_scripts = {
 	'LTE Paging Parameter           ':'modules\\flexins\\fsm_module\\b6j.fsm',
@@ -76,16 +78,15 @@ parameter_get_commands = [
 
 
 def read_block(logfile,blkname):
-    loglines = file(logfile).readlines()
-
-    return ''.join(loglines)
+    return read_logtext(logfile)
 
  
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
 
+	result = ResultInfo(name,priority=priority)
 	info_result=[]
 	#ns_parameter_values={name:'' for name in parameter_scripts}
 	
@@ -102,16 +103,15 @@ def run(logfile):
 			ns_version_status=u"    - NS version: " + nsversion + u" 不在支持版本清单里. \n"
     
 	info_result.append(ns_version_status)
-	logtxt = read_block(logfile,'NS_PARAMETER_CHECK')
+	logtxt = read_block(logspliter or logfile,'NS_PARAMETER_CHECK')
     
     
 	status = CheckStatus.UNCHECKED
     
 	# From the logfile get Parameters
-	for name,script in parameter_scripts.items():
-		info_result.append(name)
-		fsm = textfsm.TextFSM(open(script))
-		fsminfos=fsm.ParseText(logtxt)
+	for parameter_name,script in parameter_scripts.items():
+		info_result.append(parameter_name)
+		fsminfos=patterns.fsm_parse(script,logtxt)
 		if (len(fsminfos)>0):
 			
 			status = CheckStatus.PASSED
@@ -13,11 +13,13 @@ priority  = 'default'
 name      = "FlexiNS basic info collecting"
 desc      = __doc__
 criteria  = "FNS basic info collecting."
-result    = ResultInfo(name,priority=priority)
 
 
 ## Optional variables
 ##--------------------------------------------
+## the shared information set by the module, see libs/scheduler.py
+provides = ['ELEMENT']
+
 check_commands = [
     ("ZWQO:CR;","show the NS packages information"),
     ("ZQNI:;","show the NS O&M configuratio"),  
@@ -35,12 +37,13 @@ info_template="""FlexiNS Info:
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
     """The 'run' function is a mandatory fucntion. and it must return a ResultInfo.
     """
+    result = ResultInfo(name,priority=priority)
     errmsg = ""
 
-    ns = FlexiNS(logfile=logfile)
+    ns = FlexiNS(logfile=logspliter or logfile)
     if ns.hostname == "UNKNOWN" and not hasattr(ns,'version'):
         print "Can't find the host info in log"
         exit(1)
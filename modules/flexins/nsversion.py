@@ -14,7 +14,6 @@ priority  = 'normal'
 name      = "Check the FNS software version"
 desc      = __doc__
 criteria  = "FNS package's ID match 'N5' or 'N4'"
-result    = ResultInfo(name)
 
 
 ## Optional variables
@@ -50,6 +49,7 @@ def check_version(ns):
 def run(logfile):
     """The 'run' function is a mandatory fucntion. and it must return a ResultInfo.
     """
+    result = ResultInfo(name)
     
     ns = shareinfo.get('FlexiNS')
     debugmsg(shareinfo)
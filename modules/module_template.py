@@ -19,7 +19,6 @@ desc      = __doc__
 criteria  = u"""
 {{criteria}}
 """
-result = ResultInfo(name,module_id=module_id,priority=priority)
 error = ''
 
 
@@ -27,6 +26,10 @@ error = ''
 ## Optional variables
 target_version = {{target_version}}  
 
+##模块读取/设置的共享信息(shareinfo)，用于安排模块的运行顺序，见libs/scheduler.py
+requires = ['ELEMENT']
+#provides = []
+
 ##在这里添加获取所需log的命令
 check_commands = [
     #("ZWQO:CR;","show the NS packages information"),
@@ -42,7 +45,8 @@ check_commands = [
 ##--------------------------------------------
 ## Mandatory function: run
 ##--------------------------------------------    
-def run(logfile):
+def run(logfile,logspliter=None):
+    result = ResultInfo(name,module_id=module_id,priority=priority)
     status = CheckStatus.UNCHECKED 
     errmsg = []    
     
@@ -13,18 +13,32 @@ examples:
    smartchecker -r checklist.ckl logfile
    smartchecker -r checklist.ckl logfile  --saveto report_sae01.html
    smartchecker -r checklist.ckl logfile  --template bootstrap.html
+   smartchecker -r checklist.ckl logdir  --jobs 8
+   smartchecker -r checklist.ckl logfile --module-jobs 4
+   smartchecker -r checklist.ckl logdir  --watch --jobs 4
+   smartchecker -r check_ns_tn.ckl,check_ng_tn.ckl logdir --jobs 4
 """
 __programname__ = 'Smartchecker'
 __version__     = '0.92'
 
 import sys,os, argparse,time
+import signal
+import multiprocessing
 import setsitenv
 from libs.configobject import ConfigObject
-from libs.checker import ImportCheckModules,ResultList,CheckList
-from libs.reportor import CheckReport, JinjaTemplate
-from libs.tools import MessageBuffer
-from libs.infocache import shareinfo
-from libs.logfile import LogFile, istextfile
+from libs.checker import ImportCheckModules,ResultList,CheckList,run_module
+from libs.reportor import CheckReport, JinjaTemplate, precompile_templates
+from libs.tools import MessageBuffer, print_textfile
+from libs.infocache import shareinfo, RunContext
+from libs.logfile import LogFile, istextfile, sniff_log_types, prune_sniff_cache
+from libs.log_spliter import LogSpliter, SpliterException, netype_log_type
+from libs.parsecache import ParseCache
+from libs.archive import isarchive, iter_archive_logs, prefetch, ArchiveError, SpooledMember
+from libs.elements import split_elements, LogRange
+from libs.watcher import LogWatcher
+from libs.patterns import patterns
+from libs.scheduler import run_modules
+from libs.usage import ModuleUsage
 from messagelogger import MessageLogger
 
 default_config = {
@@ -44,6 +58,38 @@ if os.path.exists(config_file):  #read the config file if it's exists.
 SILENT          = False
 REPORT_TEMPLATE = None
 SAVE_OUTPUT     = None
+JOBS            = 1
+#the number of threads to run the independent modules of one logfile.
+MODULE_JOBS     = max(CONFIG.get('module_jobs',1),1)
+
+#the logs larger than this size are parsed keeping the byte offsets only, the
+#members of archives larger than it are written to temporary files.
+LOG_OFFSETS_SIZE = CONFIG.get('log_offsets_size',200*1024*1024)
+
+#the cache of the parsed logs, shared by the checklists run on the same logs.
+PARSE_CACHE = None
+if CONFIG.get('parse_cache_path'):
+    PARSE_CACHE = ParseCache(CONFIG.parse_cache_path,
+                             CONFIG.get('parse_cache_size',500*1024*1024))
+
+#split the logs of several elements and check every element.
+SPLIT_ELEMENTS = CONFIG.get('split_elements',False)
+
+#the directory of the compiled templates, the templates are compiled once.
+TEMPLATE_CACHE = CONFIG.get('template_cache_path') or None
+
+#the watch mode: poll the logdir every watch_interval seconds, the logs not
+#changed for watch_settle seconds are checked, the checked logs are recorded
+#in the ledger file.
+WATCH_INTERVAL = CONFIG.get('watch_interval',10)
+WATCH_SETTLE   = CONFIG.get('watch_settle',30)
+WATCH_LEDGER   = CONFIG.get('watch_ledger','cache/watch_ledger')
+
+#the checklist name is added to the report names if several checklists run.
+REPORT_WITH_CHECKLIST = False
+
+#the checklists used in the worker process of check_logdir, by filepath.
+WORKER_CHECKLISTS = {}
 
 #initilize the logging.
 logfile = CONFIG.get('checker_logfile','/tmp/smartchecker.log')
@@ -55,7 +101,7 @@ logger = MessageLogger('SmartChecker')
 
 
 def args_parse():
-    global SILENT,REPORT_TEMPLATE,SAVE_OUTPUT
+    global SILENT,REPORT_TEMPLATE,SAVE_OUTPUT,JOBS,MODULE_JOBS,REPORT_WITH_CHECKLIST
     parser = argparse.ArgumentParser(version=" v".join([__programname__,__version__]))
     
     parser.usage = __doc__
@@ -63,7 +109,7 @@ def args_parse():
     parser.add_argument('logfile', nargs='?',
                         help="specify the log file.")
     parser.add_argument('-r','--run',
-                        help="run the modules specified in check lsit. ")
+                        help="run the modules specified in check lsit, the checklists are separated by ','. ")
     parser.add_argument('-s','--show',
                         help="view the modules specified in check lsit.")    
     parser.add_argument('-d','--debug', action="store_true",
@@ -78,6 +124,12 @@ def args_parse():
                         help="output the log info to file.")    
     parser.add_argument('-c','--commands',
                         help="generate the commands for collecting log.")
+    parser.add_argument('-j','--jobs', type=int, default=1,
+                        help="number of processes to check the log files in a directory.")
+    parser.add_argument('-m','--module-jobs', type=int, default=None,
+                        help="number of threads to run the independent check modules.")
+    parser.add_argument('-w','--watch', action="store_true",
+                        help="watch the log directory, check the new or modified logs.")
 
     args = parser.parse_args()
 
@@ -89,10 +141,18 @@ def args_parse():
         print("Need to specify a log filename or directory!")
         sys.exit(1)
 
+    if args.watch and not (args.run and os.path.isdir(args.logfile)):
+        print("Need to specify a log directory to watch!")
+        sys.exit(1)
+
     DEBUG   = args.debug
     SILENT  = args.silent
     REPORT_TEMPLATE = args.template
     SAVE_OUTPUT     = args.saveto or ""
+    JOBS            = max(args.jobs,1)
+    if args.module_jobs:
+        MODULE_JOBS = max(args.module_jobs,1)
+    REPORT_WITH_CHECKLIST = bool(args.run) and ',' in args.run
 
     return parser, args
 
@@ -100,6 +160,15 @@ def save_output_to_file(msgbuf,filename,path=None):
     output_path = path or CONFIG.reports_path
     msgbuf.output('file',os.path.join(output_path,filename))
 
+def save_report_to_file(template,data,filename,path=None):
+    """render the template with data to the report file chunk by chunk,
+    return the path of the report.
+    """
+    output_path = path or CONFIG.reports_path
+    report_file = os.path.join(output_path,filename)
+    template.dump(report_file,data)
+    return report_file
+
 def show_module_info(checklist,args):
     """show the information of given modules. if CONFIG.module_info_file is set,
     save the modules info to a file.
@@ -110,7 +179,7 @@ def show_module_info(checklist,args):
 
     msgbuf = MessageBuffer()
     cmdlist = []
-    template = JinjaTemplate(CONFIG.template_path)
+    template = JinjaTemplate(CONFIG.template_path,TEMPLATE_CACHE)
 
     if 'module_info' in checklist.templates:
         _template_file = args.template or checklist.templates['module_info']
@@ -137,23 +206,39 @@ def show_module_info(checklist,args):
 
     return 0
 
-def check_logfile(checklist,logfile, report_name_tmpl=None):
-    """run the check modules in console mode
+def check_logfile(checklist,logfile, report_name_tmpl=None, data=None):
+    """run the check modules in console mode. data is the content of the
+    logfile read from an archive, or the SpooledMember of a large member.
     """
-    log=LogFile(logfile)
+    #the large member is parsed from its temporary file, it's not cached.
+    logpath, cache = logfile, PARSE_CACHE
+    if isinstance(data,SpooledMember):
+        logpath, cache, data = data.path, None, None
+
+    log=LogFile(logpath,data)
     if not log.state or not log.match(checklist.netype):
         errmsg = "The %s does not match the element type in checklist:%s" % (logfile,checklist.netype)
         return None, errmsg
 
+    #parse the log once, the parsed log is shared by all the modules.
+    _start = time.time()
+    try:
+        offsets_only = data is None and os.path.getsize(logpath) > LOG_OFFSETS_SIZE
+        logspliter = LogSpliter(type=netype_log_type(checklist.netype),logfile=logpath,
+                                offsets_only=offsets_only,cache=cache,data=data)
+    except SpliterException as e:
+        errmsg = "Failed to parse the %s: %s" % (logfile,e)
+        return None, errmsg
+
     results = ResultList()
+    results.timings['parse'] = time.time() - _start
     output_format = CONFIG.output_format
     errmsg = ""
-    template = JinjaTemplate(CONFIG.template_path)
+    template = JinjaTemplate(CONFIG.template_path,TEMPLATE_CACHE)
 
     template_file = REPORT_TEMPLATE or checklist.templates['report']
     template_type = template_file.split('.')[-1]
     template.load(filename=template_file)
-    msgbuf = MessageBuffer()
 
     report = CheckReport()
     report.template_path = CONFIG.template_path
@@ -162,31 +247,53 @@ def check_logfile(checklist,logfile, report_name_tmpl=None):
     results.template_type = template_type
     
     #print("Running check modules...")
-    for idx,m in enumerate(checklist.modules):
-        _result = m.run(logfile)
-        _result.loadinfo(m)
-        results.append(_result)
+    #the ELEMENT set by the modules is kept in the context of this logfile.
+    _start = time.time()
+    with RunContext(logfile,logspliter=logspliter) as context:
+        def _run_module(m):
+            with ModuleUsage() as usage:
+                _result = run_module(m,logfile,logspliter)
+            _result.loadinfo(m)
+            usage.name = _result.module_id
+            _result.usage = usage
+            context.timings[_result.module_id] = usage.wall
+            return _result
+
+        #the independent modules run in parallel, the results are in the
+        #order of checklist.
+        for _result in run_modules(checklist.modules,_run_module,MODULE_JOBS,context):
+            results.append(_result)
+    results.timings['modules'] = time.time() - _start
+    #the mapped logfile is released, it could be replaced on windows.
+    logspliter.close()
         
     timestamp=time.strftime("%Y-%m-%d %H:%M")
-    element = shareinfo.get('ELEMENT')
+    element = context.element
     if not element:
         errmsg="No hostname and version info found in the log. quit."
         return None,errmsg
 
     hostname = element.hostname
+    #show the resource usage of the modules in report.
+    show_usage = CONFIG.get('report_usage',False)
     label_state = {'critical':'danger','major':'warning','normal':'info','default':'default'}  
-    _report = template.render(**locals())
-    msgbuf.append(_report)
-
-    if not SILENT and template_type =='md':
-        msgbuf.output(CONFIG.runmode)
 
     if not report_name_tmpl:
         report_name_tmpl = "report_%(hostname)s.%(template_type)s"
 
     report_filename = report_name_tmpl % locals()
+    if REPORT_WITH_CHECKLIST:
+        #the reports of the checklists for the same element.
+        _name,_ext = os.path.splitext(report_filename)
+        report_filename = "%s_%s%s" % (_name,checklist.name,_ext)
     logger.info("Save report to: %s" % os.path.join(SAVE_OUTPUT,report_filename))
-    save_output_to_file(msgbuf,report_filename,path=SAVE_OUTPUT)
+    #the report is rendered to the file directly, it's never kept in memory.
+    _start = time.time()
+    report_file = save_report_to_file(template,locals(),report_filename,path=SAVE_OUTPUT)
+    results.timings['render'] = time.time() - _start
+
+    if not SILENT and template_type =='md' and CONFIG.runmode in (None,'','console'):
+        print_textfile(report_file)
 
     results.hostname = hostname
     results.report_filename = report_filename
@@ -197,50 +304,275 @@ def check_logfile(checklist,logfile, report_name_tmpl=None):
                  results.stats_detail('UNKNOWN'),
                  results.stats_detail('PASSED'),
                 ))
+    logger.info("Usage: %s, %s, slowest:%s" %
+                (results.hostname,
+                 results.total_usage(),
+                 ', '.join("%s(%.2fs)" % (r.module_id,r.usage.wall) for r in results.slowest()),
+                ))
+    for r in results:
+        logger.debug("Usage of %s: %s" % (r.module_id,r.usage))
 
 
     return results , errmsg
 
 
-def check_logdir(checklist,logdir,output_path=''):
-    resultlist = []
-    errmsg = []
+def _init_check_worker(checklist_files,options):
+    """initialize the worker process of check_logdir. every worker imports
+    the check modules of the checklists by itself.
+    """
+    global SILENT,REPORT_TEMPLATE,SAVE_OUTPUT,MODULE_JOBS,REPORT_WITH_CHECKLIST
+    SILENT,REPORT_TEMPLATE,SAVE_OUTPUT,MODULE_JOBS,REPORT_WITH_CHECKLIST,debug = options
+    shareinfo.set('DEBUG',debug)
+    #the Ctrl-C is handled by the parent process, it terminates the pool.
+    signal.signal(signal.SIGINT,signal.SIG_IGN)
+
+    for checklist_file in checklist_files:
+        checklist = CheckList(checklist_file)
+        checklist.modules = ImportCheckModules(checklist)
+        WORKER_CHECKLISTS[checklist_file] = checklist
+
+def _check_logfile_task(checklist,task):
+    logfilename, report_name_tmpl, data = task
+    logger.debug("checking the logfile:%s" % logfilename)
+    #the element of a log is read by the worker.
+    if isinstance(data,LogRange):
+        data = data.read()
+    return check_logfile(checklist,logfilename,report_name_tmpl=report_name_tmpl,data=data)
+
+def _check_logfile_worker(args):
+    """check one logfile in the worker process, the ResultList is sent back
+    to the parent process.
+    """
+    checklist_file, task = args
+    return _check_logfile_task(WORKER_CHECKLISTS[checklist_file],task)
 
+def list_logdir(logdir):
+    """return the list of (logfilename, report_name_tmpl) of the logs and the
+    archives in the logdir.
+    """
+    tasks = []
     for dirpath, _ ,files in os.walk(logdir):
         #change the path: /path/log/project/xxx to report_project_xxx
         cur_dirname = dirpath.replace(logdir,"report").strip(os.path.sep).replace(os.path.sep,'_')
         output_file_tmpl = "%s_%%(hostname)s.%%(template_type)s" % cur_dirname
         #print "SAVE OUTPUT2:", output_file_tmpl
-        for fname in filter(istextfile, files):
-            logfilename = os.path.join(dirpath,fname)
-            logger.debug("checking the logfile:%s" % logfilename)
-            result, _errmsg = check_logfile(checklist,logfilename, report_name_tmpl=output_file_tmpl)
+        for fname in files:
+            if istextfile(fname) or isarchive(fname):
+                tasks.append((os.path.join(dirpath,fname),output_file_tmpl))
+    return tasks
+
+def log_checklists(checklists,logfilename,data=None):
+    """return the checklists of the log type, the type is sniffed from the
+    head and tail of the log. data is the content or the SpooledMember of the
+    log read from an archive.
+    """
+    try:
+        if isinstance(data,SpooledMember):
+            types = sniff_log_types(data.path)
+        else:
+            types = sniff_log_types(logfilename,data)
+    except (IOError,OSError) as e:
+        logger.error("Failed to read the %s: %s" % (logfilename,e))
+        return []
+    matched = [checklist for checklist in checklists if checklist.netype in types]
+    if not matched:
+        logger.debug("Skip the logfile: %s, the type is %s." % (logfilename,','.join(types) or 'unknown'))
+    return matched
+
+def iter_log_tasks(tasks,checklists):
+    """yield (checklist, (logfilename, report_name_tmpl, data)) of the tasks,
+    every log is routed to the checklists of its type. the logs in the
+    archives are decompressed once when they are iterated. data is None for
+    the logfiles on disk.
+    """
+    for logfilename, report_name_tmpl in tasks:
+        if not isarchive(logfilename):
+            matched = log_checklists(checklists,logfilename)
+            if matched:
+                for task in element_tasks(logfilename, report_name_tmpl):
+                    for checklist in matched:
+                        yield checklist, task
+            continue
+        try:
+            for name, data in iter_archive_logs(logfilename,LOG_OFFSETS_SIZE):
+                matched = log_checklists(checklists,name,data)
+                if isinstance(data,SpooledMember):
+                    #removed after the checks of all the checklists.
+                    data.refs = len(matched)
+                    if not matched:
+                        data.remove()
+                for checklist in matched:
+                    yield checklist, (name, report_name_tmpl, data)
+        except ArchiveError as e:
+            logger.error("%s" % e)
+
+def element_tasks(logfilename, report_name_tmpl):
+    """return the tasks of the elements in the logfile, the log of one
+    element is checked as a whole.
+    """
+    ranges = []
+    #the OSS reports(.json) are the data of many elements by design.
+    if SPLIT_ELEMENTS and not logfilename.endswith('.json'):
+        try:
+            ranges = split_elements(logfilename)
+        except (IOError,OSError) as e:
+            logger.error("Failed to scan the elements of %s: %s" % (logfilename,e))
+    if len(ranges) > 1:
+        logger.debug("%s elements found in %s" % (len(ranges),logfilename))
+        return [(r.name, report_name_tmpl, r) for r in ranges]
+    return [(logfilename, report_name_tmpl, None)]
+
+def check_pool(checklists,jobs):
+    """return the pool of `jobs` processes to check the logs by checklists.
+    """
+    options = (SILENT,REPORT_TEMPLATE,SAVE_OUTPUT,MODULE_JOBS,REPORT_WITH_CHECKLIST,
+               shareinfo.get('DEBUG'))
+    return multiprocessing.Pool(jobs,
+                                initializer=_init_check_worker,
+                                initargs=([c.filepath for c in checklists],options))
+
+def _task_done(task):
+    #the temporary file of the member is removed after its last check.
+    data = task[2]
+    if isinstance(data,SpooledMember):
+        data.refs -= 1
+        if data.refs <= 0:
+            data.remove()
+
+def check_tasks(checklists,tasks,jobs=1,pool=None):
+    """check the tasks (checklist, (logfilename, report_name_tmpl, data)),
+    tasks could be a generator. if jobs > 1, the logs are checked by a pool
+    of `jobs` processes, the results are in the order of tasks. the given
+    pool is used and kept open, it must be created with the checklists.
+    """
+    resultlist = []
+    errmsg = []
+
+    #the tasks in the order of the results.
+    pending = []
+    def _iter_tasks():
+        for checklist, task in tasks:
+            pending.append(task)
+            yield checklist, task
+
+    own_pool = pool is None and jobs > 1
+    if own_pool:
+        pool = check_pool(checklists,jobs)
+    if pool:
+        #the tasks are read by the thread of pool, the archives are
+        #decompressed while the workers check the logs.
+        checked = pool.imap(_check_logfile_worker,
+                            ((checklist.filepath,task) for checklist,task in _iter_tasks()))
+    else:
+        checked = (_check_logfile_task(checklist,task) for checklist,task in prefetch(_iter_tasks()))
+
+    done = 0
+    try:
+        for idx,(result,_errmsg) in enumerate(checked):
+            task = pending[idx]
+            _task_done(task)
+            done = idx + 1
             if result:
-                logger.info("Analysising logfile: %s... SUCCESS!" % logfilename)
+                logger.info("Analysising logfile: %s... SUCCESS!" % task[0])
                 resultlist.append(result)
             else:
-                logger.info("Analysising logfile: %s...ERROR!" % logfilename)
+                logger.info("Analysising logfile: %s...ERROR!" % task[0])
                 errmsg.append(_errmsg)
-            
+    except KeyboardInterrupt:
+        if pool:
+            pool.terminate()
+        raise
+    finally:
+        if own_pool:
+            pool.close()
+            pool.join()
+        for task in pending[done:]:
+            if isinstance(task[2],SpooledMember):
+                task[2].remove()
+
     return resultlist,errmsg
 
-def check_log(checklist,logname):
-    """Main entry to check the logfiles.
+def check_logdir(checklists,logdir,output_path='',jobs=1):
+    """check all the logfiles in logdir by the checklists of their types. if
+    jobs > 1, the logfiles are checked by a pool of `jobs` processes, the
+    results are returned in the same order as the serial checking. logdir
+    could be an archive too.
+
+    the logs in the archives are read without extracting them, the next logs
+    are decompressed while the current ones are checked. the logs of several
+    elements are split and checked by element.
+    """
+    if os.path.isdir(logdir):
+        tasks = list_logdir(logdir)
+    else:
+        tasks = [(logdir,"report_%(hostname)s.%(template_type)s")]
+    #the number of logs is unknown before the archives and elements are read.
+    expandable = SPLIT_ELEMENTS or len(checklists) > 1 or \
+                 any(isarchive(logfilename) for logfilename,_ in tasks)
+
+    if jobs > 1 and (len(tasks) > 1 or expandable):
+        jobs = jobs if expandable else min(jobs,len(tasks))
+    else:
+        jobs = 1
+    return check_tasks(checklists,iter_log_tasks(tasks,checklists),jobs)
+
+def watch_logdir(checklists,logdir,jobs=1):
+    """check the new or modified logs in logdir by the checklists of their
+    types until it's interrupted. the modules and the worker processes are
+    kept, the logs checked before are skipped by their content.
+    """
+    watcher = LogWatcher(WATCH_LEDGER,WATCH_SETTLE)
+    pool = check_pool(checklists,jobs) if jobs > 1 else None
+    logger.info("Watching the log directory: %s" % logdir)
+    try:
+        while True:
+            tasks = list_logdir(logdir)
+            ready = set(watcher.poll([logfilename for logfilename,_ in tasks]))
+            tasks = [task for task in tasks if task[0] in ready]
+            if tasks:
+                resultlist,errmsg = check_tasks(checklists,iter_log_tasks(tasks,checklists),jobs,pool)
+                #the logs failed to check are not checked again until
+                #they're modified.
+                for logfilename,_ in tasks:
+                    watcher.done(logfilename)
+                logger.info("Checked %s logs, %s reports saved." % (len(tasks),len(resultlist)))
+            prune_sniff_cache()
+            time.sleep(WATCH_INTERVAL)
+    except KeyboardInterrupt:
+        logger.info("Stop watching the log directory: %s" % logdir)
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+
+def check_log(checklists,logname):
+    """Main entry to check the logfiles. with several checklists, every log
+    is checked by the checklists of its type.
     """
     resultlist = []
 
-    _reportpath =  checklist.paths['reports'] 
+    _reportpath =  checklists[0].paths['reports'] 
     if SAVE_OUTPUT:
         _reportpath = SAVE_OUTPUT
     logger.debug("The _reportpath is: %s" % _reportpath)
 
-    #the given logname is a dir name.
-    if os.path.isdir(logname):
+    #the given logname is a dir name or an archive.
+    if os.path.isdir(logname) or isarchive(logname):
         logger.debug("checking the log directory: %s" % logname)
-        resultlist,errmsg = check_logdir(checklist,logname)
+        resultlist,errmsg = check_logdir(checklists,logname,jobs=JOBS)
     else: #the logname is a filenameq
         logger.debug("checking the log file: %s" % logname)
-        resultlist,errmsg = check_logfile(checklist,logname)
+        #the log of another type is reported by check_logfile.
+        matched = log_checklists(checklists,logname) if len(checklists) > 1 else checklists
+        tasks = [(checklist,task) for task in element_tasks(logname,"report_%(hostname)s.%(template_type)s")
+                                  for checklist in matched]
+        if len(tasks) > 1:
+            #the elements are checked in parallel, one report for each.
+            resultlist,errmsg = check_tasks(matched,tasks,min(JOBS,len(tasks)))
+        elif tasks:
+            resultlist,errmsg = check_logfile(matched[0],logname)
+        else:
+            errmsg = "The %s does not match the element types of the checklists." % logname
 
     if not resultlist and not errmsg:
         logger.error("No log file was found in the logfile directory: %s" % _reportpath)
@@ -252,6 +584,7 @@ def check_log(checklist,logname):
             reports_counter = 1
         logger.info("Save the %s success report to path '%s'" % (reports_counter, _reportpath))
 
+    logger.debug("The patterns compiled and reused: %s" % patterns.stats())
     logger.info("Finished the checking.")
 
 if __name__ == "__main__":   
@@ -272,22 +605,32 @@ if __name__ == "__main__":
     CONFIG.logger = logger
 
     #checklsit was speicifiied. 
-    checklist_file = args.run or args.show
-    cklpath,cklfile = os.path.split(checklist_file)
-    
-    #load the checklist file.
-    if not cklpath:
-        cklpath = CONFIG.checklist_path
-    checklist = CheckList(os.path.join(cklpath,cklfile))
+    checklists = []
+    for checklist_file in (args.run or args.show).split(','):
+        cklpath,cklfile = os.path.split(checklist_file.strip())
 
-    #import the modules and save to checklist.modules 
-    checklist.modules = ImportCheckModules(checklist)
+        #load the checklist file.
+        if not cklpath:
+            cklpath = CONFIG.checklist_path
+        checklist = CheckList(os.path.join(cklpath,cklfile))
 
-    if not checklist.modules:
-        parser.print_help()
-        sys.exit(1)
+        #import the modules and save to checklist.modules 
+        checklist.modules = ImportCheckModules(checklist)
+
+        if not checklist.modules:
+            parser.print_help()
+            sys.exit(1)
+        checklists.append(checklist)
 
     if args.run:
-        check_log(checklist,args.logfile)
+        #the worker processes of check_logdir share the compiled templates.
+        if CONFIG.get('precompile_templates',False):
+            _compiled = precompile_templates(CONFIG.template_path,TEMPLATE_CACHE)
+            logger.debug("The templates compiled: %s" % len(_compiled))
+        if args.watch:
+            watch_logdir(checklists,args.logfile,jobs=JOBS)
+        else:
+            check_log(checklists,args.logfile)
     elif args.show:
-        show_module_info(checklist,args)
\ No newline at end of file
+        for checklist in checklists:
+            show_module_info(checklist,args)
\ No newline at end of file